@@ -1,27 +1,100 @@
-from src.index_stock_alerts import fetch_index_stock_alerts
+from src.index_stock_alerts import fetch_index_stock_alerts, index_membership
 from src.alert_engine import run_alerts
+from src.alert_trigger import notification_digest
+from src.armed_alerts import armed_alerts
+from src.config import YF_WEBSOCKET_URL
 from src.alerts import fetch_stock_alerts_from_db, fetch_watchlist_alerts_from_db
+from src.apis.get_bulk_quotes import get_bulk_quotes
+from src.apis.get_ticker_closing_price import get_ticker_closing_price
+from src.indicators import indicators
+from src.news import news_alerts, run_news_pipeline
+from src.utils.metrics import publish_metrics, set_gauge, incr, timer
+from src.utils.trading_calendar import get_exchange
 import asyncio
 from collections import defaultdict
 import logging
+import os
+import signal
+import time
 import yfinance as yf
 
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
+# "stream" uses one yfinance WebSocket per ticker and falls back to polling
+# for tickers whose stream is unhealthy; "poll" only uses bulk requests.
+ALERTS_MODE = os.getenv("ALERTS_MODE", "stream")
+POLL_MIN_INTERVAL = float(os.getenv("POLL_MIN_INTERVAL", "15"))
+POLL_MAX_INTERVAL = float(os.getenv("POLL_MAX_INTERVAL", "300"))
+POLL_MOVE_BPS = float(os.getenv("POLL_MOVE_BPS", "10"))
+STREAM_STALE_SECONDS = float(os.getenv("STREAM_STALE_SECONDS", "300"))
+# Only subscribe/evaluate while each ticker's exchange is in session
+SCHEDULE_BY_SESSION = os.getenv("SCHEDULE_BY_SESSION", "true").lower() == "true"
+SESSION_WARMUP_SECONDS = float(os.getenv("SESSION_WARMUP_SECONDS", "300"))
+# Skip evaluating a ticker whose price moved by no more than this since its
+# last evaluation (absolute and/or basis points; 0 and 0 skip only repeated
+# prices), but re-evaluate at least every EVALUATION_HEARTBEAT_SECONDS for
+# time-based conditions. A heartbeat of 0 evaluates every message.
+MIN_PRICE_MOVE = float(os.getenv("MIN_PRICE_MOVE", "0"))
+MIN_PRICE_MOVE_BPS = float(os.getenv("MIN_PRICE_MOVE_BPS", "0"))
+EVALUATION_HEARTBEAT_SECONDS = float(os.getenv("EVALUATION_HEARTBEAT_SECONDS", "60"))
 
-async def check_alert_conditions(ticker, alerts, msg):
+# ticker -> monotonic time of the last WebSocket message
+last_message_at = {}
+# ticker -> (price, monotonic time, alert count) of the last evaluation
+last_evaluated = {}
+# Tickers waiting for the next batched indicator warm-up
+indicator_warm_pending = set()
+
+
+async def check_alert_conditions(ticker, alerts, msg, index_alerts=True):
     """
-    Check if current price data meets any alert conditions
+    Check if current price data meets any alert conditions; returns whether
+    the tick was evaluated. `index_alerts=False` leaves the alerts of the
+    indices `ticker` belongs to to the caller (see poll_tickers).
     """
     # Extract price from the message
     # Adjust based on actual yfinance message structure
     current_price = msg.get("price") or msg.get("last") or msg.get("close")
 
     if current_price is None:
-        return
+        return False
+
+    if not price_moved(ticker, float(current_price), alerts):
+        incr("evaluations.skipped")
+        incr(
+            "evaluations.skipped_alerts",
+            len(alerts) + index_membership.alert_count(ticker),
+        )
+        return False
 
-    await run_alerts(alerts, ticker, current_stock_data=msg)
+    incr("evaluations.run")
+    await run_alerts(alerts, ticker, current_stock_data=msg, park_triggered=True)
+    if index_alerts:
+        await index_membership.evaluate(ticker, msg)
+    return True
+
+
+def price_moved(ticker, price, alerts):
+    """
+    Whether `ticker` needs evaluating at `price`: it moved by more than the
+    minimum since the last evaluation, the heartbeat is due, or its alert
+    list changed (e.g. alerts re-armed at the day boundary). Records the
+    evaluation when it does.
+    """
+    now = time.monotonic()
+    last = last_evaluated.get(ticker)
+    if (
+        last is not None
+        and EVALUATION_HEARTBEAT_SECONDS > 0
+        and now - last[1] < EVALUATION_HEARTBEAT_SECONDS
+        and len(alerts) == last[2]
+    ):
+        min_move = max(MIN_PRICE_MOVE, abs(last[0]) * MIN_PRICE_MOVE_BPS / 10000)
+        if abs(price - last[0]) <= min_move:
+            return False
+    last_evaluated[ticker] = (price, now, len(alerts))
+    return True
 
 
 async def monitor_ticker(ticker, alerts):
@@ -30,14 +103,16 @@ async def monitor_ticker(ticker, alerts):
     """
     logger.info(f"Starting monitor for {ticker} with {len(alerts)} alerts")
     yf_ws = None
+    last_message_at[ticker] = time.monotonic()
 
     try:
-        async with yf.AsyncWebSocket(verbose=True) as ws:
+        async with yf.AsyncWebSocket(url=YF_WEBSOCKET_URL, verbose=True) as ws:
             yf_ws = ws
             await ws.subscribe([ticker])
 
             async def on_message(msg: dict):
                 logger.debug(f"{ticker}")
+                last_message_at[ticker] = time.monotonic()
                 await check_alert_conditions(ticker, alerts, msg)
 
             # Listen for messages
@@ -54,6 +129,165 @@ async def monitor_ticker(ticker, alerts):
         logger.info(f"WebSocket for {ticker} closed")
 
 
+async def warm_ticker_caches(ticker):
+    """Load the daily series into Redis before the session opens."""
+    try:
+        await get_ticker_closing_price(ticker)
+    except Exception as e:
+        logger.warning(f"Could not warm caches for {ticker}: {e}")
+        return
+
+    # Tickers warming together (same exchange open) share one RSI batch
+    indicator_warm_pending.add(ticker)
+    if len(indicator_warm_pending) > 1:
+        return
+    await asyncio.sleep(1)
+    batch = set(indicator_warm_pending)
+    indicator_warm_pending.clear()
+    try:
+        await indicators.warm(batch)
+    except Exception as e:
+        logger.warning(f"Could not warm indicators for {len(batch)} tickers: {e}")
+
+
+async def run_ticker_sessions(ticker, alerts):
+    """
+    Monitor a ticker only during its exchange's trading sessions: warm its
+    caches shortly before the open, subscribe at the open and unsubscribe
+    at the (possibly early) close.
+    """
+    exchange = get_exchange(ticker)
+
+    while True:
+        session = exchange.next_session()
+        if session is None:
+            await asyncio.sleep(3600)
+            continue
+        open_at, close_at = session
+
+        # Measured on timestamps: the wait can span a DST change
+        warm_in = exchange.seconds_until(open_at) - SESSION_WARMUP_SECONDS
+        if warm_in > 0:
+            await asyncio.sleep(warm_in)
+        await warm_ticker_caches(ticker)
+
+        open_in = exchange.seconds_until(open_at)
+        if open_in > 0:
+            await asyncio.sleep(open_in)
+
+        remaining = exchange.seconds_until(close_at)
+        if remaining <= 0:
+            continue
+
+        try:
+            await asyncio.wait_for(monitor_ticker(ticker, alerts), timeout=remaining)
+        except asyncio.TimeoutError:
+            pass
+
+        # The stream ended before the close: back off before resubscribing
+        if exchange.is_open():
+            await asyncio.sleep(3)
+
+
+async def rearm_at_day_boundary():
+    """Return parked (fully-triggered) alerts to their tickers at local midnight."""
+    while True:
+        await asyncio.sleep(armed_alerts.seconds_until_next_rearm() + 1)
+        rearmed = armed_alerts.rearm_due()
+        if rearmed:
+            logger.info(f"Re-armed alerts for {len(rearmed)} tickers")
+
+
+def in_session(ticker):
+    return not SCHEDULE_BY_SESSION or get_exchange(ticker).is_open()
+
+
+def next_poll_interval(interval, moved_fraction, latency):
+    """
+    Poll faster while many tickers are moving, back off while the market
+    is quiet, and never poll more often than a few upstream round trips.
+    """
+    if moved_fraction > 0.2:
+        interval /= 2
+    elif moved_fraction < 0.05:
+        interval *= 1.5
+    interval = max(interval, latency * 3)
+    return min(max(interval, POLL_MIN_INTERVAL), POLL_MAX_INTERVAL)
+
+
+async def poll_tickers(combined_alerts, select_tickers=None):
+    """
+    Evaluate alerts from bulk quote snapshots instead of WebSockets.
+
+    `select_tickers` returns the tickers to poll on each round (all of them
+    by default); the stream mode uses it to poll only unhealthy tickers.
+    """
+    interval = POLL_MIN_INTERVAL
+    last_prices = {}
+
+    while True:
+        if select_tickers:
+            tickers = select_tickers()
+        else:
+            tickers = [t for t in combined_alerts if in_session(t)]
+        set_gauge("poll.tickers", len(tickers))
+
+        if tickers:
+            start = time.perf_counter()
+            quotes = await get_bulk_quotes(tickers)
+            latency = time.perf_counter() - start
+            incr("poll.rounds")
+
+            moved = 0
+            for ticker, quote in quotes.items():
+                previous = last_prices.get(ticker)
+                if (
+                    previous
+                    and abs(quote["price"] - previous) / previous * 10000
+                    >= POLL_MOVE_BPS
+                ):
+                    moved += 1
+                last_prices[ticker] = quote["price"]
+
+            evaluated = await asyncio.gather(
+                *(
+                    check_alert_conditions(
+                        ticker, combined_alerts[ticker], quote, index_alerts=False
+                    )
+                    for ticker, quote in quotes.items()
+                ),
+                return_exceptions=True,
+            )
+            # Index alerts once per alert over all its constituents' quotes
+            await index_membership.evaluate_round(
+                {
+                    ticker: quote
+                    for (ticker, quote), ok in zip(quotes.items(), evaluated)
+                    if ok is True
+                }
+            )
+
+            interval = next_poll_interval(
+                interval, moved / max(len(quotes), 1), latency
+            )
+            set_gauge("poll.interval_seconds", interval)
+
+        await asyncio.sleep(interval)
+
+
+def unhealthy_stream_tickers(tasks):
+    """In-session tickers whose stream died or has gone quiet for too long."""
+    now = time.monotonic()
+    return [
+        ticker
+        for ticker, task in tasks.items()
+        if in_session(ticker)
+        and (
+            task.done() or now - last_message_at.get(ticker, now) > STREAM_STALE_SECONDS
+        )
+    ]
+
+
 async def main():
     # Fetch all alerts from database
     stocks_alerts = await fetch_stock_alerts_from_db()
@@ -71,28 +305,80 @@ async def main():
 
     # Create async tasks for each ticker
 
-    index_grouped_alerts = await fetch_index_stock_alerts()
+    await fetch_index_stock_alerts()
 
     combined_alerts = defaultdict(list, grouped_alerts)
 
-    if index_grouped_alerts:
-        for ticker, alerts in index_grouped_alerts.items():
-            combined_alerts[ticker].extend(alerts)
+    # Constituents are monitored too, but their index alerts stay in
+    # index_membership instead of being copied into each ticker's list
+    for ticker in index_membership.constituents():
+        combined_alerts.setdefault(ticker, [])
 
     print(f"combined_alerts: - {len(combined_alerts)}")
-    tasks = []
     for ticker, alerts in combined_alerts.items():
-        task = asyncio.create_task(monitor_ticker(ticker, alerts))
-        tasks.append(task)
+        for alert in alerts:
+            indicators.retain(alert, ticker)
+        for alert in index_membership.alerts_for(ticker):
+            indicators.retain(alert, ticker)
+    with timer("startup.indicator_warm_seconds"):
+        await indicators.warm()
+
+    # NEWS alerts are matched by the news pipeline, not by price updates
+    news_alerts.sync(
+        [
+            alert
+            for alerts in [
+                *combined_alerts.values(),
+                *index_membership.index_alerts.values(),
+            ]
+            for alert in alerts
+            if alert["condition"] == "NEWS"
+        ]
+    )
+    await publish_metrics("alerts_script")
+
+    # background_job.py restarts this process with SIGTERM: cancel the
+    # monitors instead of dying, so queued digest notifications are sent
+    main_task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, main_task.cancel)
+
+    if ALERTS_MODE == "poll":
+        logger.info("Running in polling mode")
+        tasks = [
+            asyncio.create_task(poll_tickers(combined_alerts)),
+            asyncio.create_task(rearm_at_day_boundary()),
+            asyncio.create_task(run_news_pipeline()),
+        ]
+    else:
+        monitor = run_ticker_sessions if SCHEDULE_BY_SESSION else monitor_ticker
+        monitors = {}
+        for ticker, alerts in combined_alerts.items():
+            monitors[ticker] = asyncio.create_task(monitor(ticker, alerts))
+
+        # Fallback: poll any ticker whose stream is unhealthy
+        tasks = list(monitors.values())
+        tasks.append(asyncio.create_task(rearm_at_day_boundary()))
+        tasks.append(asyncio.create_task(run_news_pipeline()))
+        tasks.append(
+            asyncio.create_task(
+                poll_tickers(
+                    combined_alerts, lambda: unhealthy_stream_tickers(monitors)
+                )
+            )
+        )
 
     # Run all monitoring tasks concurrently
     try:
         await asyncio.gather(*tasks)
-    except KeyboardInterrupt:
+    except asyncio.CancelledError:
         logger.info("Shutting down monitors...")
+    finally:
         for task in tasks:
             task.cancel()
         await asyncio.gather(*tasks, return_exceptions=True)
+        await notification_digest.flush_all()
 
 
 if __name__ == "__main__":
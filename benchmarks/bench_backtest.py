@@ -0,0 +1,133 @@
+"""
+Time of backtest_alert for every supported condition over 10, 30 and 50
+years of synthetic daily history, with every advance key enabled.
+
+    python -m benchmarks.bench_backtest
+"""
+
+import os
+import time
+import numpy as np
+
+os.environ.setdefault("DATABASE_NAME", "bench")
+
+from src.backtest import backtest_alert
+from src.conditions.check_price_conditions import GOING_UP_DOWN
+
+YEARS = (10, 30, 50)
+REPEATS = 5
+
+ALERTS = {
+    "DMA": {
+        "condition": "DMA",
+        "dmaWindow": [50, 200],
+        "dmaAdvanceCondition": {
+            "touchedDma": True,
+            "fallXFromDma": True,
+            "fallXFromDmaValue": 10,
+            "riseXFromDma": True,
+            "nearDma": True,
+            "nearDmaValue": 1,
+            "sustainXDayAboveDma": True,
+            "sustainXDayAboveDmaValue": 20,
+            "sustainXDayBelowDma": True,
+            "sustainXDayBelowDmaValue": 20,
+        },
+    },
+    "RSI": {
+        "condition": "RSI",
+        "rsiPeriod": 14,
+        "rsiAdvanceCondition": {
+            "rsiLessThanX": True,
+            "rsiLessThanXValue": 30,
+            "rsiGreaterThanX": True,
+            "rsiGreaterThanXValue": 70,
+            "rsiSpecificRange": True,
+            "lowRange": 45,
+            "highRange": 55,
+            "rsiHistoricalLowExtremeValue": 60,
+            "rsiHistoricalHighExtremeValue": 60,
+        },
+    },
+    "DRAWDOWN": {
+        "condition": "DRAWDOWN",
+        "drawdownAdvanceCondition": {
+            "nearLastDrawdown": True,
+            "nearLastDrawdownValue": 10,
+            "priceSurpassLastDrawdown": True,
+            "priceSurpassMultipleHistoricalDrawdown": True,
+            "priceApproachHistoricalDrawdown": True,
+            "priceApproachHistoricalDrawdownValue": 5,
+            "priceRecoverAfterDrawdown": True,
+            "priceRecoverAfterDrawdownValue": 20,
+        },
+    },
+    "PRICE": {
+        "condition": "PRICE",
+        "subCondition": "GOING_DOWN",
+        "valueType": "PERCENTAGE",
+        "value": 3,
+        "days": 5,
+        "weeks": 2,
+        "priceAdvanceCondition": {key: True for key in GOING_UP_DOWN},
+    },
+    "PE_RATIO": {
+        "condition": "PE_RATIO",
+        "peRatioAdvanceCondition": {
+            "peRatioLessThanX": True,
+            "peRatioLessThanXValue": 15,
+            "peRatioGreaterThanX": True,
+            "peRatioGreaterThanXValue": 30,
+            "peRatioSpecificRange": True,
+            "lowRange": 18,
+            "highRange": 22,
+            "peRatioNearXYearLow": True,
+            "peRatioNearXYearLowYear": 5,
+            "peRatioNearXYearLowValue": 5,
+            "peRatioNearXYearHigh": True,
+            "peRatioNearXYearHighYear": 5,
+            "peRatioNearXYearHighValue": 5,
+            "peRatioHistoricalExtreme": True,
+            "peRatioTrendingUp": True,
+            "peRatioTrendingUpValue": 5,
+            "peRatioTrendingDown": True,
+            "peRatioTrendingDownValue": 5,
+        },
+    },
+}
+
+
+def make_series(years, level, drift, volatility, seed):
+    """Trading days (weekdays) of a random walk ending today."""
+    rng = np.random.default_rng(seed)
+    days = np.datetime64("today") - np.arange(int(years * 365.25))[::-1]
+    days = days[np.is_busday(days)]
+    values = level * np.exp(np.cumsum(rng.normal(drift, volatility, len(days))))
+    return {"time": days, "value": values}
+
+
+def main():
+    print(f"{'condition':<12}" + "".join(f"{f'{y} years':>16}" for y in YEARS))
+    series = {
+        years: (
+            make_series(years, 50, 0.0003, 0.015, 1),
+            make_series(years, 20, 0.0, 0.01, 2),
+        )
+        for years in YEARS
+    }
+    for condition, alert in ALERTS.items():
+        cells = []
+        for years in YEARS:
+            closes, pe = series[years]
+            best = float("inf")
+            for _ in range(REPEATS):
+                start = time.perf_counter()
+                backtest_alert(alert, closes, pe)
+                best = min(best, time.perf_counter() - start)
+            cells.append(f"{best * 1000:.2f} ms")
+        print(f"{condition:<12}" + "".join(f"{cell:>16}" for cell in cells))
+    print(f"\nbest of {REPEATS} runs, every advance key enabled")
+
+
+if __name__ == "__main__":
+    main()
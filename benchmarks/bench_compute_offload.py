@@ -0,0 +1,78 @@
+"""
+Event-loop blocking while recomputing RSI and drawdowns for many tickers
+(the midnight cache expiry case), inline on the loop vs in the compute
+pool.
+
+    python -m benchmarks.bench_compute_offload
+"""
+
+import asyncio
+import time
+import numpy as np
+from src import compute
+from src.conditions.check_drawdown_conditions import drawdown_summary
+from src.indicators import compute_rsi
+
+TICKERS = 50
+YEARS = 20
+TICK_SECONDS = 0.005
+
+
+def make_series(seed: int, years: int = YEARS):
+    dates = np.arange(
+        np.datetime64("2005-01-03"), np.datetime64("2005-01-03") + years * 365
+    )
+    dates = dates[np.is_busday(dates)]
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, len(dates))))
+    return dates, closes
+
+
+async def heartbeat(stop: asyncio.Event, lags: list):
+    """Stand-in for the WebSocket readers: how late does each wake-up run?"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(time.perf_counter() - start - TICK_SECONDS)
+
+
+async def recompute_all(series):
+    jobs = []
+    for dates, closes in series:
+        jobs.append(compute.run_compute(drawdown_summary, dates, closes))
+        jobs.append(compute.run_compute(compute_rsi, closes, 14))
+    await asyncio.gather(*jobs)
+
+
+async def run(workers: int, series):
+    compute.COMPUTE_WORKERS = workers
+    if workers:
+        # Warm the pool so process start-up is not counted
+        await compute.run_compute(compute_rsi, series[0][1], 14)
+
+    stop, lags = asyncio.Event(), []
+    beat = asyncio.create_task(heartbeat(stop, lags))
+    start = time.perf_counter()
+    await recompute_all(series)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    compute.shutdown_compute()
+
+    label = "inline" if workers == 0 else f"pool x{workers}"
+    print(
+        f"{label:<10} total {elapsed * 1000:>8.1f} ms   "
+        f"max loop stall {max(lags, default=0) * 1000:>8.1f} ms   "
+        f"p99 {np.percentile(lags or [0], 99) * 1000:>7.1f} ms"
+    )
+
+
+def main():
+    series = [make_series(seed) for seed in range(TICKERS)]
+    print(f"{TICKERS} tickers x {len(series[0][0])} daily closes\n")
+    asyncio.run(run(0, series))
+    asyncio.run(run(max(compute.COMPUTE_WORKERS, 1), series))
+
+
+if __name__ == "__main__":
+    main()
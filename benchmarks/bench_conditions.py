@@ -0,0 +1,494 @@
+"""
+Per-call time and allocation of every condition module and advance
+condition handler, in isolation, on synthetic daily series of 1k, 10k and
+50k points. I/O is stubbed at the fetch boundary: the Shipra closing
+price / PE fetchers return prebuilt series, yfinance is a FakeYFinance,
+dedup lookups find nothing and triggers are dropped.
+
+Cases backed by the daily caches run twice: "cold" clears them before
+every call (first evaluation of the day, including parsing the series)
+and "warm" reuses them (every later tick). Results are written as JSON
+and compared with a saved baseline:
+
+    python -m benchmarks.bench_conditions --save-baseline   # before a change
+    python -m benchmarks.bench_conditions                   # after it
+    python -m benchmarks.bench_conditions --only rsi --sizes 10000
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import importlib
+import json
+import os
+import pkgutil
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+os.environ.setdefault("DATABASE_NAME", "bench")
+
+import src.advance_condition
+import src.conditions
+from benchmarks.fakes import FakeYFinance
+from src import compute, indicators as indicators_module, price_extremes, price_history
+from src.conditions import check_cross_junction_conditions as cross_junction
+from src.conditions import check_drawdown_conditions as drawdown
+from src.utils.series import arrays_to_series
+from src.utils.trading_calendar import local_today
+
+SIZES = (1000, 10000, 50000)
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+OUTPUT = os.path.join(RESULTS_DIR, "bench_conditions.json")
+BASELINE = os.path.join(RESULTS_DIR, "bench_conditions.baseline.json")
+MIN_CALLS = 3
+MAX_CALLS = 500
+BUDGET_SECONDS = 0.3  # per case, size and mode
+REGRESSION_THRESHOLD = 0.10
+
+# Stubbed series, keyed by ticker (one ticker per size)
+closing_series, pe_series, daily_bars = {}, {}, {}
+
+
+def make_series(size: int, seed: int = 3):
+    """`size` calendar days of closes ending today (US ticker)."""
+    today = np.datetime64(local_today("BENCH"))
+    dates = today - np.arange(size)[::-1]
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.015, size)))
+    return dates, closes
+
+
+def prepare(size: int):
+    ticker = f"BENCH{size}"
+    dates, closes = make_series(size)
+    closing_series[ticker] = arrays_to_series({"time": dates, "value": closes})
+    pe_series[ticker] = arrays_to_series({"time": dates, "value": closes / 5})
+    daily_bars[ticker] = FakeYFinance.daily_bars(dates, closes)
+    return ticker
+
+
+async def _closing_price(ticker):
+    return closing_series[ticker]
+
+
+async def _pe_ratio(ticker):
+    return pe_series[ticker]
+
+
+async def _not_triggered(*args, **kwargs):
+    return None
+
+
+async def _drop_trigger(*args, **kwargs):
+    return None
+
+
+STUBS = {
+    "get_ticker_closing_price": _closing_price,
+    "get_ticker_pe_ratio": _pe_ratio,
+    "get_alert_triggered": _not_triggered,
+    "run_alert_trigger": _drop_trigger,
+    "yf": FakeYFinance(daily_bars),
+}
+
+
+def condition_modules():
+    for package in (src.conditions, src.advance_condition):
+        for info in pkgutil.iter_modules(package.__path__):
+            yield importlib.import_module(f"{package.__name__}.{info.name}")
+    yield price_history
+
+
+def install_stubs():
+    for module in condition_modules():
+        for name, stub in STUBS.items():
+            if hasattr(module, name):
+                setattr(module, name, stub)
+    # Measure the computation itself, not the pool round trip
+    compute.COMPUTE_WORKERS = 0
+
+
+def reset_caches():
+    price_history._histories.clear()
+    indicators_module.indicators._cache.clear()
+    cross_junction._trackers.clear()
+    cross_junction._alert_signs.clear()
+    price_extremes._extremes.clear()
+    drawdown._drawdown_cache.clear()
+
+
+# ---------------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------------
+
+
+def base_alert(ticker, condition, **fields):
+    last = closing_series[ticker][-1]["value"]
+    price = last * 1.001
+    return {
+        "_id": "bench",
+        "condition": condition,
+        "subCondition": "",
+        "tickerNm": ticker,
+        "ticker": {"_id": "bench", "ticker": ticker, "nm": f"{ticker} Inc."},
+        "userXTickerId": "bench",
+        "emailAddress": ["bench@example.com"],
+        "frequency": "ONCE_A_DAY",
+        "current_price": price,
+        "currentStockData": {
+            "price": price,
+            "day_high": price * 1.01,
+            "day_low": price * 0.99,
+        },
+        **fields,
+    }
+
+
+def dma_alert(ticker):
+    return base_alert(
+        ticker,
+        "DMA",
+        dmaWindow=[50, 200],
+        dmaAdvanceCondition={
+            "touchedDma": True,
+            "fallXFromDma": True,
+            "riseXFromDma": True,
+            "fallXFromDmaValue": 5,
+            "nearDma": True,
+            "nearDmaValue": 2,
+            "sustainXDayAboveDma": True,
+            "sustainXDayAboveDmaValue": 5,
+            "sustainXDayBelowDma": True,
+            "sustainXDayBelowDmaValue": 5,
+        },
+    )
+
+
+def rsi_alert(ticker):
+    return base_alert(
+        ticker,
+        "RSI",
+        rsiPeriod=14,
+        rsiAdvanceCondition={
+            "rsiLessThanX": True,
+            "rsiLessThanXValue": 30,
+            "rsiGreaterThanX": True,
+            "rsiGreaterThanXValue": 70,
+            "rsiSpecificRange": True,
+            "lowRange": 40,
+            "highRange": 60,
+            "rsiHistoricalLowExtremeValue": 250,
+            "rsiHistoricalHighExtremeValue": 250,
+        },
+    )
+
+
+def pe_alert(ticker):
+    return base_alert(
+        ticker,
+        "PE_RATIO",
+        peRatioAdvanceCondition={
+            "peRatioLessThanX": True,
+            "peRatioLessThanXValue": 15,
+            "peRatioGreaterThanX": True,
+            "peRatioGreaterThanXValue": 30,
+            "peRatioSpecificRange": True,
+            "lowRange": 10,
+            "highRange": 40,
+            "peRatioNearXYearLow": True,
+            "peRatioNearXYearLowYear": 5,
+            "peRatioNearXYearLowValue": 5,
+            "peRatioNearXYearHigh": True,
+            "peRatioNearXYearHighYear": 5,
+            "peRatioNearXYearHighValue": 5,
+            "peRatioHistoricalExtreme": True,
+            "peRatioTrendingUp": True,
+            "peRatioTrendingUpValue": 10,
+            "peRatioTrendingDown": True,
+            "peRatioTrendingDownValue": 10,
+        },
+    )
+
+
+def opportunity_alert(ticker):
+    return base_alert(ticker, "OPPORTUNITY", subCondition="GOING_UP", opportunity=10)
+
+
+def drawdown_alert(ticker):
+    return base_alert(
+        ticker,
+        "DRAWDOWN",
+        drawdownAdvanceCondition={
+            "nearLastDrawdown": True,
+            "nearLastDrawdownValue": 5,
+            "priceSurpassLastDrawdown": True,
+            "priceSurpassMultipleHistoricalDrawdown": True,
+            "priceApproachHistoricalDrawdown": True,
+            "priceApproachHistoricalDrawdownValue": 5,
+        },
+    )
+
+
+def cross_junction_alert(ticker):
+    return base_alert(
+        ticker,
+        "CROSS_JUNCTION",
+        crossJunctionWindow=[50, 200],
+        crossJunctionAdvanceCondition={"goldenCross": True, "deathCross": True},
+    )
+
+
+def price_alert(ticker):
+    return base_alert(
+        ticker,
+        "PRICE",
+        subCondition="GOING_UP",
+        value=1,
+        valueType="PERCENTAGE",
+        weeks=2,
+        days=5,
+    )
+
+
+def condition_case(module, function, make_alert):
+    async def call(alert):
+        await getattr(module, function)(alert)
+
+    return call, make_alert
+
+
+def handler_case(function):
+    async def call(alert):
+        result = getattr(src.advance_condition, function)(alert, [])
+        if hasattr(result, "__await__"):
+            await result
+
+    return call, price_alert
+
+
+async def _compute_drawdowns(alert):
+    await drawdown.compute_drawdowns(alert["tickerNm"])
+
+
+def build_cases():
+    """name -> (call(alert), make_alert(ticker), modes)"""
+    modules = {m.__name__.rsplit(".", 1)[-1]: m for m in condition_modules()}
+    cached = ("cold", "warm")
+    cases = {
+        "check_dma_conditions": (
+            *condition_case(
+                modules["check_dma_conditions"], "check_dma_conditions", dma_alert
+            ),
+            cached,
+        ),
+        "check_rsi_conditions": (
+            *condition_case(
+                modules["check_rsi_conditions"], "check_rsi_conditions", rsi_alert
+            ),
+            cached,
+        ),
+        "compute_drawdowns": (_compute_drawdowns, drawdown_alert, cached),
+        "check_drawdown_conditions": (
+            *condition_case(drawdown, "check_drawdown_conditions", drawdown_alert),
+            cached,
+        ),
+        "check_pe_ratio_conditions": (
+            *condition_case(
+                modules["check_pe_ratio_conditions"],
+                "check_pe_ratio_conditions",
+                pe_alert,
+            ),
+            cached,
+        ),
+        # Reads the (stubbed) closing price series directly on every call
+        "check_opportunity_conditions": (
+            *condition_case(
+                modules["check_opportunity_conditions"],
+                "check_opportunity_conditions",
+                opportunity_alert,
+            ),
+            ("cold",),
+        ),
+        "check_cross_junction_conditions": (
+            *condition_case(
+                cross_junction,
+                "check_cross_junction_conditions",
+                cross_junction_alert,
+            ),
+            cached,
+        ),
+    }
+    # yf-backed handlers fetch on every call: no warm path
+    uncached = {
+        "check_from_today_open_price",
+        "check_from_yesterday_close_price",
+        "check_within_current_week",
+        "check_within_past_x_weeks",
+    }
+    for function in src.advance_condition.__all__:
+        modes = ("cold",) if function in uncached else cached
+        cases[f"advance_condition.{function}"] = (*handler_case(function), modes)
+    return cases
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+
+async def measure(call, alert, mode):
+    if mode == "cold":
+        reset_caches()
+    await call(alert)  # warm-up (and cache fill for "warm")
+
+    times = []
+    while len(times) < MIN_CALLS or (
+        sum(times) < BUDGET_SECONDS and len(times) < MAX_CALLS
+    ):
+        if mode == "cold":
+            reset_caches()
+        start = time.perf_counter()
+        await call(alert)
+        times.append(time.perf_counter() - start)
+        # Let fire-and-forget trigger tasks finish outside the timed region
+        await asyncio.sleep(0)
+
+    if mode == "cold":
+        reset_caches()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    await call(alert)
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    return {
+        "calls": len(times),
+        "median_us": float(np.median(times) * 1e6),
+        "min_us": float(np.min(times) * 1e6),
+        "peak_kib": peak / 1024,
+    }
+
+
+async def run(sizes, only=None):
+    install_stubs()
+    cases = build_cases()
+    results = {}
+    for size in sizes:
+        ticker = prepare(size)
+        for name, (call, make_alert, modes) in cases.items():
+            if only and only not in name:
+                continue
+            for mode in modes:
+                key = f"{name}[{size},{mode}]"
+                stats = await measure(call, make_alert(ticker), mode)
+                results[key] = {"case": name, "size": size, "mode": mode, **stats}
+                print(
+                    f"{key:<70} {stats['median_us']:>11.1f} us "
+                    f"{stats['peak_kib']:>10.1f} KiB",
+                    file=sys.stderr,
+                )
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Baseline comparison
+# ---------------------------------------------------------------------------
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Print each case against the baseline; return the regressed keys."""
+    regressions = []
+    print(
+        f"\n{'case':<70} {'time/call':>12} {'vs base':>8} "
+        f"{'peak alloc':>12} {'vs base':>8}"
+    )
+    for key, now in results.items():
+        base = baseline.get(key)
+        time_ratio = alloc_ratio = None
+        if base:
+            time_ratio = now["median_us"] / base["median_us"]
+            alloc_ratio = (now["peak_kib"] + 1) / (base["peak_kib"] + 1)
+        flag = ""
+        if base and (time_ratio > 1 + threshold or alloc_ratio > 1 + threshold):
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(
+            f"{key:<70} {now['median_us']:>9.1f} us "
+            f"{_ratio(time_ratio):>8} {now['peak_kib']:>8.1f} KiB "
+            f"{_ratio(alloc_ratio):>8}{flag}"
+        )
+    missing = sorted(set(baseline) - set(results))
+    if missing:
+        print(f"\n{len(missing)} baseline cases not run this time")
+    return regressions
+
+
+def _ratio(ratio):
+    return "new" if ratio is None else f"{(ratio - 1) * 100:+.0f}%"
+
+
+def write_json(path, results, sizes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    document = {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "sizes": list(sizes),
+        },
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+
+
+def load_results(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--only", help="run cases whose name contains this")
+    parser.add_argument("--output", default=OUTPUT)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="also store as the baseline"
+    )
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument(
+        "--fail-on-regression", action="store_true", help="exit 1 on regressions"
+    )
+    args = parser.parse_args(argv)
+
+    # Handlers print progress; keep stdout for the report
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        results = asyncio.run(run(args.sizes, args.only))
+    write_json(args.output, results, args.sizes)
+    print(f"results written to {args.output}")
+
+    if args.save_baseline:
+        write_json(args.baseline, results, args.sizes)
+        print(f"baseline saved to {args.baseline}")
+    baseline = load_results(args.baseline) or {}
+    if not baseline:
+        print("no baseline yet; run with --save-baseline to record one")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regressions over {args.threshold:.0%}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
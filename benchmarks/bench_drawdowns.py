@@ -0,0 +1,95 @@
+"""
+Drawdown period extraction on 30 years of daily closes: the previous
+per-period pandas slicing vs the single-pass NumPy segment reductions in
+check_drawdown_conditions.drawdown_summary. Also checks both agree.
+
+    python -m benchmarks.bench_drawdowns
+"""
+
+import timeit
+import numpy as np
+import pandas as pd
+from src.conditions.check_drawdown_conditions import drawdown_summary
+
+YEARS = 30
+REPEAT = 20
+
+
+def make_series(years: int = YEARS, seed: int = 7):
+    dates = np.arange(
+        np.datetime64("1995-01-02"), np.datetime64("1995-01-02") + years * 365
+    )
+    dates = dates[np.is_busday(dates)]
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.0006, 0.012, len(dates))))
+    return dates, closes
+
+
+def per_period_summary(dates, closes):
+    """The previous implementation: one df.loc slice + min/idxmin per period."""
+    df = pd.DataFrame({"Close": closes}, index=pd.DatetimeIndex(dates))
+    df["running_max"] = df["Close"].cummax()
+    df["drawdown"] = df["Close"] / df["running_max"] - 1
+
+    is_drawdown = df["drawdown"].values < 0
+    boundaries = np.diff(np.concatenate([[False], is_drawdown, [False]]).astype(int))
+    starts = np.where(boundaries == 1)[0]
+    ends = np.where(boundaries == -1)[0]
+
+    periods = []
+    for start_idx, end_idx in zip(starts, ends):
+        ongoing = end_idx >= len(df)
+        start, end = df.index[start_idx], df.index[min(end_idx, len(df) - 1)]
+        dd_slice = df.loc[start:end]
+        peak_price = df["running_max"].loc[start]
+        low_price = dd_slice["Close"].min()
+        max_dd_date = dd_slice["drawdown"].idxmin()
+        periods.append(
+            {
+                "start_date": start.strftime("%d-%b-%y"),
+                "end_date": "TBD" if ongoing else end.strftime("%d-%b-%y"),
+                "max_drawdown": round(dd_slice["drawdown"].min() * 100, 2),
+                "duration": f"{(end - start).days} days",
+                "peak_price": round(peak_price, 2),
+                "low_price": round(low_price, 2),
+                "opportunity": (
+                    None
+                    if ongoing
+                    else round(((peak_price - low_price) / low_price) * 100, 2)
+                ),
+                "max_drawdown_date": max_dd_date.strftime("%d-%b-%y"),
+                "max_drawdown_price": round(dd_slice["Close"].loc[max_dd_date], 2),
+            }
+        )
+
+    drawdown_list = [d for d in periods if d["max_drawdown"] < -5]
+    drawdown_list.reverse()
+    return (
+        drawdown_list,
+        float(df["drawdown"].iloc[-1]),
+        float(df["running_max"].iloc[-1]),
+    )
+
+
+def bench(name, fn):
+    ms = min(timeit.repeat(fn, number=1, repeat=REPEAT)) * 1000
+    print(f"{name:<22} {ms:>9.2f} ms")
+    return ms
+
+
+def main():
+    dates, closes = make_series()
+    periods = int(np.sum(np.diff((closes < np.maximum.accumulate(closes)) * 1) == 1))
+    print(
+        f"{len(dates)} daily closes over {YEARS} years, ~{periods} drawdown periods\n"
+    )
+
+    assert per_period_summary(dates, closes) == drawdown_summary(dates, closes)
+
+    before = bench("per-period pandas", lambda: per_period_summary(dates, closes))
+    after = bench("numpy reduceat", lambda: drawdown_summary(dates, closes))
+    print(f"\nspeed-up: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Per-tick cost of an index level kept by IndexAggregate (O(1) update of
+the weighted sum) vs recomputing the weighted sum over every constituent
+on each tick, for index sizes up to ^RUT.
+
+    python -m benchmarks.bench_index_aggregate
+"""
+
+import asyncio
+import os
+import time
+import numpy as np
+
+os.environ.setdefault("DATABASE_NAME", "bench")
+
+from src import index_aggregate
+from src.index_aggregate import IndexAggregate
+from src.utils.range_index import SeriesExtremes
+from src.utils.trading_calendar import local_today
+
+SIZES = (30, 503, 2000)
+TICKS = 200_000
+
+
+def make_history(today, seed):
+    rng = np.random.default_rng(seed)
+    dates = np.datetime64(today) - np.arange(30)[::-1]
+    closes = 50 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+    return SeriesExtremes(dates, closes)
+
+
+async def seeded(size):
+    today = local_today("^BENCH")
+    histories = {f"C{i}": make_history(today, i) for i in range(size)}
+
+    async def get_closing_history(ticker):
+        return histories[ticker]
+
+    index_aggregate.get_closing_history = get_closing_history
+    aggregate = IndexAggregate("^BENCH", list(histories))
+    aggregate.day = today
+    await aggregate.seed(today)
+    return aggregate
+
+
+def run(size):
+    aggregate = asyncio.run(seeded(size))
+    rng = np.random.default_rng(1)
+    tickers = [f"C{i}" for i in rng.integers(0, size, TICKS)]
+    prices = (50 * (1 + rng.normal(0, 0.01, TICKS))).tolist()
+
+    start = time.perf_counter()
+    for ticker, price in zip(tickers, prices):
+        aggregate.update(ticker, price)
+    incremental = (time.perf_counter() - start) / TICKS
+
+    # Full recompute: the same state, summed again after every tick
+    weights = {t: w for t, (w, _) in aggregate.weights.items()}
+    last = {t: previous for t, (_, previous) in aggregate.weights.items()}
+    rounds = min(TICKS, 2_000_000 // size)
+    start = time.perf_counter()
+    for ticker, price in zip(tickers[:rounds], prices[:rounds]):
+        last[ticker] = price
+        sum(weights[t] * p for t, p in last.items())
+    recompute = (time.perf_counter() - start) / rounds
+
+    # Accumulated rounding of the running sum against an exact recompute
+    exact = sum(
+        weight * aggregate.prices.get(t, previous)
+        for t, (weight, previous) in aggregate.weights.items()
+    )
+    return incremental, recompute, abs(aggregate.level - exact)
+
+
+def main():
+    print(f"{'constituents':>12}{'O(1) update':>16}{'recompute':>16}{'speedup':>10}")
+    for size in SIZES:
+        incremental, recompute, drift = run(size)
+        print(
+            f"{size:>12}{incremental * 1e6:>13.2f} us{recompute * 1e6:>13.2f} us"
+            f"{recompute / incremental:>9.0f}x"
+        )
+        print(f"{'':>12}  level drift after {TICKS:,} ticks: {drift:.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Memory and build time of index alert fan-out: the previous per-constituent
+alert lists (every index alert appended to each constituent's list) vs the
+IndexMembership table (constituent -> indices, index -> alerts), for the
+largest indices, plus the per-tick cost of building the evaluation views.
+
+    python -m benchmarks.bench_index_membership
+"""
+
+import os
+import time
+import tracemalloc
+from collections import defaultdict
+
+os.environ.setdefault("DATABASE_NAME", "bench")
+
+from src.index_stock_alerts import IndexMembership
+
+# Index -> constituent count, roughly the real sizes
+INDICES = {"^RUT": 2000, "^GSPC": 503, "^NDX": 101, "^DJI": 30}
+ALERTS_PER_INDEX = 200
+VIEW_ROUNDS = 2000
+
+
+def make_inputs():
+    alerts, constituents = {}, {}
+    for index, size in INDICES.items():
+        alerts[index] = [
+            {
+                "_id": f"{index}-{n}",
+                "condition": "DRAWDOWN",
+                "ticker": {"_id": f"uxt-{index}-{n}", "ticker": index},
+                "emailAddress": [f"user{n}@example.com"],
+                "frequency": "ONCE_A_DAY",
+            }
+            for n in range(ALERTS_PER_INDEX)
+        ]
+        # Overlapping constituents: C0..C29 belong to all four indices
+        constituents[index] = [f"C{i}" for i in range(size)]
+    return alerts, constituents
+
+
+def build_lists(alerts, constituents):
+    grouped = defaultdict(list)
+    for index, tickers in constituents.items():
+        for ticker in tickers:
+            grouped[ticker].extend(alerts[index])
+    return grouped
+
+
+def build_membership(alerts, constituents):
+    membership = IndexMembership()
+    for index, tickers in constituents.items():
+        membership.set_index(index, alerts[index], tickers)
+    return membership
+
+
+def measure(build, alerts, constituents):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(alerts, constituents)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def main():
+    alerts, constituents = make_inputs()
+    references = sum(len(alerts[i]) * len(c) for i, c in constituents.items())
+    print(
+        f"{len(INDICES)} indices, {ALERTS_PER_INDEX} alerts each, "
+        f"{references:,} (alert, constituent) pairs\n"
+    )
+
+    grouped, list_bytes, list_seconds = measure(build_lists, alerts, constituents)
+    membership, table_bytes, table_seconds = measure(
+        build_membership, alerts, constituents
+    )
+    assert sum(len(v) for v in grouped.values()) == references
+    assert sum(membership.alert_count(t) for t in membership.members) == references
+
+    print(f"{'':<26}{'memory':>12}{'build':>12}")
+    print(
+        f"{'per-constituent lists':<26}{list_bytes / 2**20:>9.2f} MiB"
+        f"{list_seconds * 1000:>9.2f} ms"
+    )
+    print(
+        f"{'membership table':<26}{table_bytes / 2**20:>9.2f} MiB"
+        f"{table_seconds * 1000:>9.2f} ms"
+    )
+    print(f"memory ratio {list_bytes / max(table_bytes, 1):.0f}x\n")
+
+    # Views are built per evaluated constituent tick; the busiest constituent
+    # belongs to every index
+    ticker = "C0"
+    start = time.perf_counter()
+    for _ in range(VIEW_ROUNDS):
+        [dict(alert) for alert in membership.alerts_for(ticker)]
+    per_tick = (time.perf_counter() - start) / VIEW_ROUNDS
+    print(
+        f"views for {ticker} ({membership.alert_count(ticker)} alerts): "
+        f"{per_tick * 1e6:.1f} us per tick"
+    )
+
+
+if __name__ == "__main__":
+    main()
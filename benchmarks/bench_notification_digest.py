@@ -0,0 +1,98 @@
+"""
+Outbound notification requests on a volatile day: one POST per
+run_alert_trigger call (the previous behaviour) vs NotificationDigest
+coalescing per (user, alert).
+
+Each alert fires SUB_CONDITIONS sub-conditions the way the drawdown / RSI
+handlers do, passing the same growing `alertTriggered` list every time.
+
+    python -m benchmarks.bench_notification_digest
+"""
+
+import asyncio
+import json
+from src.notification_digest import NotificationDigest
+
+USERS = 100
+ALERTS_PER_USER = 30
+SUB_CONDITIONS = 4
+
+
+class CountingSender:
+    def __init__(self):
+        self.requests = 0
+        self.entries = 0
+        self.bytes = 0
+
+    def __call__(self, alert, alert_triggered_list):
+        self.requests += 1
+        self.entries += len(alert_triggered_list)
+        payload = {"alertId": str(alert["_id"]), "alertList": alert_triggered_list}
+        self.bytes += len(json.dumps(payload))
+        return True
+
+
+def triggers():
+    """(alert, alertTriggered) as passed to run_alert_trigger, in order."""
+    for user in range(USERS):
+        for n in range(ALERTS_PER_USER):
+            alert = {
+                "_id": f"{user}-{n}",
+                "emailAddress": [f"user{user}@example.com"],
+                "userXTickerId": f"uxt-{user}-{n}",
+                "frequency": "ONCE_A_DAY",
+            }
+            alertTriggered = []
+            for k in range(SUB_CONDITIONS):
+                alertTriggered.append(
+                    {
+                        "advanceCondition": f"condition{k}",
+                        "condition": "DRAWDOWN",
+                        "subCondition": "",
+                        "alertTitle": f"Ticker {n} condition {k}",
+                        "alertMessage": f"Ticker {n} crossed threshold {k}.",
+                    }
+                )
+                yield alert, alertTriggered
+
+
+async def run_direct():
+    sender = CountingSender()
+    for alert, alertTriggered in triggers():
+        sender(alert, list(alertTriggered))
+    return sender
+
+
+async def run_digest():
+    sender = CountingSender()
+    digest = NotificationDigest(sender, window=0.05)
+    for alert, alertTriggered in triggers():
+        digest.submit(alert, alertTriggered)
+    await asyncio.sleep(0.1)
+    await digest.flush_all()
+    return sender
+
+
+def report(name, sender):
+    print(
+        f"{name:<10} {sender.requests:>7,} requests {sender.entries:>8,} entries "
+        f"{sender.bytes / 1024:>9.1f} KiB"
+    )
+
+
+def main():
+    print(
+        f"{USERS} users x {ALERTS_PER_USER} alerts x {SUB_CONDITIONS} sub-conditions\n"
+    )
+    direct = asyncio.run(run_direct())
+    digest = asyncio.run(run_digest())
+    report("direct", direct)
+    report("digest", digest)
+    print(
+        f"\nrequests -{100 * (1 - digest.requests / direct.requests):.0f}%, "
+        f"payload -{100 * (1 - digest.bytes / direct.bytes):.0f}%"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Encode/decode time and payload size of the redis_cache codecs on a
+20-year daily closing series.
+
+    python -m benchmarks.bench_redis_codec
+"""
+
+import json
+import timeit
+import numpy as np
+from src.utils.redis_cache import encode_value, decode_value, msgpack, orjson
+from src.utils.series import series_to_arrays
+
+YEARS = 20
+REPEAT = 50
+
+
+def make_series(years: int = YEARS):
+    dates = np.arange(
+        np.datetime64("2005-01-03"), np.datetime64("2005-01-03") + years * 365
+    )
+    dates = dates[np.is_busday(dates)]
+    rng = np.random.default_rng(42)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+    return [
+        {"time": str(d), "value": round(float(c), 4)} for d, c in zip(dates, closes)
+    ]
+
+
+def bench(name, encode, decode):
+    payload = encode()
+    enc = min(timeit.repeat(encode, number=1, repeat=REPEAT)) * 1000
+    dec = min(timeit.repeat(lambda: decode(payload), number=1, repeat=REPEAT)) * 1000
+    print(f"{name:<22} {len(payload):>10,} B {enc:>9.3f} ms {dec:>9.3f} ms")
+
+
+def main():
+    series = make_series()
+    arrays = series_to_arrays(series)
+    print(f"{len(series)} daily closes over {YEARS} years\n")
+    print(f"{'codec':<22} {'size':>12} {'encode':>12} {'decode':>12}")
+
+    # What get_ticker_closing_price used to store: JSON string inside JSON
+    bench(
+        "json (double-encoded)",
+        lambda: json.dumps(json.dumps(series)).encode(),
+        lambda p: json.loads(json.loads(p)),
+    )
+    bench("json", lambda: encode_value(series, "json"), decode_value)
+    if msgpack is not None:
+        bench("msgpack", lambda: encode_value(series, "msgpack"), decode_value)
+    if orjson is not None:
+        bench("orjson", lambda: encode_value(series, "orjson"), decode_value)
+    bench("numpy", lambda: encode_value(arrays, "numpy"), decode_value)
+
+
+if __name__ == "__main__":
+    main()
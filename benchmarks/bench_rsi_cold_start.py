@@ -0,0 +1,68 @@
+"""
+Cold-start RSI for 5,000 tickers: one pandas RSI per alert (the call shape
+of the previous pandas_ta path, Wilder smoothing as an adjust=False EWM)
+vs wilder_rsi_batch over 2-D blocks of RSI_BATCH_SIZE tickers, as
+IndicatorService.warm does.
+
+    python -m benchmarks.bench_rsi_cold_start
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from src.indicators import RSI_BATCH_SIZE, stack_right_aligned, wilder_rsi_batch
+
+TICKERS = 5000
+BARS = 2520  # ~10 years of daily closes
+PERIODS = (14,)
+
+
+def make_histories(tickers: int = TICKERS, bars: int = BARS):
+    rng = np.random.default_rng(11)
+    # Ragged, like real listings: some tickers have a shorter history
+    lengths = np.where(rng.random(tickers) < 0.2, rng.integers(50, bars, tickers), bars)
+    return [100 * np.exp(np.cumsum(rng.normal(0, 0.015, n))) for n in lengths.tolist()]
+
+
+def series_rsi(close: pd.Series, period: int) -> pd.Series:
+    change = close.diff()
+    gain = change.clip(lower=0).ewm(alpha=1 / period, adjust=False).mean()
+    loss = (-change.clip(upper=0)).ewm(alpha=1 / period, adjust=False).mean()
+    return 100 * gain / (gain + loss)
+
+
+def per_alert(histories, period):
+    return [series_rsi(pd.Series(closes), period).to_numpy() for closes in histories]
+
+
+def batched(histories, period):
+    out = []
+    for i in range(0, len(histories), RSI_BATCH_SIZE):
+        block = histories[i : i + RSI_BATCH_SIZE]
+        rsi = wilder_rsi_batch(stack_right_aligned(block), period)
+        out.extend(rsi[row, rsi.shape[1] - len(c) :] for row, c in enumerate(block))
+    return out
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    histories = make_histories()
+    print(f"{TICKERS} tickers, up to {BARS} daily closes, periods {PERIODS}\n")
+
+    for period in PERIODS:
+        slow, before = timed(per_alert, histories, period)
+        fast, after = timed(batched, histories, period)
+        # Same values as the per-alert path, warm-up window included
+        diff = max(np.nanmax(np.abs(a - b), initial=0.0) for a, b in zip(slow, fast))
+        print(f"RSI({period}) per alert (pandas)     {before * 1000:>9.1f} ms")
+        print(f"RSI({period}) 2-D batch               {after * 1000:>9.1f} ms")
+        print(f"speed-up {before / after:.1f}x, max |diff| {diff:.2e}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,702 @@
+"""
+Local stand-ins for the services the alert engine talks to, used by
+benchmarks.soak:
+
+- InMemoryRedis: the subset of redis.asyncio the engine uses (strings,
+  hashes, expiry, MULTI/EXEC pipelines and consumer-group streams)
+- FakeDatabase: a Mongo stand-in whose aggregate() understands the stages
+  the src.alerts pipelines use
+- SimulatedMarket: seeded tickers, closing/PE histories, index members and
+  a live price path per ticker
+- ShipraServer: HTTP server for the closing price, PE, index performance
+  and alert send endpoints
+- QuoteServer: WebSocket server speaking the Yahoo streamer protocol
+  (base64 PricingData protobufs) at a configurable tick rate
+- FakeYFinance: drop-in for the `yf` module attribute of modules calling
+  yf.Ticker(...).history(...), serving in-memory daily bars
+"""
+
+import asyncio
+import base64
+import json
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+from bson import ObjectId
+from redis.exceptions import ResponseError
+from websockets.asyncio.server import serve
+from yfinance.pricing_pb2 import PricingData
+
+# ---------------------------------------------------------------------------
+# Redis
+# ---------------------------------------------------------------------------
+
+
+def _to_bytes(value):
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+def _stream_id(entry_id):
+    ms, seq = str(entry_id).split("-")
+    return int(ms), int(seq)
+
+
+class _RedisStore:
+    def __init__(self):
+        self.values = {}  # key -> bytes | {field: bytes} | stream dict
+        self.expires = {}  # key -> monotonic deadline
+        self.last_id = (0, 0)
+        self.stream_added = None  # asyncio.Event, created on first use
+        self.commands = defaultdict(int)
+
+    def alive(self, key):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.values
+
+    def stream(self, name, create=False):
+        if not self.alive(name):
+            if not create:
+                return None
+            self.values[name] = {"entries": [], "groups": {}}
+        return self.values[name]
+
+    def next_id(self):
+        ms = int(time.time() * 1000)
+        seq = self.last_id[1] + 1 if ms <= self.last_id[0] else 0
+        self.last_id = (max(ms, self.last_id[0]), seq)
+        return f"{self.last_id[0]}-{self.last_id[1]}"
+
+
+class InMemoryRedis:
+    """
+    Single-process replacement for a redis.asyncio client. Two instances
+    sharing a store behave like the text and binary clients of
+    src.utils.redis_cache.
+    """
+
+    def __init__(self, decode_responses=True, store=None):
+        self.decode = decode_responses
+        self.store = store if store is not None else _RedisStore()
+        self.commands = self.store.commands
+
+    def _out(self, value):
+        if value is None or not self.decode:
+            return value
+        return value.decode()
+
+    def _fields(self, fields):
+        return {self._out(_to_bytes(k)): self._out(v) for k, v in fields.items()}
+
+    # -- strings / keys --------------------------------------------------
+
+    async def get(self, key):
+        self.commands["get"] += 1
+        if not self.store.alive(key):
+            return None
+        return self._out(self.store.values[key])
+
+    async def set(self, key, value, ex=None):
+        self.commands["set"] += 1
+        self.store.values[key] = _to_bytes(value)
+        self.store.expires.pop(key, None)
+        if ex is not None:
+            self.store.expires[key] = time.monotonic() + ex
+        return True
+
+    async def delete(self, *keys):
+        self.commands["delete"] += 1
+        removed = 0
+        for key in keys:
+            removed += self.store.alive(key)
+            self.store.values.pop(key, None)
+            self.store.expires.pop(key, None)
+        return removed
+
+    async def expire(self, key, seconds):
+        self.commands["expire"] += 1
+        if not self.store.alive(key):
+            return False
+        self.store.expires[key] = time.monotonic() + seconds
+        return True
+
+    async def publish(self, channel, message):
+        self.commands["publish"] += 1
+        return 0
+
+    # -- hashes ----------------------------------------------------------
+
+    async def hset(self, key, mapping):
+        self.commands["hset"] += 1
+        if not self.store.alive(key):
+            self.store.values[key] = {}
+        self.store.values[key].update(
+            {_to_bytes(k): _to_bytes(v) for k, v in mapping.items()}
+        )
+        return len(mapping)
+
+    async def hgetall(self, key):
+        self.commands["hgetall"] += 1
+        if not self.store.alive(key):
+            return {}
+        return self._fields(self.store.values[key])
+
+    # -- streams ---------------------------------------------------------
+
+    def _notify_stream(self):
+        if self.store.stream_added is not None:
+            self.store.stream_added.set()
+
+    async def xadd(self, name, fields, maxlen=None, approximate=True):
+        self.commands["xadd"] += 1
+        stream = self.store.stream(name, create=True)
+        entry_id = self.store.next_id()
+        stream["entries"].append(
+            (entry_id, {_to_bytes(k): _to_bytes(v) for k, v in fields.items()})
+        )
+        if maxlen is not None and len(stream["entries"]) > maxlen:
+            del stream["entries"][: len(stream["entries"]) - maxlen]
+        self._notify_stream()
+        return self._out(entry_id.encode())
+
+    async def xgroup_create(self, name, groupname, id="$", mkstream=False):
+        self.commands["xgroup_create"] += 1
+        stream = self.store.stream(name, create=mkstream)
+        if stream is None:
+            raise ResponseError("ERR The XGROUP subcommand requires the key to exist")
+        if groupname in stream["groups"]:
+            raise ResponseError("BUSYGROUP Consumer Group name already exists")
+        last = stream["entries"][-1][0] if id == "$" and stream["entries"] else "0-0"
+        stream["groups"][groupname] = {"last": _stream_id(last), "pending": {}}
+        return True
+
+    def _entry(self, entry_id, fields):
+        return (self._out(entry_id.encode()), self._fields(fields))
+
+    async def xreadgroup(
+        self, groupname, consumername, streams, count=None, block=None
+    ):
+        self.commands["xreadgroup"] += 1
+        deadline = time.monotonic() + (block or 0) / 1000
+        while True:
+            response = []
+            for name in streams:
+                group = self.store.stream(name)["groups"][groupname]
+                entries = self.store.stream(name)["entries"]
+                new = [e for e in entries if _stream_id(e[0]) > group["last"]]
+                new = new[:count] if count else new
+                for entry_id, _ in new:
+                    group["last"] = _stream_id(entry_id)
+                    group["pending"][entry_id] = [consumername, time.monotonic(), 1]
+                if new:
+                    response.append(
+                        (self._out(name.encode()), [self._entry(*e) for e in new])
+                    )
+            remaining = deadline - time.monotonic()
+            if response or block is None or remaining <= 0:
+                return response
+            if self.store.stream_added is None:
+                self.store.stream_added = asyncio.Event()
+            self.store.stream_added.clear()
+            try:
+                await asyncio.wait_for(self.store.stream_added.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    async def xack(self, name, groupname, *ids):
+        self.commands["xack"] += 1
+        stream = self.store.stream(name)
+        if stream is None:
+            return 0
+        pending = stream["groups"][groupname]["pending"]
+        return sum(pending.pop(_to_bytes(i).decode(), None) is not None for i in ids)
+
+    async def xautoclaim(
+        self, name, groupname, consumername, min_idle_time, start_id="0-0", count=None
+    ):
+        self.commands["xautoclaim"] += 1
+        stream = self.store.stream(name)
+        pending = stream["groups"][groupname]["pending"]
+        fields = dict(stream["entries"])
+        now = time.monotonic()
+        claimed, deleted = [], []
+        for entry_id in sorted(pending, key=_stream_id):
+            if _stream_id(entry_id) < _stream_id(start_id):
+                continue
+            if count and len(claimed) >= count:
+                return [self._out(entry_id.encode()), claimed, deleted]
+            info = pending[entry_id]
+            if (now - info[1]) * 1000 < min_idle_time:
+                continue
+            if entry_id not in fields:
+                del pending[entry_id]
+                deleted.append(self._out(entry_id.encode()))
+                continue
+            info[0], info[1], info[2] = consumername, now, info[2] + 1
+            claimed.append(self._entry(entry_id, fields[entry_id]))
+        return [self._out(b"0-0"), claimed, deleted]
+
+    async def xpending_range(
+        self, name, groupname, min, max, count, consumername=None, idle=None
+    ):
+        self.commands["xpending_range"] += 1
+        pending = self.store.stream(name)["groups"][groupname]["pending"]
+        now = time.monotonic()
+        low, high = _stream_id(min), _stream_id(max)
+        rows = []
+        for entry_id in sorted(pending, key=_stream_id):
+            consumer, delivered_at, times = pending[entry_id]
+            if not low <= _stream_id(entry_id) <= high:
+                continue
+            if consumername is not None and consumer != consumername:
+                continue
+            rows.append(
+                {
+                    "message_id": self._out(entry_id.encode()),
+                    "consumer": self._out(consumer.encode()),
+                    "time_since_delivered": int((now - delivered_at) * 1000),
+                    "times_delivered": times,
+                }
+            )
+        return rows[:count]
+
+    def stream_backlog(self, name, groupname):
+        """Entries the group has not read yet plus those read but not acked."""
+        stream = self.store.stream(name)
+        if stream is None or groupname not in stream["groups"]:
+            return 0
+        group = stream["groups"][groupname]
+        unread = sum(_stream_id(e[0]) > group["last"] for e in stream["entries"])
+        return unread + len(group["pending"])
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+
+class _Pipeline:
+    """Queues commands and runs them back to back, like MULTI/EXEC."""
+
+    def __init__(self, client):
+        self.client = client
+        self.queued = []
+
+    def __getattr__(self, name):
+        command = getattr(self.client, name)
+
+        def queue(*args, **kwargs):
+            self.queued.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        # The queued commands never suspend, so no other task runs between
+        # them: the batch is applied atomically
+        coros = [command(*args, **kwargs) for command, args, kwargs in self.queued]
+        self.queued = []
+        return [await coro for coro in coros]
+
+
+# ---------------------------------------------------------------------------
+# Mongo
+# ---------------------------------------------------------------------------
+
+
+def _get_path(doc, path):
+    for part in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def _resolve(doc, expression):
+    if expression == "$$ROOT":
+        return doc
+    if isinstance(expression, str) and expression.startswith("$"):
+        return _get_path(doc, expression[1:])
+    if isinstance(expression, dict):
+        return {k: _resolve(doc, v) for k, v in expression.items()}
+    return expression
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return self.docs if length is None else self.docs[:length]
+
+
+class FakeCollection:
+    def __init__(self, db, docs):
+        self.db = db
+        self.docs = docs
+
+    def aggregate(self, pipeline):
+        docs = [dict(d) for d in self.docs]
+        for stage in pipeline:
+            ((op, spec),) = stage.items()
+            docs = getattr(self, f"_stage_{op[1:]}")(docs, spec)
+        return _Cursor(docs)
+
+    def _stage_match(self, docs, spec):
+        return [d for d in docs if all(_get_path(d, k) == v for k, v in spec.items())]
+
+    def _stage_lookup(self, docs, spec):
+        index = defaultdict(list)
+        for foreign in self.db[spec["from"]].docs:
+            index[_get_path(foreign, spec["foreignField"])].append(foreign)
+        return [
+            {**d, spec["as"]: list(index.get(_get_path(d, spec["localField"]), ()))}
+            for d in docs
+        ]
+
+    def _stage_unwind(self, docs, spec):
+        path = spec["path"][1:] if isinstance(spec, dict) else spec[1:]
+        keep_empty = isinstance(spec, dict) and spec.get("preserveNullAndEmptyArrays")
+        out = []
+        for d in docs:
+            values = d.get(path) or []
+            if not values and keep_empty:
+                out.append({k: v for k, v in d.items() if k != path})
+            out.extend({**d, path: v} for v in values)
+        return out
+
+    def _stage_replaceRoot(self, docs, spec):
+        root = spec["newRoot"]
+        if "$mergeObjects" not in root:
+            return [_resolve(d, root) for d in docs]
+        out = []
+        for d in docs:
+            merged = {}
+            for part in root["$mergeObjects"]:
+                merged.update(_resolve(d, part) or {})
+            out.append(merged)
+        return out
+
+    def _stage_project(self, docs, spec):
+        if any(spec.values()):
+            raise NotImplementedError("only exclusion projections are supported")
+        return [{k: v for k, v in d.items() if k not in spec} for d in docs]
+
+
+class FakeDatabase:
+    def __init__(self, collections: dict):
+        self.collections = {
+            name: FakeCollection(self, docs) for name, docs in collections.items()
+        }
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, FakeCollection(self, []))
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+
+# ---------------------------------------------------------------------------
+# Market data
+# ---------------------------------------------------------------------------
+
+
+class SimulatedMarket:
+    """
+    Tickers with two years of daily closes ending yesterday and a live
+    random walk around the last close. Each ticker crashes to half its
+    all-time low at `crash_at[ticker]` (epoch seconds), which triggers every
+    DRAWDOWN priceSurpassMultipleHistoricalDrawdown alert on it: the
+    tick-to-notification latency is measured from that moment.
+    """
+
+    def __init__(self, tickers: int, days: int = 504, seed: int = 42):
+        rng = np.random.default_rng(seed)
+        self.rng = rng
+        self.tickers = [f"SOAK{i}" for i in range(tickers)]
+        today = np.datetime64(time.strftime("%Y-%m-%d"))
+        dates = np.arange(today - int(days * 1.6), today)
+        self.dates = np.datetime_as_string(dates[np.is_busday(dates)][-days:])
+        self.closes = {}
+        self.pe = {}
+        for ticker in self.tickers:
+            closes = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, days)))
+            self.closes[ticker] = closes
+            self.pe[ticker] = closes / rng.uniform(2, 8)
+        self.price = {t: float(c[-1]) for t, c in self.closes.items()}
+        self.crash_at = {}
+        self.indices = {}
+
+    def schedule_crashes(self, start: float, duration: float, window=(0.1, 0.6)):
+        for ticker in self.tickers:
+            self.crash_at[ticker] = start + duration * self.rng.uniform(*window)
+
+    def series(self, values: dict, ticker: str):
+        return [
+            {"time": t, "value": round(float(v), 4)}
+            for t, v in zip(self.dates, values.get(ticker, ()))
+        ]
+
+    def tick(self, ticker: str, now: float):
+        crash = self.crash_at.get(ticker)
+        if crash is not None and now >= crash:
+            return float(self.closes[ticker].min()) * 0.5
+        last = float(self.closes[ticker][-1])
+        # Mean-reverting walk that stays within a few percent of the close
+        price = self.price[ticker] * (1 + self.rng.normal(0, 0.001))
+        price = min(max(price, last * 0.97), last * 1.03)
+        self.price[ticker] = price
+        return price
+
+
+# ---------------------------------------------------------------------------
+# HTTP (Shipra APIs)
+# ---------------------------------------------------------------------------
+
+
+class ShipraServer:
+    """Threaded HTTP stand-in for both Shipra API hosts."""
+
+    def __init__(self, market: SimulatedMarket, latency: float = 0.0):
+        self.market = market
+        self.latency = latency
+        self.notifications = []  # (received epoch seconds, payload)
+        self.requests = defaultdict(int)
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                received = time.time()
+                payload = json.loads(body or b"{}")
+                with server.lock:
+                    server.requests[self.path] += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                status, response = server.route(self.path, payload, received)
+                data = json.dumps(response).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def route(self, path, payload, received):
+        market = self.market
+        match path:
+            case "/ticker-closing-price":
+                return 200, market.series(market.closes, payload["ticker"])
+            case "/ticker-pe-ratio":
+                return 200, market.series(market.pe, payload["ticker"])
+            case "/index-get-performance":
+                members = market.indices.get(payload["ticker"], [])
+                return 200, [{"ticker": t} for t in members]
+            case "/admin/alert/send":
+                with self.lock:
+                    self.notifications.append((received, payload))
+                return 200, {"ok": True}
+        return 404, {"error": f"unknown path {path}"}
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.httpd.shutdown()
+
+
+# ---------------------------------------------------------------------------
+# yfinance history
+# ---------------------------------------------------------------------------
+
+
+class _FakeTicker:
+    def __init__(self, bars):
+        self.bars = bars
+
+    def history(self, period=None, interval="1d", start=None, end=None, **kwargs):
+        bars = self.bars
+        if bars is None:
+            return pd.DataFrame(columns=["Open", "High", "Low", "Close"])
+        if start is not None:
+            bars = bars[bars.index >= pd.Timestamp(start, tz=bars.index.tz)]
+        if end is not None:
+            bars = bars[bars.index < pd.Timestamp(end, tz=bars.index.tz)]
+        return bars
+
+
+class FakeYFinance:
+    """`yf` stand-in: Ticker(symbol).history(...) slices `bars[symbol]`."""
+
+    def __init__(self, bars: dict):
+        self.bars = bars  # symbol -> DataFrame of Open/High/Low/Close
+
+    def Ticker(self, symbol):
+        return _FakeTicker(self.bars.get(symbol))
+
+    @staticmethod
+    def daily_bars(dates, closes, tz="America/New_York", seed=0):
+        """Open/High/Low/Close bars around `closes`, like yf history()."""
+        rng = np.random.default_rng(seed)
+        spread = np.abs(rng.normal(0, 0.01, len(closes))) * closes
+        opens = np.concatenate([[closes[0]], closes[:-1]])
+        index = pd.DatetimeIndex(dates).tz_localize(tz)
+        return pd.DataFrame(
+            {
+                "Open": opens,
+                "High": np.maximum(opens, closes) + spread,
+                "Low": np.minimum(opens, closes) - spread,
+                "Close": closes,
+            },
+            index=index,
+        )
+
+
+# ---------------------------------------------------------------------------
+# WebSocket (Yahoo streamer)
+# ---------------------------------------------------------------------------
+
+
+def encode_tick(symbol: str, price: float, now: float) -> str:
+    data = PricingData(id=symbol, price=price, time=int(now * 1000))
+    message = base64.b64encode(data.SerializeToString()).decode()
+    return json.dumps({"message": message})
+
+
+class QuoteServer:
+    """Streams `tick_rate` ticks per second for every subscribed symbol."""
+
+    def __init__(self, market: SimulatedMarket, tick_rate: float):
+        self.market = market
+        self.tick_rate = tick_rate
+        self.sent = defaultdict(int)
+        self.connections = 0
+        self.server = None
+        self.url = None
+
+    async def _handle(self, ws):
+        self.connections += 1
+        symbols = set()
+
+        async def read_subscriptions():
+            async for raw in ws:
+                message = json.loads(raw)
+                symbols.update(message.get("subscribe", ()))
+                symbols.difference_update(message.get("unsubscribe", ()))
+
+        reader = asyncio.create_task(read_subscriptions())
+        interval = 1 / self.tick_rate
+        try:
+            while not reader.done():
+                started = time.perf_counter()
+                for symbol in tuple(symbols):
+                    now = time.time()
+                    await ws.send(
+                        encode_tick(symbol, self.market.tick(symbol, now), now)
+                    )
+                    self.sent[symbol] += 1
+                await asyncio.sleep(
+                    max(0.0, interval - (time.perf_counter() - started))
+                )
+        except Exception:
+            pass  # client went away
+        finally:
+            reader.cancel()
+            self.connections -= 1
+
+    async def start(self):
+        self.server = await serve(self._handle, "127.0.0.1", 0, max_queue=None)
+        port = self.server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+def seed_collections(market: SimulatedMarket, alerts_per_ticker: int, seed: int = 42):
+    """
+    WP_TICKER_ALERT, REG_USER_X_TICKER, REG_WATCH_X_TICKER and REG_TICKER
+    documents: per ticker, `alerts_per_ticker` STOCKS alerts alternating
+    DRAWDOWN and CROSS_JUNCTION; plus one WATCHLIST alert per 10 tickers
+    and one INDEX alert on an index made of every 5th ticker.
+    """
+    rng = np.random.default_rng(seed)
+    reg_ticker, user_x_ticker, watch_x_ticker, alerts = [], [], [], []
+    ticker_docs = {}
+    for ticker in market.tickers + ["^SOAK"]:
+        doc = {"_id": ObjectId(), "ticker": ticker, "nm": f"{ticker} Inc."}
+        ticker_docs[ticker] = doc
+        reg_ticker.append(doc)
+    market.indices["^SOAK"] = market.tickers[::5]
+
+    def alert(n, **fields):
+        kind = "DRAWDOWN" if n % 2 == 0 else "CROSS_JUNCTION"
+        doc = {
+            "_id": ObjectId(),
+            "status": "ACTIVE",
+            "condition": kind,
+            "subCondition": "",
+            "frequency": "ONCE_A_DAY",
+            "emailAddress": [f"user{int(rng.integers(0, 1000))}@soak.test"],
+            **fields,
+        }
+        if kind == "DRAWDOWN":
+            doc["drawdownAdvanceCondition"] = {
+                "priceSurpassMultipleHistoricalDrawdown": True,
+                "nearLastDrawdown": True,
+                "nearLastDrawdownValue": 5,
+            }
+        else:
+            doc["crossJunctionWindow"] = [5, 20]
+            doc["crossJunctionAdvanceCondition"] = {
+                "goldenCross": True,
+                "deathCross": True,
+            }
+        return doc
+
+    for ticker in market.tickers:
+        for n in range(alerts_per_ticker):
+            link = {"_id": ObjectId(), "tickerId": ticker_docs[ticker]["_id"]}
+            user_x_ticker.append(link)
+            alerts.append(alert(n, alerCreateType="STOCKS", userXTickerId=link["_id"]))
+
+    for w, start in enumerate(range(0, len(market.tickers), 10)):
+        watchlistId = ObjectId()
+        for ticker in market.tickers[start : start + 10]:
+            watch_x_ticker.append(
+                {
+                    "_id": ObjectId(),
+                    "watchlistId": watchlistId,
+                    "tickerId": ticker_docs[ticker]["_id"],
+                }
+            )
+        alerts.append(alert(w, alerCreateType="WATCHLIST", watchlistId=watchlistId))
+
+    link = {"_id": ObjectId(), "tickerId": ticker_docs["^SOAK"]["_id"]}
+    user_x_ticker.append(link)
+    alerts.append(alert(0, alerCreateType="INDEX", userXTickerId=link["_id"]))
+
+    return {
+        "WP_TICKER_ALERT": alerts,
+        "REG_USER_X_TICKER": user_x_ticker,
+        "REG_WATCH_X_TICKER": watch_x_ticker,
+        "REG_TICKER": reg_ticker,
+    }
@@ -0,0 +1,221 @@
+"""
+End-to-end soak / load test: runs alerts_script.main() (and an outbox
+notification worker) for a fixed duration against local stand-ins for
+every external service (benchmarks.fakes): a Yahoo-protocol WebSocket
+server, the Shipra HTTP APIs, an in-memory Redis and a seeded Mongo.
+
+Every ticker crashes below its all-time low once during the run; the
+report gives the crash-tick to notification latency, tick delivery lag,
+dropped ticks and memory growth.
+
+    python -m benchmarks.soak --duration 120 --tickers 100 --tick-rate 5
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import resource
+import sys
+import time
+import numpy as np
+from benchmarks.fakes import (
+    FakeDatabase,
+    InMemoryRedis,
+    QuoteServer,
+    ShipraServer,
+    SimulatedMarket,
+    seed_collections,
+)
+
+LATENCY_KEY = "priceSurpassMultipleHistoricalDrawdown"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--alerts-per-ticker", type=int, default=4)
+    parser.add_argument("--tick-rate", type=float, default=5, help="ticks/s/ticker")
+    parser.add_argument(
+        "--api-latency", type=float, default=0.0, help="seconds per fake API call"
+    )
+    parser.add_argument("--digest-seconds", type=float, default=0.5)
+    parser.add_argument("--delivery", choices=("outbox", "direct"), default="outbox")
+    parser.add_argument("--verbose", action="store_true", help="keep engine output")
+    return parser.parse_args(argv)
+
+
+def rss_mib():
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentiles(values, label, unit="ms", scale=1000):
+    if not values:
+        return f"{label:<28} n/a"
+    v = np.asarray(values) * scale
+    return (
+        f"{label:<28} p50 {np.percentile(v, 50):>8.1f}  p95 {np.percentile(v, 95):>8.1f}"
+        f"  p99 {np.percentile(v, 99):>8.1f}  max {v.max():>8.1f} {unit}"
+    )
+
+
+def configure_environment(args, shipra, quotes):
+    """Point the engine at the stand-ins; must run before importing src."""
+    os.environ.update(
+        {
+            "SHIPRA_PYTHON_API_URL": shipra.url,
+            "SHIPRA_API_URL": shipra.url,
+            "YF_WEBSOCKET_URL": quotes.url,
+            "NOTIFICATION_ENV": "production",
+            "NODE_AUTH_TOKEN": "soak",
+            "NOTIFICATION_DELIVERY": args.delivery,
+            "NOTIFICATION_DIGEST_SECONDS": str(args.digest_seconds),
+            "ALERTS_MODE": "stream",
+            "SCHEDULE_BY_SESSION": "false",
+            "STREAM_STALE_SECONDS": str(max(args.duration, 300)),
+            "NEWS_SOURCE": "local",
+            "NEWS_FEED_PATH": os.devnull,
+            "DATABASE_NAME": "soak",
+        }
+    )
+
+
+async def soak(args):
+    market = SimulatedMarket(args.tickers)
+    shipra = ShipraServer(market, latency=args.api_latency)
+    quotes = QuoteServer(market, args.tick_rate)
+    shipra.start()
+    await quotes.start()
+    configure_environment(args, shipra, quotes)
+
+    import alerts_script
+    import src.alerts
+    from src.alert_trigger import send_alert_notification
+    from src.notification_outbox import OUTBOX_GROUP, OUTBOX_STREAM, OutboxWorker
+    from src.utils import metrics, redis_cache
+
+    store = InMemoryRedis().store
+    redis_cache.redis_client = InMemoryRedis(True, store)
+    redis_cache.redis_binary_client = InMemoryRedis(False, store)
+    src.alerts.db = FakeDatabase(seed_collections(market, args.alerts_per_ticker))
+
+    # Count what reaches the engine and how late it is
+    received, lags = {}, []
+    evaluate = alerts_script.check_alert_conditions
+
+    async def counted(ticker, alerts, msg, **kwargs):
+        received[ticker] = received.get(ticker, 0) + 1
+        if "time" in msg:
+            lags.append(time.time() - int(msg["time"]) / 1000)
+        return await evaluate(ticker, alerts, msg, **kwargs)
+
+    alerts_script.check_alert_conditions = counted
+
+    memory = [(0.0, rss_mib())]
+    start = time.time()
+    market.schedule_crashes(start, args.duration)
+    tasks = [asyncio.create_task(alerts_script.main())]
+    if args.delivery == "outbox":
+        worker = OutboxWorker(send_alert_notification, consumer="soak")
+        tasks.append(asyncio.create_task(worker.run()))
+
+    while time.time() - start < args.duration:
+        await asyncio.sleep(1)
+        memory.append((time.time() - start, rss_mib()))
+        for task in tasks:
+            if task.done() and task.exception():
+                raise task.exception()
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    # Let in-flight notification requests land
+    await asyncio.sleep(0.5)
+    await quotes.stop()
+    shipra.stop()
+
+    return {
+        "market": market,
+        "shipra": shipra,
+        "quotes": quotes,
+        "received": received,
+        "lags": lags,
+        "memory": memory,
+        "outbox_backlog": redis_cache.redis_client.stream_backlog(
+            OUTBOX_STREAM, OUTBOX_GROUP
+        ),
+        "redis_commands": dict(redis_cache.redis_client.commands),
+        "metrics": metrics.snapshot(),
+    }
+
+
+def notification_latencies(market, notifications):
+    """Crash tick -> alert send request, per triggered LATENCY_KEY entry."""
+    latencies, early = [], 0
+    for received_at, payload in notifications:
+        for entry in payload.get("alertList", []):
+            if entry.get("advanceCondition") != LATENCY_KEY:
+                continue
+            ticker = entry["alertTitle"].split(" ")[0]
+            crash = market.crash_at.get(ticker)
+            if crash is None or received_at < crash:
+                early += 1
+            else:
+                latencies.append(received_at - crash)
+    return latencies, early
+
+
+def report(args, result):
+    market, shipra, quotes = result["market"], result["shipra"], result["quotes"]
+    sent = sum(quotes.sent.values())
+    received = sum(result["received"].values())
+    latencies, early = notification_latencies(market, shipra.notifications)
+    entries = sum(len(p.get("alertList", [])) for _, p in shipra.notifications)
+    times, rss = zip(*result["memory"])
+    half = len(rss) // 2
+    slope = np.polyfit(times[half:], rss[half:], 1)[0] * 60 if half > 1 else 0.0
+
+    print(
+        f"\n{args.tickers} tickers x {args.tick_rate:g} ticks/s, "
+        f"{args.alerts_per_ticker} alerts/ticker, {args.duration:g} s, "
+        f"delivery={args.delivery}\n"
+    )
+    print(f"ticks sent {sent:,}  received {received:,}  ", end="")
+    print(
+        f"dropped {sent - received:,} ({100 * (sent - received) / max(sent, 1):.2f}%)"
+    )
+    print(percentiles(result["lags"], "tick delivery lag"))
+    print(
+        f"notifications {len(shipra.notifications):,} requests, {entries:,} entries; "
+        f"{len(latencies)} crash triggers measured, {early} before the crash"
+    )
+    print(percentiles(latencies, "crash -> notification"))
+    print(f"outbox backlog at stop {result['outbox_backlog']}")
+    print(
+        f"RSS start {rss[0]:.1f} MiB  end {rss[-1]:.1f} MiB  peak {max(rss):.1f} MiB  "
+        f"second-half growth {slope:+.2f} MiB/min"
+    )
+    print(f"API requests {dict(shipra.requests)}")
+    print(f"Redis commands {result['redis_commands']}")
+    counters = result["metrics"].get("counters", {})
+    if counters:
+        print(f"engine counters {counters}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sink = contextlib.nullcontext() if args.verbose else open(os.devnull, "w")
+    with sink as devnull:
+        with contextlib.redirect_stdout(devnull or sys.stdout):
+            result = asyncio.run(soak(args))
+    report(args, result)
+
+
+if __name__ == "__main__":
+    main()
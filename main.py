@@ -1,57 +1,83 @@
-from typing import Union
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-import yfinance as yf
+from fastapi import Body, FastAPI, HTTPException, WebSocket
 import asyncio
+import json
 import logging
-from src.alert_engine import run_alerts
-from src.alerts import fetch_stock_alerts_from_db
-from src.utils.db import get_database
+import os
+from src.alert_jobs import start_alert_job, get_alert_job
+from src.apis.get_ticker_closing_price import get_ticker_closing_price
+from src.apis.get_ticker_pe_ratio import get_ticker_pe_ratio
+from src.backtest import BACKTEST_SERIES, backtest_alert
+from src.compute import run_compute
+from src.utils.series import series_to_arrays
+from src.quote_hub import hub
+from src.quote_snapshot import quotes
 import time
-from datetime import datetime
-from bson.json_util import dumps
+
+try:
+    import msgpack
+except ImportError:  # binary frames are optional
+    msgpack = None
 
 app = FastAPI()
-db = get_database()
 
 
 # Regular HTTP route
 @app.get("/")
-def read_root():
-    ticker = yf.Ticker("LSEG.L")
-    info = ticker.info
-    return {
-        "symbol": "LSEG.L",
-        "company_name": info.get("longName"),
-        "current_price": info.get("currentPrice"),
-    }
+async def read_root():
+    return await read_quote("LSEG.L")
+
+
+@app.get("/quote/{symbol}")
+async def read_quote(symbol: str):
+    try:
+        return await quotes.get_quote(symbol)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Quote unavailable: {e}")
 
 
 @app.get("/alerts")
 async def read_alerts():
-    # Record start time
-    start_time = time.time()
-    start_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-
-    print(f"[START] Execution started at: {start_datetime}")
+    # Evaluation runs in the background; poll /alerts/jobs/{job_id} for status
+    job = start_alert_job()
+    print(f"[START] Alert job {job['job_id']} queued at: {job['created_at']}")
+    return {"job_id": job["job_id"], "status": job["status"]}
+
+
+@app.get("/alerts/jobs/{job_id}")
+async def read_alert_job(job_id: str):
+    job = get_alert_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.post("/backtest")
+async def backtest(alert: dict = Body(...)):
+    """
+    How often an alert (WP_TICKER_ALERT document) would have fired over its
+    ticker's daily history: firing dates and counts per advance key.
+    """
+    ticker = alert.get("tickerNm") or (alert.get("ticker") or {}).get("ticker")
+    series = BACKTEST_SERIES.get(alert.get("condition"))
+    if not ticker or series is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Backtest needs a ticker and one of {sorted(BACKTEST_SERIES)}",
+        )
 
     try:
-
-        items = await fetch_stock_alerts_from_db()
-        await run_alerts(items)
-
-        return {
-            "count": len(items),
-        }
+        if series == "close":
+            closes, pe = series_to_arrays(await get_ticker_closing_price(ticker)), None
+        else:
+            closes, pe = None, series_to_arrays(await get_ticker_pe_ratio(ticker))
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-    finally:
-        # Calculate execution time
-        end_time = time.time()
-        end_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        execution_time = end_time - start_time
+        raise HTTPException(status_code=502, detail=f"History unavailable: {e}")
 
-        print(f"[END] Execution ended at: {end_datetime}")
-        print(f"[DURATION] Total execution time: {execution_time:.3f} seconds")
+    try:
+        result = await run_compute(backtest_alert, alert, closes, pe, name="backtest")
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid alert: {e!r}")
+    return {"ticker": ticker, **result}
 
 
 # --- NEW SECTION: WebSocket streaming endpoint ---
@@ -64,47 +90,144 @@ async def websocket_endpoint(websocket: WebSocket, symbol: str):
     await websocket.accept()
     logger.info(f"Client connected for symbol: {symbol}")
 
-    yf_ws = None  # Define early for safe reference in finally
+    # Shares one upstream yfinance subscription per symbol across clients
+    sub = await hub.subscribe(symbol)
+
+    async def send_loop():
+        while True:
+            msg = await sub.queue.get()
+            await websocket.send_json(msg)
+
+    async def receive_loop():
+        # Returns once the client goes away
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+    tasks = [
+        asyncio.create_task(send_loop()),
+        asyncio.create_task(receive_loop()),
+    ]
     try:
-        async with yf.AsyncWebSocket() as ws:
-            yf_ws = ws
-            await ws.subscribe([symbol])
-
-            # Flag to control message sending
-            disconnected = asyncio.Event()
-
-            async def on_message(msg: dict):
-                if disconnected.is_set():
-                    return  # Don't try sending after disconnect
-                try:
-                    await websocket.send_json(msg)
-                except Exception as send_err:
-                    logger.warning(f"Client disconnected or send failed: {send_err}")
-                    disconnected.set()
-                    await websocket.close()
-                    # Stop yf listener immediately
-                    await ws.close()
-
-            listen_task = asyncio.create_task(ws.listen(on_message))
-
-            # Wait until the client disconnects or an exception occurs
-            done, pending = await asyncio.wait(
-                [listen_task], return_when=asyncio.FIRST_EXCEPTION
-            )
-
-            for task in pending:
-                task.cancel()
-
-    except WebSocketDisconnect:
-        logger.info(f"Client disconnected from symbol: {symbol}")
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(
+                    f"Client disconnected or send failed: {task.exception()}"
+                )
     except Exception as e:
         logger.exception(f"Error in websocket for {symbol}: {e}")
     finally:
-        # Explicitly close Yahoo WebSocket if still open
-        if yf_ws is not None:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await hub.unsubscribe(sub)
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+        logger.info(
+            f"WebSocket for {symbol} closed cleanly (dropped {sub.dropped} messages)."
+        )
+
+
+MAX_SYMBOLS_PER_CONNECTION = int(os.getenv("WS_MAX_SYMBOLS_PER_CONNECTION", "200"))
+
+
+@app.websocket("/ws")
+async def multi_symbol_websocket_endpoint(
+    websocket: WebSocket,
+    symbols: str = "",
+    interval_ms: int = 250,
+    encoding: str = "json",
+):
+    """
+    Stream many symbols over one connection.
+
+    Quotes are conflated per symbol (only the latest one is kept) and sent
+    as a single batched frame every `interval_ms`. With `encoding=msgpack`
+    frames are sent as binary msgpack instead of JSON text.
+
+    Clients can change their watchlist at any time by sending
+    `{"action": "subscribe" | "unsubscribe", "symbols": [...]}`.
+    """
+    await websocket.accept()
+
+    if encoding == "msgpack" and msgpack is None:
+        encoding = "json"
+    interval = max(interval_ms, 10) / 1000
+
+    subs = {}  # symbol -> Subscription
+
+    async def add_symbols(new_symbols):
+        for symbol in new_symbols:
+            if symbol in subs or len(subs) >= MAX_SYMBOLS_PER_CONNECTION:
+                continue
+            # A queue of one conflates to the latest quote per symbol
+            subs[symbol] = await hub.subscribe(symbol, maxsize=1)
+
+    async def remove_symbols(old_symbols):
+        for symbol in old_symbols:
+            sub = subs.pop(symbol, None)
+            if sub is not None:
+                await hub.unsubscribe(sub)
+
+    async def send_loop():
+        while True:
+            await asyncio.sleep(interval)
+            batch = {}
+            for symbol, sub in subs.items():
+                if not sub.queue.empty():
+                    batch[symbol] = sub.queue.get_nowait()
+            if not batch:
+                continue
+
+            frame = {"type": "batch", "time": int(time.time() * 1000), "quotes": batch}
+            if encoding == "msgpack":
+                await websocket.send_bytes(msgpack.packb(frame, use_bin_type=True))
+            else:
+                await websocket.send_json(frame)
+
+    async def receive_loop():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
             try:
-                await yf_ws.close()
-            except Exception:
-                pass
-        await websocket.close()
-        logger.info(f"WebSocket for {symbol} closed cleanly.")
+                command = json.loads(message.get("text") or message.get("bytes"))
+                requested = [s for s in command.get("symbols", []) if s]
+                match command.get("action"):
+                    case "subscribe":
+                        await add_symbols(requested)
+                    case "unsubscribe":
+                        await remove_symbols(requested)
+            except (ValueError, TypeError, AttributeError):
+                logger.warning(f"Ignoring malformed client message: {message}")
+
+    await add_symbols([s.strip() for s in symbols.split(",") if s.strip()])
+    logger.info(f"Client connected for symbols: {list(subs)}")
+
+    tasks = [
+        asyncio.create_task(send_loop()),
+        asyncio.create_task(receive_loop()),
+    ]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(
+                    f"Client disconnected or send failed: {task.exception()}"
+                )
+    except Exception as e:
+        logger.exception(f"Error in multi-symbol websocket: {e}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await remove_symbols(list(subs))
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+        logger.info("Multi-symbol WebSocket closed cleanly.")
@@ -0,0 +1,35 @@
+from dotenv import load_dotenv
+
+# Before the src imports, which read their settings at import time
+load_dotenv()
+
+from src.alert_trigger import send_alert_notification
+from src.notification_outbox import OutboxWorker
+import asyncio
+import logging
+import os
+import sys
+
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    # Every send would fail without it; stop here rather than retrying
+    # each entry until it is dead-lettered
+    if not os.getenv("NODE_AUTH_TOKEN"):
+        print("NODE_AUTH_TOKEN is not set; notification worker not started")
+        logger.error("NODE_AUTH_TOKEN is not set")
+        sys.exit(1)
+
+    # Run as many of these as delivery needs; each is one consumer in the
+    # outbox group and reclaims what a stopped worker left pending
+    worker = OutboxWorker(send_alert_notification)
+    try:
+        await worker.run()
+    except KeyboardInterrupt:
+        logger.info("Shutting down notification worker...")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,6 +6,13 @@ from .check_within_past_x_week_value import check_within_past_x_week_value
 from .check_within_from_recent_highest_price import (
     check_within_from_recent_highest_price,
 )
+from .check_within_past_x_days import check_within_past_x_days
+from .check_within_past_x_days_value import check_within_past_x_days_value
+from .check_nearing_extremes import (
+    check_nearing_52_week_low,
+    check_nearing_52_week_high,
+    check_nearing_all_time_high,
+)
 
 __all__ = [
     "check_from_today_open_price",
@@ -14,4 +21,9 @@ __all__ = [
     "check_within_past_x_weeks",
     "check_within_past_x_week_value",
     "check_within_from_recent_highest_price",
+    "check_within_past_x_days",
+    "check_within_past_x_days_value",
+    "check_nearing_52_week_low",
+    "check_nearing_52_week_high",
+    "check_nearing_all_time_high",
 ]
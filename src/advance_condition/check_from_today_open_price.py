@@ -1,5 +1,6 @@
 import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import timedelta
+from src.utils.trading_calendar import local_today
 
 
 def check_from_today_open_price(alert, alertTriggered):
@@ -33,11 +34,10 @@ def check_from_today_open_price(alert, alertTriggered):
     # Fetch today's open price
     try:
         stock = yf.Ticker(ticker)
-        current_date_plus_two = (datetime.now() + timedelta(days=2)).strftime(
-            "%Y-%m-%d"
-        )
+        today = local_today(ticker)
+        current_date_plus_two = (today + timedelta(days=2)).strftime("%Y-%m-%d")
         data = stock.history(
-            start=datetime.now().strftime("%Y-%m-%d"), end=current_date_plus_two
+            start=today.strftime("%Y-%m-%d"), end=current_date_plus_two
         )
 
         if data.empty:
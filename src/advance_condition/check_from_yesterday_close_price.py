@@ -1,5 +1,6 @@
 import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import timedelta
+from src.utils.trading_calendar import local_today
 
 
 def check_from_yesterday_close_price(alert, alertTriggered):
@@ -22,10 +23,11 @@ def check_from_yesterday_close_price(alert, alertTriggered):
     # Fetch historical data to get yesterday's close
     try:
         stock = yf.Ticker(ticker)
-        
+
         # Get data for the last 5 days to ensure we have yesterday's close
-        end_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
-        start_date = (datetime.now() - timedelta(days=5)).strftime("%Y-%m-%d")
+        today = local_today(ticker)
+        end_date = (today + timedelta(days=1)).strftime("%Y-%m-%d")
+        start_date = (today - timedelta(days=5)).strftime("%Y-%m-%d")
 
         data = stock.history(start=start_date, end=end_date)
 
@@ -47,7 +49,7 @@ def check_from_yesterday_close_price(alert, alertTriggered):
     percentageChange = (change / yesterdayClosePrice) * 100
     value = alert["value"]
 
-     # --- Check percentage-based alerts ---
+    # --- Check percentage-based alerts ---
     if alert["valueType"] == "PERCENTAGE":
         if alert["subCondition"] == "GOING_UP" and percentageChange >= value:
             alertTitle = f"{alertTitleTickerFullName} Going Up"
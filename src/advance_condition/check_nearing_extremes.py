@@ -0,0 +1,85 @@
+from src.price_extremes import get_live_extremes
+
+
+def _nearing(alert, alertTriggered, key, label, reference, above):
+    """
+    Trigger when the price is within `value` (percent or price) of
+    `reference`, approached from below (`above`=False) or above.
+    """
+    if reference is None:
+        return
+
+    current_price = alert.get("current_price") or 0
+    ticker_full_name = alert["ticker"]["nm"]
+    threshold = alert["value"]
+    value_type = alert["valueType"]
+    reference_price, reference_date = reference["value"], reference["time"]
+
+    distance = (
+        current_price - reference_price if above else reference_price - current_price
+    )
+    pct_distance = (distance / reference_price) * 100
+    metric = pct_distance if value_type == "PERCENTAGE" else distance
+
+    if not 0 <= metric <= threshold:
+        return
+
+    if value_type == "PERCENTAGE":
+        distance_text = f"{abs(round(pct_distance, 2))}%"
+    else:
+        distance_text = f"${abs(round(distance, 2))}"
+
+    alertTriggered.append(
+        {
+            "advanceCondition": key,
+            "subCondition": alert["subCondition"],
+            "valueType": value_type,
+            "condition": alert["condition"],
+            "referencePrice": reference_price,
+            "referenceDate": reference_date,
+            "alertTitle": f"{ticker_full_name} Nearing {label}",
+            "alertMessage": (
+                f"{ticker_full_name} is nearing its {label.lower()}!\n"
+                f"The price of ${round(current_price, 2)} is {distance_text} "
+                f"{'above' if above else 'below'} the {label.lower()} of "
+                f"${round(reference_price, 2)} ({reference_date})."
+            ),
+        }
+    )
+
+
+async def check_nearing_52_week_low(alert, alertTriggered):
+    if alert is None or not alert.get("current_price"):
+        return
+    extremes = await get_live_extremes(alert)
+    _nearing(
+        alert, alertTriggered, "nearing52WeekLow", "52 Week Low", extremes.low_52w, True
+    )
+
+
+async def check_nearing_52_week_high(alert, alertTriggered):
+    if alert is None or not alert.get("current_price"):
+        return
+    extremes = await get_live_extremes(alert)
+    _nearing(
+        alert,
+        alertTriggered,
+        "nearing52WeekHigh",
+        "52 Week High",
+        extremes.high_52w,
+        False,
+    )
+
+
+async def check_nearing_all_time_high(alert, alertTriggered):
+    if alert is None or not alert.get("current_price"):
+        return
+    extremes = await get_live_extremes(alert)
+    _nearing(
+        alert,
+        alertTriggered,
+        "nearingAllTimeHigh",
+        "All Time High",
+        extremes.all_time_high,
+        False,
+    )
@@ -1,5 +1,6 @@
 import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import timedelta
+from src.utils.trading_calendar import local_today
 
 
 def check_within_current_week(alert, alertTriggered):
@@ -21,7 +22,7 @@ def check_within_current_week(alert, alertTriggered):
         stock = yf.Ticker(ticker)
         print(f"Checking ticker: {ticker}")
 
-        today = datetime.now()
+        today = local_today(ticker)
         # Get Monday of current week (0 = Monday, 6 = Sunday)
         days_since_monday = today.weekday()
         monday_date = today - timedelta(days=days_since_monday)
@@ -1,2 +1,71 @@
+from src.price_extremes import get_live_extremes
+
+
 async def check_within_from_recent_highest_price(alert, alertTriggered):
-    return
+    """
+    Compare the current price with the recent swing high: GOING_DOWN fires
+    once it has fallen X below it, GOING_UP once it has recovered to within
+    X of it.
+    """
+    if alert is None:
+        return
+
+    current_price = alert.get("current_price") or 0
+    ticker_full_name = alert["ticker"]["nm"]
+    threshold = alert["value"]
+    value_type = alert["valueType"]
+    sub_condition = alert["subCondition"]
+
+    if current_price == 0:
+        return
+
+    extremes = await get_live_extremes(alert)
+    recent_high = extremes.recent_high
+    if recent_high is None:
+        return
+
+    high_price, high_date = recent_high["value"], recent_high["time"]
+    drop = high_price - current_price
+    pct_drop = (drop / high_price) * 100
+
+    is_going_up = sub_condition == "GOING_UP"
+    use_percentage = value_type == "PERCENTAGE"
+
+    metric = pct_drop if use_percentage else drop
+    triggered = (metric <= threshold) if is_going_up else (metric >= threshold)
+
+    if not triggered:
+        return
+
+    if use_percentage:
+        drop_text = f"{abs(round(pct_drop, 2))}%"
+    else:
+        drop_text = f"${abs(round(drop, 2))}"
+
+    if is_going_up:
+        alert_title = f"{ticker_full_name} Near Recent High"
+        alert_message = (
+            f"{ticker_full_name} has recovered to within {drop_text} "
+            f"of its recent high of ${round(high_price, 2)} ({high_date}).\n"
+            f"Current price: ${round(current_price, 2)}."
+        )
+    else:
+        alert_title = f"{ticker_full_name} Down {drop_text} from Recent High"
+        alert_message = (
+            f"{ticker_full_name} has dropped {drop_text} "
+            f"from its recent high of ${round(high_price, 2)} ({high_date}) "
+            f"to ${round(current_price, 2)}."
+        )
+
+    alertTriggered.append(
+        {
+            "advanceCondition": "fromRecentHighestPrice",
+            "subCondition": sub_condition,
+            "valueType": value_type,
+            "condition": alert["condition"],
+            "referencePrice": high_price,
+            "referenceDate": high_date,
+            "alertTitle": alert_title,
+            "alertMessage": alert_message,
+        }
+    )
@@ -0,0 +1,72 @@
+from datetime import timedelta
+from src.price_history import get_closing_history
+from src.utils.trading_calendar import local_today
+
+
+async def check_within_past_x_days(alert, alertTriggered):
+    """
+    Check if a stock's price has gone up or down from its close X days ago
+    and trigger alerts based on the alert settings.
+    """
+    if alert is None:
+        return
+
+    ticker = alert.get("tickerNm") or alert["ticker"]["ticker"]
+    current_price = alert.get("current_price") or 0
+    ticker_full_name = alert["ticker"]["nm"]
+    threshold = alert["value"]
+    value_type = alert["valueType"]
+    sub_condition = alert["subCondition"]
+    num_days = alert.get("days") or 1
+
+    if current_price == 0:
+        return
+
+    # Last close on or before the target date, from the shared daily history
+    history = await get_closing_history(ticker)
+    target = local_today(ticker) - timedelta(days=num_days)
+    idx = history.position(target + timedelta(days=1)) - 1
+    if idx < 0:
+        print(f"[Warning] No data available for {num_days} day(s) ago for {ticker}")
+        return
+
+    past_price = float(history.values[idx])
+    past_date = str(history.dates[idx])
+
+    change = current_price - past_price
+    pct_change = (change / past_price) * 100
+
+    is_going_up = sub_condition == "GOING_UP"
+    use_percentage = value_type == "PERCENTAGE"
+
+    metric = pct_change if use_percentage else change
+    triggered = (metric >= threshold) if is_going_up else (metric <= -threshold)
+
+    if not triggered:
+        return
+
+    direction = "Up" if is_going_up else "Down"
+    action = "going up" if is_going_up else "going down"
+    verb = "risen" if is_going_up else "dropped"
+    time_label = "past day" if num_days == 1 else f"past {num_days} days"
+
+    if use_percentage:
+        change_text = f"{abs(round(pct_change, 2))}%"
+    else:
+        change_text = f"${abs(round(change, 2))}"
+
+    alertTriggered.append(
+        {
+            "advanceCondition": "withinPastXDays",
+            "subCondition": sub_condition,
+            "valueType": value_type,
+            "condition": alert["condition"],
+            "days": num_days,
+            "alertTitle": f"{ticker_full_name} Going {direction} Over {time_label.title()}",
+            "alertMessage": (
+                f"{ticker_full_name} is {action} over the {time_label}!\n"
+                f"The price has {verb} {change_text} "
+                f"from ${round(past_price, 2)} ({past_date}) to ${round(current_price, 2)}."
+            ),
+        }
+    )
@@ -0,0 +1,86 @@
+from datetime import timedelta
+from src.price_history import get_ohlc_history
+from src.utils.trading_calendar import local_today
+
+
+async def check_within_past_x_days_value(alert, alertTriggered):
+    """
+    Check if the current price is X away from the highest (GOING_DOWN) or
+    lowest (GOING_UP) price of the past X days, today's live range included.
+    """
+    if alert is None:
+        return
+
+    ticker = alert.get("tickerNm") or alert["ticker"]["ticker"]
+    current_price = alert.get("current_price") or 0
+    ticker_full_name = alert["ticker"]["nm"]
+    threshold = alert["value"]
+    value_type = alert["valueType"]
+    sub_condition = alert["subCondition"]
+    num_days = alert.get("days") or 1
+
+    if current_price == 0:
+        return
+
+    today = local_today(ticker)
+    history = await get_ohlc_history(ticker)
+    if history is None:
+        print(f"[Warning] No data for {ticker}")
+        return
+
+    is_going_up = sub_condition == "GOING_UP"
+    start = history.position(today - timedelta(days=num_days))
+    reference = history.lowest(start) if is_going_up else history.highest(start)
+
+    # Today's range comes from the live quote
+    live = alert.get("currentStockData") or {}
+    today_extreme = (
+        live.get("day_low") if is_going_up else live.get("day_high")
+    ) or current_price
+    if reference is None or (
+        today_extreme < reference["value"]
+        if is_going_up
+        else today_extreme > reference["value"]
+    ):
+        reference = {"value": today_extreme, "time": today.strftime("%Y-%m-%d")}
+
+    reference_price, reference_date = reference["value"], reference["time"]
+    change = current_price - reference_price
+    pct_change = (change / reference_price) * 100
+
+    use_percentage = value_type == "PERCENTAGE"
+    metric = pct_change if use_percentage else change
+    triggered = (metric >= threshold) if is_going_up else (metric <= -threshold)
+
+    if not triggered:
+        return
+
+    time_label = "past day" if num_days == 1 else f"past {num_days} days"
+    extreme = "Low" if is_going_up else "High"
+    verb = "increased" if is_going_up else "decreased"
+
+    if use_percentage:
+        change_text = f"{abs(round(pct_change, 2))}%"
+    else:
+        change_text = f"${abs(round(change, 2))}"
+
+    alertTriggered.append(
+        {
+            "advanceCondition": "withinPastXDaysValue",
+            "subCondition": sub_condition,
+            "valueType": value_type,
+            "condition": alert["condition"],
+            "days": num_days,
+            "referencePrice": reference_price,
+            "referenceDate": reference_date,
+            "alertTitle": (
+                f"{ticker_full_name} {'Up' if is_going_up else 'Down'} {change_text} "
+                f"from {time_label.title()} {extreme}"
+            ),
+            "alertMessage": (
+                f"{ticker_full_name} has {'risen' if is_going_up else 'dropped'} significantly!\n"
+                f"The price has {verb} {change_text} from the {time_label} {extreme.lower()} "
+                f"of ${round(reference_price, 2)} ({reference_date}) to ${round(current_price, 2)}."
+            ),
+        }
+    )
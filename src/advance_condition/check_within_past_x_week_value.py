@@ -1,8 +1,9 @@
-import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import timedelta
+from src.price_history import get_ohlc_history
+from src.utils.trading_calendar import local_today
 
 
-def check_within_past_x_week_value(alert, alertTriggered):
+async def check_within_past_x_week_value(alert, alertTriggered):
     """
     Check if a stock's highest or lowest price within the past X weeks
     meets the specified threshold and trigger alerts based on the alert settings.
@@ -22,45 +23,40 @@ def check_within_past_x_week_value(alert, alertTriggered):
 
     # Calculate the date X weeks ago
     try:
-        stock = yf.Ticker(ticker)
         print(f"Checking ticker: {ticker} for peak/trough in past {num_weeks} week(s)")
 
-        today = datetime.now()
+        today = local_today(ticker)
         # Calculate date X weeks ago (7 days * num_weeks)
         weeks_ago_date = today - timedelta(weeks=num_weeks)
 
-        # Fetch data from X weeks ago to now
-        start_date = (weeks_ago_date - timedelta(days=3)).strftime("%Y-%m-%d")
-        end_date = (today + timedelta(days=1)).strftime("%Y-%m-%d")
-
-        data = stock.history(start=start_date, end=end_date)
-        print(f"Data retrieved: {len(data)} rows")
-
-        if data.empty:
+        # Completed daily bars, indexed once per day for window extremes
+        history = await get_ohlc_history(ticker)
+        if history is None or len(history) == 0:
             print(f"[Warning] No data for {ticker}")
             return
 
-        # Filter data to only include past X weeks
-        target_date = weeks_ago_date.strftime("%Y-%m-%d")
-        period_data = data[data.index >= target_date]
+        start = history.position(weeks_ago_date)
+        highest = history.highest(start)
+        lowest = history.lowest(start)
+
+        # Today's range comes from the live quote
+        live = alert.get("currentStockData") or {}
+        todayHigh = live.get("day_high") or currentPrice
+        todayLow = live.get("day_low") or currentPrice
+
+        if todayHigh and (highest is None or todayHigh > highest["value"]):
+            highest = {"value": todayHigh, "time": today.strftime("%Y-%m-%d")}
+        if todayLow and (lowest is None or todayLow < lowest["value"]):
+            lowest = {"value": todayLow, "time": today.strftime("%Y-%m-%d")}
 
-        if period_data.empty:
+        if highest is None or lowest is None:
             print(
                 f"[Warning] No data available for past {num_weeks} week(s) for {ticker}"
             )
             return
 
-        # Get highest and lowest values within the period
-        highestPrice = period_data["High"].max()
-        lowestPrice = period_data["Low"].min()
-        highestDate = (
-            period_data[period_data["High"] == highestPrice]
-            .index[0]
-            .strftime("%Y-%m-%d")
-        )
-        lowestDate = (
-            period_data[period_data["Low"] == lowestPrice].index[0].strftime("%Y-%m-%d")
-        )
+        highestPrice, highestDate = highest["value"], highest["time"]
+        lowestPrice, lowestDate = lowest["value"], lowest["time"]
 
     except Exception as e:
         print(f"[Error] Could not fetch data for {ticker}: {e}")
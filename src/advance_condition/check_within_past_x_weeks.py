@@ -1,5 +1,6 @@
 import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import timedelta
+from src.utils.trading_calendar import local_today
 
 
 def check_within_past_x_weeks(alert, alertTriggered):
@@ -24,7 +25,7 @@ def check_within_past_x_weeks(alert, alertTriggered):
         stock = yf.Ticker(ticker)
         print(f"Checking ticker: {ticker} for past {num_weeks} week(s)")
 
-        today = datetime.now()
+        today = local_today(ticker)
         # Calculate date X weeks ago (7 days * num_weeks)
         weeks_ago_date = today - timedelta(weeks=num_weeks)
 
@@ -1,6 +1,7 @@
 import json
+from src.notification_outbox import OUTBOX_MAXLEN, OUTBOX_STREAM
 from src.utils.redis_cache import get_redis
-from datetime import datetime, timedelta
+from src.utils.trading_calendar import get_exchange, local_today_str
 
 
 async def get_alert_triggered(
@@ -11,7 +12,8 @@ async def get_alert_triggered(
     redis_client = await get_redis()
     """Read stored alert from Redis for the current day."""
 
-    today_str = datetime.now().strftime("%Y-%m-%d")
+    # Daily state rolls over at the ticker's local exchange midnight
+    today_str = local_today_str(ticker)
     redis_key = f"alert:triggered:{ticker}:{key}:{emailAddress}:{today_str}"
 
     # Retrieve the hash
@@ -31,19 +33,25 @@ async def get_alert_triggered(
 
 
 async def store_alert_triggered(
-    ticker: str, emailAddress: str, key: str, alertTriggered: any
+    ticker: str, emailAddress: str, key: str, alertTriggered: any, outbox=None
 ):
     redis_client = await get_redis()
-    """Store alert in Redis only for the current day (expires at midnight)."""
+    """
+    Store alert in Redis only for the current day (expires at midnight).
+
+    `outbox` fields are appended to the notification outbox stream in the
+    same transaction, so a trigger is never recorded without its
+    notification (or the other way round).
+    """
     if not alertTriggered:
         return
 
-    now = datetime.now()
+    exchange = get_exchange(ticker)
+    now = exchange.now()
     today_str = now.strftime("%Y-%m-%d")
 
-    # Expire at midnight
-    midnight = datetime.combine(now.date(), datetime.min.time()) + timedelta(days=1)
-    seconds_until_midnight = int((midnight - now).total_seconds())
+    # Expire at the exchange's local midnight
+    seconds_until_midnight = exchange.seconds_until_day_end(now)
 
     # Create Redis key (unique per user + date)
     redis_key = f"alert:triggered:{ticker}:{key}:{emailAddress}:{today_str}"
@@ -58,7 +66,11 @@ async def store_alert_triggered(
     }
 
     # Store as hash
-    await redis_client.hset(redis_key, mapping=alert_data)
-    await redis_client.expire(redis_key, seconds_until_midnight)
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.hset(redis_key, mapping=alert_data)
+    pipe.expire(redis_key, seconds_until_midnight)
+    if outbox is not None:
+        pipe.xadd(OUTBOX_STREAM, outbox, maxlen=OUTBOX_MAXLEN, approximate=True)
+    await pipe.execute()
 
     print(f"✅ Alert stored for {emailAddress}, {str(key)}")
@@ -4,6 +4,11 @@ from src.conditions.check_pe_ratio_conditions import check_pe_ratio_conditions
 from src.conditions.check_price_conditions import check_price_conditions
 from src.conditions.check_drawdown_conditions import check_drawdown_conditions
 from src.conditions.check_rsi_conditions import check_rsi_conditions
+from src.conditions.check_cross_junction_conditions import (
+    check_cross_junction_conditions,
+)
+from src.conditions.check_index_move_conditions import check_index_move_conditions
+from src.armed_alerts import armed_alerts
 
 
 async def process_alert_condition(alert: any):
@@ -22,15 +27,32 @@ async def process_alert_condition(alert: any):
         case "RSI":
             await check_rsi_conditions(alert)
         case "CROSS_JUNCTION":
-            pass
+            await check_cross_junction_conditions(alert)
+        case "INDEX_MOVE":
+            # Evaluated on the index aggregate, not per constituent
+            await check_index_move_conditions(alert)
         case "NEWS":
+            # Matched by the news pipeline, which news_alerts.sync registers
+            # at startup; nothing to evaluate on a price update
             pass
         case _:
             print(f"Unknown command: {command}.")
 
 
-async def run_alerts(alerts: list, ticker: str, current_stock_data: any):
+async def run_alerts(
+    alerts: list, ticker: str, current_stock_data: any, park_triggered: bool = False
+):
+    """
+    Evaluate `alerts` for one ticker update. Alerts whose advance keys have
+    all fired today are skipped; with `park_triggered` they are also removed
+    from `alerts` until the day-boundary re-arm.
+    """
+    if park_triggered:
+        alerts = await armed_alerts.filter_hot(alerts, ticker)
+
     for alert in alerts:
+        if not park_triggered and not await armed_alerts.is_armed(alert, ticker):
+            continue
 
         if alert["status"] == "DEACTIVATED":
             pass
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from src.alert_engine import run_alerts
+from src.alert_trigger import trigger_counter
+from src.alerts import fetch_stock_alerts_from_db
+from src.apis.get_bulk_quotes import get_bulk_quotes
+
+ALERT_JOB_CONCURRENCY = int(os.getenv("ALERT_JOB_CONCURRENCY", "16"))
+MAX_FINISHED_JOBS = 100
+
+# job id -> job status dict, most recent last
+jobs = {}
+
+
+def _new_job():
+    job_id = uuid.uuid4().hex
+    jobs[job_id] = {
+        "job_id": job_id,
+        "status": "queued",
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "progress": {"evaluated": 0, "total": 0},
+        "timings": {},
+        "counts": {
+            "alerts": 0,
+            "tickers": 0,
+            "missing_prices": 0,
+            "triggered": 0,
+            "errors": 0,
+        },
+        "error": None,
+    }
+
+    # Keep the registry bounded
+    finished = [k for k, j in jobs.items() if j["status"] in ("completed", "failed")]
+    for k in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del jobs[k]
+
+    return jobs[job_id]
+
+
+async def _run_job(job, concurrency: int):
+    job["status"] = "running"
+    counts = job["counts"]
+    timings = job["timings"]
+    # run_alert_trigger increments counts["triggered"], including from
+    # tasks the handlers spawn that finish after this coroutine
+    trigger_counter.set(counts)
+    job_start = time.perf_counter()
+
+    try:
+        # Phase 1: load alerts
+        start = time.perf_counter()
+        items = await fetch_stock_alerts_from_db()
+        grouped_alerts = defaultdict(list)
+        for alert in items:
+            grouped_alerts[alert["ticker"]["ticker"]].append(alert)
+        timings["load_seconds"] = round(time.perf_counter() - start, 3)
+        counts["alerts"] = len(items)
+        counts["tickers"] = len(grouped_alerts)
+
+        # Phase 2: one price snapshot per distinct ticker, in bulk
+        start = time.perf_counter()
+        snapshots = await get_bulk_quotes(list(grouped_alerts.keys()))
+        timings["snapshot_seconds"] = round(time.perf_counter() - start, 3)
+        counts["missing_prices"] = len(grouped_alerts) - len(snapshots)
+
+        # Phase 3: evaluate with bounded concurrency
+        start = time.perf_counter()
+        work = [
+            (ticker, alert, snapshots[ticker])
+            for ticker, alerts in grouped_alerts.items()
+            if ticker in snapshots
+            for alert in alerts
+        ]
+        job["progress"]["total"] = len(work)
+        semaphore = asyncio.Semaphore(concurrency)
+        # Alerts of one user on one ticker share their dedup keys
+        # (ticker, key, email): run them one at a time so a second alert
+        # sees the first one's trigger instead of notifying again
+        user_locks = defaultdict(asyncio.Lock)
+
+        async def evaluate(ticker, alert, snapshot):
+            user = (alert.get("emailAddress") or [None])[0]
+            async with user_locks[(user, ticker)], semaphore:
+                try:
+                    await run_alerts([alert], ticker, current_stock_data=snapshot)
+                except Exception as e:
+                    counts["errors"] += 1
+                    print(
+                        f"Error evaluating alert {alert.get('_id')} for {ticker}: {e}"
+                    )
+                finally:
+                    job["progress"]["evaluated"] += 1
+
+        await asyncio.gather(*(evaluate(*item) for item in work))
+        timings["evaluate_seconds"] = round(time.perf_counter() - start, 3)
+        job["status"] = "completed"
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+        print(f"Alert job {job['job_id']} failed: {e}")
+    finally:
+        timings["total_seconds"] = round(time.perf_counter() - job_start, 3)
+
+
+def start_alert_job(concurrency: int = ALERT_JOB_CONCURRENCY):
+    """Schedule a batch evaluation of all stock alerts and return its status."""
+    job = _new_job()
+    task = asyncio.create_task(_run_job(job, concurrency))
+    job["_task"] = task
+    task.add_done_callback(lambda _: job.pop("_task", None))
+    return job
+
+
+def get_alert_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        return None
+    return {k: v for k, v in job.items() if not k.startswith("_")}
@@ -1,10 +1,21 @@
+from contextvars import ContextVar
 from datetime import datetime
 from dotenv import load_dotenv
 import os
 import requests
 from src.alert_cache import store_alert_triggered
+from src.config import SHIPRA_API_URL
+from src.notification_digest import NotificationDigest
+from src.notification_outbox import NOTIFICATION_DELIVERY, outbox_entry
 import json
 
+# Set by batch jobs to count the triggers raised while they run; tasks
+# spawned by the condition handlers inherit it.
+trigger_counter = ContextVar("trigger_counter", default=None)
+
+# Callables notified with (alert, ticker, key) once a trigger is stored
+trigger_listeners = []
+
 
 def send_alert_notification(alert, alert_triggered_list):
     """
@@ -46,17 +57,20 @@ def send_alert_notification(alert, alert_triggered_list):
         "Authorization": f"Bearer {auth_token}",
     }
 
+    if notification_env != "production":
+        print(f"Alert notification not sent outside production: {alert['_id']}")
+        return False
+
     # Send notification
     try:
-        if notification_env == "production":
-            response = requests.post(
-                "https://api-shipra-v3.pilleo.ca/admin/alert/send",
-                json=payload,
-                headers=headers,
-                timeout=10,
-            )
-            response.raise_for_status()
-            return True
+        response = requests.post(
+            f"{SHIPRA_API_URL}/admin/alert/send",
+            json=payload,
+            headers=headers,
+            timeout=10,
+        )
+        response.raise_for_status()
+        return True
     except requests.exceptions.Timeout:
         print(f"Alert notification timeout for alertId: {alert['_id']}")
         return False
@@ -70,11 +84,26 @@ async def run_alert_trigger(alert, alertTriggered, key):
         ticker = alert.get("tickerNm") or alert["ticker"]["ticker"]
         emailAddress = alert["emailAddress"][0]
         print(f"🚨 Alert Triggered: {json.dumps(alertTriggered,indent=4)}")
-        send_alert_notification(alert, alertTriggered)
+        counter = trigger_counter.get()
+        if counter is not None:
+            counter["triggered"] += 1
+        outbox = None
+        if NOTIFICATION_DELIVERY == "outbox":
+            # Sent by notification_worker.py
+            outbox = outbox_entry(alert, alertTriggered)
+        else:
+            notification_digest.submit(alert, alertTriggered)
         await store_alert_triggered(
             ticker,
             emailAddress,
             key=key,
             alertTriggered=alertTriggered,
+            outbox=outbox,
         )
+        for listener in trigger_listeners:
+            listener(alert, ticker, key)
     return
+
+
+# Coalesces notifications per (user, alert) before sending (direct delivery)
+notification_digest = NotificationDigest(send_alert_notification)
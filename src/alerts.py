@@ -1,21 +1,31 @@
 from src.utils.db import get_database
+from src.config import SHIPRA_PYTHON_API_URL
 from src.utils.redis_cache import get_cache, set_cache
 from bson import json_util
+from datetime import datetime
+import asyncio
 import requests
 import json
 
 db = get_database()
 
 
-async def get_index_stocks(ticker: str, period: str = "1W"):
-    url = "https://api-python-v3.shipra.ca/index-get-performance"
+# Constituent lists change rarely: keep them for a couple of days and
+# refresh in the background once the cached copy is from a previous day.
+INDEX_STOCKS_EXPIRE_SECONDS = 2 * 24 * 60 * 60
+_index_refresh_tasks = {}
+
+
+def _fetch_index_stocks(ticker: str, period: str):
+    """Blocking POST to the index performance API (run in a worker thread)."""
+    url = f"{SHIPRA_PYTHON_API_URL}/index-get-performance"
 
     payload = json.dumps({"ticker": ticker, "period": period})
 
     headers = {"Content-Type": "application/json"}
 
     try:
-        response = requests.post(url, headers=headers, data=payload)
+        response = requests.post(url, headers=headers, data=payload, timeout=30)
         response.raise_for_status()  # Raise an error for HTTP codes 4xx/5xx
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -23,6 +33,37 @@ async def get_index_stocks(ticker: str, period: str = "1W"):
         return None
 
 
+async def _refresh_index_stocks(ticker: str, period: str):
+    stocks = await asyncio.to_thread(_fetch_index_stocks, ticker, period)
+    if stocks is not None:
+        await set_cache(
+            f"index_stocks:{ticker}:{period}",
+            {"date": datetime.now().strftime("%Y-%m-%d"), "stocks": stocks},
+            expire_seconds=INDEX_STOCKS_EXPIRE_SECONDS,
+        )
+    return stocks
+
+
+def _schedule_index_refresh(ticker: str, period: str):
+    key = (ticker, period)
+    if key in _index_refresh_tasks:
+        return
+    task = asyncio.create_task(_refresh_index_stocks(ticker, period))
+    _index_refresh_tasks[key] = task
+    task.add_done_callback(lambda _: _index_refresh_tasks.pop(key, None))
+
+
+async def get_index_stocks(ticker: str, period: str = "1W"):
+    cached = await get_cache(f"index_stocks:{ticker}:{period}")
+    if cached is not None:
+        # Serve yesterday's list straight away and refresh it behind the scenes
+        if cached["date"] != datetime.now().strftime("%Y-%m-%d"):
+            _schedule_index_refresh(ticker, period)
+        return cached["stocks"]
+
+    return await _refresh_index_stocks(ticker, period)
+
+
 async def fetch_index_stock_alerts_from_db():
     # Try cache first
     CACHE_KEY_ALERTS = f"alerts:active:index_stocks"
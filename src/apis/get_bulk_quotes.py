@@ -0,0 +1,83 @@
+import asyncio
+import os
+import pandas as pd
+import yfinance as yf
+
+BULK_QUOTE_CHUNK_SIZE = int(os.getenv("BULK_QUOTE_CHUNK_SIZE", "200"))
+
+
+def _download_chunk(tickers: list):
+    """One multi-symbol yf.download call (blocking, run in a worker thread)."""
+    data = yf.download(
+        tickers=tickers,
+        period="5d",
+        interval="1d",
+        group_by="ticker",
+        auto_adjust=False,
+        threads=True,
+        progress=False,
+    )
+
+    quotes = {}
+    if data is None or data.empty:
+        return quotes
+
+    for ticker in tickers:
+        try:
+            frame = data[ticker] if ticker in data.columns.get_level_values(0) else data
+            frame = frame.dropna(subset=["Close"])
+        except (KeyError, AttributeError):
+            continue
+        if frame.empty:
+            continue
+
+        last = frame.iloc[-1]
+        previous_close = float(frame["Close"].iloc[-2]) if len(frame) > 1 else None
+        price = float(last["Close"])
+
+        # Same field names as the yfinance WebSocket PricingData messages
+        quote = {
+            "id": ticker,
+            "price": price,
+            "time": str(int(frame.index[-1].timestamp() * 1000)),
+        }
+        # Missing values (NaN) are left out, as the WebSocket leaves out
+        # fields it has no value for
+        for field, column in (
+            ("open_price", "Open"),
+            ("day_high", "High"),
+            ("day_low", "Low"),
+        ):
+            if pd.notna(last[column]):
+                quote[field] = float(last[column])
+        if pd.notna(last["Volume"]):
+            quote["day_volume"] = str(int(last["Volume"]))
+        if previous_close:
+            quote["previous_close"] = previous_close
+            quote["change"] = price - previous_close
+            quote["change_percent"] = (price - previous_close) / previous_close * 100
+        quotes[ticker] = quote
+
+    return quotes
+
+
+async def get_bulk_quotes(tickers: list, chunk_size: int = BULK_QUOTE_CHUNK_SIZE):
+    """
+    Fetch the latest daily quote for many tickers using a few multi-symbol
+    requests. Returns `{ticker: message}`; tickers with no data are omitted.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    chunks = [tickers[i : i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_download_chunk, chunk) for chunk in chunks),
+        return_exceptions=True,
+    )
+
+    quotes = {}
+    for chunk, result in zip(chunks, results):
+        if isinstance(result, Exception):
+            print(f"Bulk quote request failed for {len(chunk)} tickers: {result}")
+            continue
+        quotes.update(result)
+    return quotes
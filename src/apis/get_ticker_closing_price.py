@@ -1,36 +1,36 @@
 import requests
+from src.config import SHIPRA_PYTHON_API_URL
 from src.utils.redis_cache import set_cache, get_cache
-from datetime import datetime, timedelta
+from src.utils.trading_calendar import local_today_str, seconds_until_local_midnight
 import json
 
 
 async def get_ticker_closing_price(ticker: str):
-    now = datetime.now()
-    today_str = now.strftime("%Y-%m-%d")
+    today_str = local_today_str(ticker)
     redis_key = f"closing_price:{ticker}:{today_str}"
     closing_price = await get_cache(redis_key)
     if closing_price:
-        data = json.loads(closing_price)
-        return data
+        # Older entries were stored as a JSON string inside the cached JSON
+        if isinstance(closing_price, str):
+            return json.loads(closing_price)
+        return closing_price
 
-    url = "https://api-python-v3.shipra.ca/ticker-closing-price"
+    url = f"{SHIPRA_PYTHON_API_URL}/ticker-closing-price"
     payload = {"ticker": ticker}
 
     response = requests.post(url, json=payload)
 
     if response.ok:
-        # Expire at midnight
-
-        midnight = datetime.combine(now.date(), datetime.min.time()) + timedelta(days=1)
-        seconds_until_midnight = int((midnight - now).total_seconds())
+        # Expire at the exchange's local midnight
+        seconds_until_midnight = seconds_until_local_midnight(ticker)
 
+        data = response.json()
         await set_cache(
             redis_key,
-            json.dumps(response.json()),
+            data,
             expire_seconds=seconds_until_midnight,
         )
 
-        data = response.json()
         return data
 
     raise RuntimeError(f"Request failed [{response.status_code}]: {response.text}")
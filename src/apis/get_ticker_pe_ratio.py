@@ -1,36 +1,36 @@
 import requests
+from src.config import SHIPRA_PYTHON_API_URL
 from src.utils.redis_cache import set_cache, get_cache
-from datetime import datetime, timedelta
+from src.utils.trading_calendar import local_today_str, seconds_until_local_midnight
 import json
 
 
 async def get_ticker_pe_ratio(ticker: str):
-    now = datetime.now()
-    today_str = now.strftime("%Y-%m-%d")
+    today_str = local_today_str(ticker)
     redis_key = f"pe_ratio:{ticker}:{today_str}"
     pe_ratio = await get_cache(redis_key)
     if pe_ratio:
-        data = json.loads(pe_ratio)
-        return data
+        # Older entries were stored as a JSON string inside the cached JSON
+        if isinstance(pe_ratio, str):
+            return json.loads(pe_ratio)
+        return pe_ratio
 
-    url = "https://api-python-v3.shipra.ca/ticker-pe-ratio"
+    url = f"{SHIPRA_PYTHON_API_URL}/ticker-pe-ratio"
     payload = {"ticker": ticker}
 
     response = requests.post(url, json=payload)
 
     if response.ok:
-        # Expire at midnight
-
-        midnight = datetime.combine(now.date(), datetime.min.time()) + timedelta(days=1)
-        seconds_until_midnight = int((midnight - now).total_seconds())
+        # Expire at the exchange's local midnight
+        seconds_until_midnight = seconds_until_local_midnight(ticker)
 
+        data = response.json()
         await set_cache(
             redis_key,
-            json.dumps(response.json()),
+            data,
             expire_seconds=seconds_until_midnight,
         )
 
-        data = response.json()
         return data
 
     raise RuntimeError(f"Request failed [{response.status_code}]: {response.text}")
@@ -0,0 +1,160 @@
+import asyncio
+from collections import defaultdict
+from src.alert_cache import get_alert_triggered
+from src.alert_trigger import trigger_listeners
+from src.conditions.check_index_move_conditions import INDEX_MOVE_KEYS
+from src.conditions.check_price_conditions import GOING_UP_DOWN, SKIP_TRIGGER_CHECK
+from src.indicators import indicators
+from src.utils.metrics import set_gauge
+from src.utils.trading_calendar import get_exchange, local_today_str
+
+# Keys whose handlers fire again on every tick (no daily dedup), so an
+# alert using any of them can never be considered fully triggered.
+ALWAYS_ARMED = SKIP_TRIGGER_CHECK | {
+    "rsiHistoricalLowExtreme",
+    "rsiHistoricalHighExtreme",
+}
+
+
+def advance_keys(alert):
+    """
+    The dedup keys an alert can trigger, or None when they cannot be
+    determined (the alert is then always evaluated).
+    """
+    match alert["condition"]:
+        case "PRICE":
+            if alert.get("subCondition") not in ("GOING_UP", "GOING_DOWN"):
+                return set()
+            conds = alert.get("priceAdvanceCondition") or {}
+            return {k for k in GOING_UP_DOWN if conds.get(k) is True}
+        case "INDEX_MOVE":
+            conds = alert.get("priceAdvanceCondition") or {}
+            return {k for k in INDEX_MOVE_KEYS if conds.get(k) is True}
+        case "RSI":
+            conds = alert.get("rsiAdvanceCondition") or {}
+            keys = {k for k, v in conds.items() if v is True}
+            for key in ("rsiHistoricalLowExtreme", "rsiHistoricalHighExtreme"):
+                if conds.get(f"{key}Value"):
+                    keys.add(key)
+            return keys
+        case "DMA" | "PE_RATIO" | "DRAWDOWN" | "CROSS_JUNCTION":
+            field = {
+                "DMA": "dmaAdvanceCondition",
+                "PE_RATIO": "peRatioAdvanceCondition",
+                "DRAWDOWN": "drawdownAdvanceCondition",
+                "CROSS_JUNCTION": "crossJunctionAdvanceCondition",
+            }[alert["condition"]]
+            conds = alert.get(field) or {}
+            return {k for k, v in conds.items() if v is True}
+        case "OPPORTUNITY":
+            return {alert["subCondition"]}
+        case _:
+            return None
+
+
+class ArmedAlerts:
+    """
+    Per (alert, ticker), the advance keys that can still fire today.
+
+    Alerts with nothing armed are parked off the ticker's evaluation list
+    until `rearm` runs at the exchange's local day boundary.
+    """
+
+    def __init__(self):
+        self._armed = {}  # (alert id, ticker) -> (local date, set of keys)
+        # ticker -> (local date parked, [(alerts list, alert), ...])
+        self._parked = {}
+        # The stream handler and the poll fallback can filter the same
+        # ticker's list at once; both would park the same alert
+        self._filtering = defaultdict(asyncio.Lock)
+
+    def _key(self, alert, ticker):
+        return (str(alert["_id"]), ticker)
+
+    async def _load(self, alert, ticker, today):
+        """First sight of an alert today: drop keys already stored in Redis."""
+        keys = advance_keys(alert)
+        if keys is None or keys & ALWAYS_ARMED:
+            armed = None
+        else:
+            email = alert["emailAddress"][0]
+            armed = set()
+            for key in keys:
+                if not await get_alert_triggered(ticker, email, key):
+                    armed.add(key)
+        self._armed[self._key(alert, ticker)] = (today, armed)
+        return armed
+
+    async def is_armed(self, alert, ticker) -> bool:
+        today = local_today_str(ticker)
+        state = self._armed.get(self._key(alert, ticker))
+        if state is None or state[0] != today:
+            armed = await self._load(alert, ticker, today)
+        else:
+            armed = state[1]
+        return armed is None or len(armed) > 0
+
+    def disarm(self, alert, ticker, key):
+        state = self._armed.get(self._key(alert, ticker))
+        if state is not None and state[1] is not None:
+            state[1].discard(key)
+
+    async def filter_hot(self, alerts: list, ticker: str):
+        """
+        Remove fully-triggered alerts from `alerts` (in place) and return
+        the ones still worth evaluating.
+        """
+        async with self._filtering[ticker]:
+            hot = []
+            for alert in alerts:
+                if await self.is_armed(alert, ticker):
+                    hot.append(alert)
+                else:
+                    today = local_today_str(ticker)
+                    self._parked.setdefault(ticker, (today, []))[1].append(
+                        (alerts, alert)
+                    )
+                    # Parked alerts no longer pin their indicator values
+                    indicators.release(alert, ticker)
+            if len(hot) != len(alerts):
+                alerts[:] = hot
+                self.update_metrics()
+            return hot
+
+    def rearm(self, tickers=None):
+        """Put parked alerts back on their tickers' lists for the new day."""
+        for ticker in list(tickers or self._parked.keys()):
+            _, parked = self._parked.pop(ticker, (None, []))
+            for alerts, alert in parked:
+                alerts.append(alert)
+                indicators.retain(alert, ticker)
+                self._armed.pop(self._key(alert, ticker), None)
+        self.update_metrics()
+
+    def rearm_due(self):
+        """Re-arm tickers whose exchange has passed its local midnight."""
+        due = [
+            ticker
+            for ticker, (day, _) in self._parked.items()
+            if local_today_str(ticker) != day
+        ]
+        if due:
+            self.rearm(due)
+        return due
+
+    def seconds_until_next_rearm(self, default: float = 3600):
+        if not self._parked:
+            return default
+        return min(get_exchange(t).seconds_until_day_end() for t in self._parked)
+
+    def update_metrics(self):
+        set_gauge(
+            "alerts.armed",
+            sum(1 for _, keys in self._armed.values() if keys is None or keys),
+        )
+        set_gauge("alerts.parked", sum(len(p) for _, p in self._parked.values()))
+
+
+# Shared by the engine and run_alert_trigger in this process
+armed_alerts = ArmedAlerts()
+trigger_listeners.append(armed_alerts.disarm)
@@ -0,0 +1,364 @@
+import time
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from src.conditions.check_price_conditions import GOING_UP_DOWN
+from src.indicators import compute_rsi, compute_sma
+
+# Conditions backtest_alert can replay, and the series each one reads
+BACKTEST_SERIES = {
+    "DMA": "close",
+    "RSI": "close",
+    "DRAWDOWN": "close",
+    "PRICE": "close",
+    "PE_RATIO": "pe",
+}
+# PRICE keys that need intraday data the daily closing series does not have
+UNSUPPORTED_PRICE_KEYS = {
+    "fromTodayOpenPrice",
+    "withinPastXWeekValue",
+    "fromRecentHighestPrice",
+}
+# Drawdowns shallower than this are left out of the drawdown list
+SIGNIFICANT_DRAWDOWN = -0.05
+
+
+def backtest_alert(alert, closes=None, pe=None):
+    """
+    Every day an alert would have fired over a daily history, evaluated
+    with whole-array NumPy expressions rather than by replaying ticks.
+
+    `closes` / `pe` are `series_to_arrays` dicts (`{"time", "value"}`).
+    Each day is evaluated at its close, against references built from the
+    days before it (no look-ahead). Like the live alert, each advance key
+    fires at most once per day. Returns per-key firing dates and counts,
+    the union of firing days and the keys that cannot be backtested.
+    """
+    start = time.perf_counter()
+    condition = alert["condition"]
+    series = BACKTEST_SERIES.get(condition)
+    if series is None:
+        raise ValueError(f"Backtest does not support {condition} alerts")
+    arrays = closes if series == "close" else pe
+    if arrays is None:
+        raise ValueError(f"{condition} backtest needs the {series} series")
+
+    dates = np.asarray(arrays["time"], dtype="datetime64[D]")
+    values = np.asarray(arrays["value"], dtype=np.float64)
+    rules = {
+        "DMA": _dma_rules,
+        "RSI": _rsi_rules,
+        "DRAWDOWN": _drawdown_rules,
+        "PRICE": _price_rules,
+        "PE_RATIO": _pe_rules,
+    }[condition]
+    masks, unsupported = rules(alert, dates, values) if len(values) else ({}, [])
+
+    fired_any = np.zeros(len(values), dtype=bool)
+    keys = {}
+    for key, mask in masks.items():
+        mask = np.asarray(mask, dtype=bool)
+        fired_any |= mask
+        keys[key] = _summary(dates, mask)
+
+    result = _summary(dates, fired_any)
+    result.update(
+        {
+            "condition": condition,
+            "series": series,
+            "days": int(len(values)),
+            "start": str(dates[0]) if len(dates) else None,
+            "end": str(dates[-1]) if len(dates) else None,
+            "keys": keys,
+            "unsupported": sorted(unsupported),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+    )
+    return result
+
+
+def _summary(dates, mask):
+    fired = np.flatnonzero(mask)
+    # A run of consecutive firing days counts as one episode
+    episodes = int(np.count_nonzero(mask[1:] & ~mask[:-1]) + (len(mask) and mask[0]))
+    return {
+        "count": int(len(fired)),
+        "episodes": episodes,
+        "rate": round(len(fired) / len(mask), 4) if len(mask) else 0.0,
+        "first": str(dates[fired[0]]) if len(fired) else None,
+        "last": str(dates[fired[-1]]) if len(fired) else None,
+        "dates": np.datetime_as_string(dates[fired], unit="D").tolist(),
+    }
+
+
+def _run_length(holds):
+    """Consecutive days (ending at each day) on which `holds` is true."""
+    idx = np.arange(len(holds))
+    last_break = np.maximum.accumulate(np.where(holds, -1, idx))
+    return idx - last_break
+
+
+def _previous(values, idx):
+    """values[idx] where idx >= 0, NaN elsewhere."""
+    out = np.full(len(idx), np.nan)
+    ok = idx >= 0
+    out[ok] = values[idx[ok]]
+    return out
+
+
+def _window_extreme(dates, values, days, highest):
+    """
+    Highest / lowest value dated within `days` days up to and including
+    each day (the whole history so far when `days` is falsy).
+    """
+    if not days:
+        accumulate = np.fmax if highest else np.fmin
+        return accumulate.accumulate(values)
+    rolling = pd.Series(values, index=pd.DatetimeIndex(dates)).rolling(f"{days}D")
+    return (rolling.max() if highest else rolling.min()).to_numpy()
+
+
+def _moved(alert, price, reference):
+    """GOING_UP / GOING_DOWN by `value` (percent or price) from `reference`."""
+    change = price - reference
+    metric = change / reference * 100 if alert["valueType"] == "PERCENTAGE" else change
+    if alert["subCondition"] == "GOING_UP":
+        return metric >= alert["value"]
+    return metric <= -alert["value"]
+
+
+def _nearing(alert, price, reference, above):
+    """Within `value` of `reference`, approached from above or below."""
+    distance = price - reference if above else reference - price
+    metric = (
+        distance / reference * 100 if alert["valueType"] == "PERCENTAGE" else distance
+    )
+    return (metric >= 0) & (metric <= alert["value"])
+
+
+def _dma_rules(alert, dates, closes):
+    conds = alert.get("dmaAdvanceCondition") or {}
+    masks = {}
+    for window in alert.get("dmaWindow") or []:
+        dma = compute_sma(closes, int(window))
+        valid = ~np.isnan(dma)
+        rules = {}
+        if conds.get("touchedDma"):
+            rules["touchedDma"] = closes >= dma
+        if conds.get("fallXFromDma"):
+            rules["fallXFromDma"] = closes < dma * (
+                1 - conds["fallXFromDmaValue"] / 100
+            )
+        if conds.get("riseXFromDma"):
+            # The live handler reads the fall value for both directions
+            rules["riseXFromDma"] = closes > dma * (
+                1 + conds["fallXFromDmaValue"] / 100
+            )
+        if conds.get("nearDma"):
+            band = conds["nearDmaValue"] / 100
+            rules["nearDma"] = (closes >= dma * (1 - band)) & (
+                closes <= dma * (1 + band)
+            )
+        for key, holds in (
+            ("sustainXDayAboveDma", closes >= dma),
+            ("sustainXDayBelowDma", closes <= dma),
+        ):
+            if conds.get(key):
+                rules[key] = _run_length(holds & valid) >= conds[f"{key}Value"]
+        # Keys are deduplicated per alert, not per window
+        for key, mask in rules.items():
+            masks[key] = masks.get(key, False) | (mask & valid)
+    return masks, []
+
+
+def _rsi_rules(alert, dates, closes):
+    conds = alert.get("rsiAdvanceCondition") or {}
+    rsi = compute_rsi(closes, int(alert["rsiPeriod"]))
+    masks = {}
+    if conds.get("rsiLessThanX"):
+        masks["rsiLessThanX"] = rsi < conds["rsiLessThanXValue"]
+    if conds.get("rsiGreaterThanX"):
+        masks["rsiGreaterThanX"] = rsi > conds["rsiGreaterThanXValue"]
+    if conds.get("rsiSpecificRange"):
+        masks["rsiSpecificRange"] = (rsi > conds["lowRange"]) & (
+            rsi < conds["highRange"]
+        )
+    # Below / above every RSI value of the previous N days
+    for key, highest in (
+        ("rsiHistoricalLowExtreme", False),
+        ("rsiHistoricalHighExtreme", True),
+    ):
+        n = int(conds.get(f"{key}Value") or 0)
+        if not n:
+            continue
+        mask = np.zeros(len(rsi), dtype=bool)
+        if len(rsi) > n:
+            windows = sliding_window_view(rsi[:-1], n)
+            if highest:
+                mask[n:] = rsi[n:] > windows.max(axis=1)
+            else:
+                mask[n:] = rsi[n:] < windows.min(axis=1)
+        masks[key] = mask
+    return masks, []
+
+
+def _drawdown_rules(alert, dates, closes):
+    """
+    The drawdown list as of each day, from the closes before it: the
+    significant drawdown periods (the latest possibly still ongoing), the
+    deepest one and the previous one, as the live handler builds it from
+    the cached daily series.
+    """
+    conds = alert.get("drawdownAdvanceCondition") or {}
+    enabled = [key for key, value in conds.items() if value is True]
+    t = np.arange(len(closes))
+    before = np.maximum(t - 1, 0)
+
+    running_max = np.maximum.accumulate(closes)
+    drawdowns = closes / running_max - 1
+    boundaries = np.diff(np.concatenate([[False], drawdowns < 0, [False]]).astype(int))
+    starts = np.flatnonzero(boundaries == 1)
+    ends = np.flatnonzero(boundaries == -1) - 1
+    # Lowest close of the current (or last) period so far; bars back at a
+    # new high never lower it
+    period = np.cumsum(boundaries[:-1] == 1) - 1
+    trough_so_far = pd.Series(closes).groupby(period).cummin().to_numpy()
+
+    # A period joins the list the day after it first falls below -5%
+    deep = np.flatnonzero(drawdowns < SIGNIFICANT_DRAWDOWN)
+    significant, first_deep = np.unique(period[deep], return_index=True)
+    if len(significant) == 0:
+        return {key: np.zeros(len(closes), dtype=bool) for key in enabled}, []
+    listed = np.searchsorted(deep[first_deep] + 1, t, side="right")
+
+    final_trough = trough_so_far[ends[significant]]
+    final_drawdown = final_trough / running_max[starts[significant]] - 1
+
+    # Deepest drawdown so far and the close at its bottom
+    deepest = np.minimum.accumulate(drawdowns)
+    new_low = drawdowns < np.concatenate([[0.0], deepest[:-1]])
+    bottom = np.maximum.accumulate(np.where(new_low, t, 0))
+    worst_price = closes[bottom[before]]
+
+    # list[0]: the latest significant period; list[1]: the one before it
+    latest = significant[np.maximum(listed - 1, 0)]
+    current_trough = trough_so_far[np.minimum(before, ends[latest])]
+    last_price = _previous(final_trough, listed - 2)
+    last_drawdown = _previous(final_drawdown * 100, listed - 2)
+    has_list = (listed >= 1) & (t >= 1)
+    has_last = (listed >= 2) & (t >= 1)
+
+    masks = {}
+    if conds.get("nearLastDrawdown"):
+        tolerance = conds["nearLastDrawdownValue"] / 100
+        # Drawdowns are negative: (1 + tolerance) is the deeper bound
+        lower = last_drawdown * (1 + tolerance)
+        upper = last_drawdown * (1 - tolerance)
+        current = drawdowns * 100
+        masks["nearLastDrawdown"] = has_last & (current >= lower) & (current <= upper)
+    if conds.get("priceSurpassLastDrawdown"):
+        masks["priceSurpassLastDrawdown"] = has_last & (closes < last_price)
+    if conds.get("priceSurpassMultipleHistoricalDrawdown"):
+        masks["priceSurpassMultipleHistoricalDrawdown"] = has_list & (
+            closes < worst_price
+        )
+    if conds.get("priceApproachHistoricalDrawdown"):
+        tolerance = conds["priceApproachHistoricalDrawdownValue"] / 100
+        masks["priceApproachHistoricalDrawdown"] = (
+            has_list
+            & (closes >= worst_price)
+            & (closes <= worst_price * (1 + tolerance))
+        )
+    if conds.get("priceRecoverAfterDrawdown"):
+        tolerance = conds["priceRecoverAfterDrawdownValue"] / 100
+        masks["priceRecoverAfterDrawdown"] = has_list & (
+            closes > current_trough * (1 + tolerance)
+        )
+    return masks, []
+
+
+def _price_rules(alert, dates, closes):
+    if alert.get("subCondition") not in ("GOING_UP", "GOING_DOWN"):
+        return {}, []
+    conds = alert.get("priceAdvanceCondition") or {}
+    enabled = [key for key in GOING_UP_DOWN if conds.get(key) is True]
+    days = int(alert.get("days") or 1)
+    weeks = int(alert.get("weeks") or 1)
+    # Monday of each day's week (1970-01-01 was a Thursday)
+    monday = dates - (dates.astype(np.int64) + 3) % 7
+
+    def close_on_or_before(targets):
+        return _previous(closes, np.searchsorted(dates, targets, side="right") - 1)
+
+    references = {
+        "fromYesterdayClosePrice": lambda: _previous(
+            closes, np.arange(len(closes)) - 1
+        ),
+        # Last week's close: the daily series has no weekly open
+        "withinCurrentWeek": lambda: _previous(
+            closes, np.searchsorted(dates, monday, side="left") - 1
+        ),
+        "withinPastXDays": lambda: close_on_or_before(dates - days),
+        "withinPastXWeek": lambda: close_on_or_before(dates - 7 * weeks),
+    }
+    masks = {}
+    for key in enabled:
+        if key in references:
+            masks[key] = _moved(alert, closes, references[key]())
+        elif key == "withinPastXDaysValue":
+            extreme = _window_extreme(
+                dates, closes, days + 1, alert["subCondition"] == "GOING_DOWN"
+            )
+            masks[key] = _moved(alert, closes, extreme)
+        elif key == "nearing52WeekLow":
+            low = _window_extreme(dates, closes, 52 * 7 + 1, highest=False)
+            masks[key] = _nearing(alert, closes, low, above=True)
+        elif key == "nearing52WeekHigh":
+            high = _window_extreme(dates, closes, 52 * 7 + 1, highest=True)
+            masks[key] = _nearing(alert, closes, high, above=False)
+        elif key == "nearingAllTimeHigh":
+            high = _window_extreme(dates, closes, None, highest=True)
+            masks[key] = _nearing(alert, closes, high, above=False)
+    return masks, [key for key in enabled if key in UNSUPPORTED_PRICE_KEYS]
+
+
+def _pe_rules(alert, dates, pe):
+    conds = alert.get("peRatioAdvanceCondition") or {}
+    masks = {}
+    if conds.get("peRatioLessThanX"):
+        masks["peRatioLessThanX"] = pe < conds["peRatioLessThanXValue"]
+    if conds.get("peRatioGreaterThanX"):
+        masks["peRatioGreaterThanX"] = pe > conds["peRatioGreaterThanXValue"]
+    if conds.get("peRatioSpecificRange"):
+        masks["peRatioSpecificRange"] = (pe >= conds["lowRange"]) & (
+            pe <= conds["highRange"]
+        )
+    for key, highest in (
+        ("peRatioNearXYearLow", False),
+        ("peRatioNearXYearHigh", True),
+    ):
+        if not conds.get(key):
+            continue
+        extreme = _window_extreme(dates, pe, int(conds[f"{key}Year"] * 365), highest)
+        band = conds[f"{key}Value"] / 100
+        masks[key] = (pe >= extreme * (1 - band)) & (pe <= extreme * (1 + band))
+    if conds.get("peRatioHistoricalExtreme"):
+        masks["peRatioHistoricalExtreme"] = pe >= _window_extreme(
+            dates, pe, None, highest=True
+        )
+    # Monotonic over the entries of the last N days (at least N - 1 of them)
+    for key, increasing in (
+        ("peRatioTrendingUp", True),
+        ("peRatioTrendingDown", False),
+    ):
+        if not conds.get(key):
+            continue
+        window = int(conds[f"{key}Value"])
+        steps = np.diff(pe)
+        broken = np.concatenate(
+            [[0], np.cumsum(steps < 0 if increasing else steps > 0)]
+        )
+        first = np.searchsorted(dates, dates - window, side="right")
+        count = np.arange(len(pe)) - first + 1
+        masks[key] = (count >= max(window - 1, 2)) & (broken == broken[first])
+    return masks, []
@@ -0,0 +1,65 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from src.utils.metrics import incr, record_timing
+
+# Worker processes for CPU-heavy indicator work; 0 runs it inline on the
+# event loop (useful when debugging).
+COMPUTE_WORKERS = int(
+    os.getenv("COMPUTE_WORKERS", str(max((os.cpu_count() or 2) - 1, 1)))
+)
+
+_pool = None
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that runs an event loop and worker
+        # threads can deadlock the child
+        _pool = ProcessPoolExecutor(
+            max_workers=COMPUTE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def run_compute(fn, *args, name: str = None):
+    """
+    Run the pure function `fn(*args)` in the compute pool and await its
+    result. `fn` must be importable (module level) and its arguments and
+    result should be NumPy arrays or plain values, not DataFrames, to keep
+    the pickled payloads small.
+
+    Records under `compute.<name>`: the worker time (event-loop blocking
+    avoided) and the round trip including the payload transfer.
+    """
+    name = name or fn.__name__
+    start = time.perf_counter()
+    if COMPUTE_WORKERS <= 0:
+        result = fn(*args)
+        record_timing(f"compute.{name}.inline_seconds", time.perf_counter() - start)
+        return result
+
+    loop = asyncio.get_running_loop()
+    result, busy = await loop.run_in_executor(get_pool(), _timed, fn, *args)
+    record_timing(f"compute.{name}.worker_seconds", busy)
+    record_timing(f"compute.{name}.roundtrip_seconds", time.perf_counter() - start)
+    incr("compute.jobs")
+    incr("compute.loop_ms_saved", round(busy * 1000))
+    return result
+
+
+def shutdown_compute():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
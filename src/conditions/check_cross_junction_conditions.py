@@ -0,0 +1,115 @@
+import numpy as np
+from src.alert_cache import get_alert_triggered
+from src.alert_trigger import run_alert_trigger
+from src.price_history import get_closing_history
+from src.utils.trading_calendar import local_today
+
+
+class CrossTracker:
+    """
+    Sign of the fast-minus-slow SMA spread for one (ticker, fast, slow) pair.
+
+    Seeded once per daily history from the last `slow` completed closes;
+    after that each live price is an O(1) update of the provisional bar.
+    """
+
+    def __init__(self, history, fast: int, slow: int, today):
+        self.history = history
+        self.version = history.version
+        closes = history.values
+        # Today's bar in the cached series is provisional: live ticks replace it
+        if len(closes) and history.dates[-1].astype(object) >= today:
+            closes = closes[:-1]
+        self.fast = fast
+        self.slow = slow
+        self.ready = len(closes) >= slow
+        if not self.ready:
+            return
+        # Sums of the closes that stay in each window once a new bar is added
+        self.fast_base = float(np.sum(closes[len(closes) - fast + 1 :]))
+        self.slow_base = float(np.sum(closes[len(closes) - slow + 1 :]))
+        self.bar_sign = self._sign(np.mean(closes[-fast:]) - np.mean(closes[-slow:]))
+        self.sign = self.bar_sign
+        self.fast_ma = self.slow_ma = None
+
+    @staticmethod
+    def _sign(spread):
+        return 1 if spread > 0 else -1 if spread < 0 else 0
+
+    def is_current(self, history):
+        return self.history is history and self.version == history.version
+
+    def update(self, price: float):
+        """Spread sign with `price` as the live (provisional) bar."""
+        self.fast_ma = (self.fast_base + price) / self.fast
+        self.slow_ma = (self.slow_base + price) / self.slow
+        self.sign = self._sign(self.fast_ma - self.slow_ma)
+        return self.sign
+
+
+# (ticker, fast, slow) -> CrossTracker, shared by every alert on that pair
+_trackers = {}
+# (alert id, ticker, fast, slow) -> last spread sign seen by the alert
+_alert_signs = {}
+
+
+async def get_cross_tracker(ticker: str, fast: int, slow: int):
+    history = await get_closing_history(ticker)
+    tracker = _trackers.get((ticker, fast, slow))
+    if tracker is None or not tracker.is_current(history):
+        tracker = CrossTracker(history, fast, slow, local_today(ticker))
+        _trackers[(ticker, fast, slow)] = tracker
+    return tracker
+
+
+async def check_cross_junction_conditions(alert):
+    ticker = alert["tickerNm"]
+    fast, slow = sorted(int(w) for w in alert["crossJunctionWindow"][:2])
+    price = alert.get("current_price")
+    if price is None or fast == slow:
+        return
+
+    tracker = await get_cross_tracker(ticker, fast, slow)
+    if not tracker.ready:
+        return
+    sign = tracker.update(float(price))
+
+    # Compared against the alert's own last sign, so every alert on a shared
+    # pair sees the flip; a new daily bar reseeds the tracker, and a flip at
+    # that bar shows up here as well.
+    state_key = (str(alert["_id"]), ticker, fast, slow)
+    previous = _alert_signs.get(state_key, tracker.bar_sign)
+    if sign != 0:
+        _alert_signs[state_key] = sign
+    if sign == 0 or previous == 0 or sign == previous:
+        return
+
+    crossAdvanceCondition = alert.get("crossJunctionAdvanceCondition") or {}
+    emailAddress = alert["emailAddress"][0]
+    alertTitleTickerFullName = alert["tickerNm"]
+    alertMessageTickerFullName = alert["tickerNm"]
+
+    if sign > 0:
+        key, label, direction = "goldenCross", "Golden Cross", "above"
+    else:
+        key, label, direction = "deathCross", "Death Cross", "below"
+
+    if not crossAdvanceCondition.get(key) or await get_alert_triggered(
+        ticker, emailAddress, key=key
+    ):
+        return
+
+    alertTriggered = [
+        {
+            "advanceCondition": key,
+            "condition": alert["condition"],
+            "subCondition": "",
+            "alertTitle": f"{alertTitleTickerFullName} {label} {fast}/{slow} DMA",
+            "alertMessage": (
+                f"{alertMessageTickerFullName} {fast} DMA crossed {direction} its {slow} DMA. "
+                f"Price: {price}, {fast} DMA: {round(tracker.fast_ma, 2)}, "
+                f"{slow} DMA: {round(tracker.slow_ma, 2)}"
+            ),
+        }
+    ]
+    await run_alert_trigger(alert, alertTriggered, key=key)
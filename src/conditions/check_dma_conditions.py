@@ -1,14 +1,17 @@
-from datetime import datetime
-from src.apis.get_ticker_closing_price import get_ticker_closing_price
+import numpy as np
+from src.indicators import indicators
+from src.price_history import get_closing_history
+from src.utils.trading_calendar import local_today
 
 
 async def check_dma_conditions(alert):
 
     ticker = alert["tickerNm"]
-    data = await get_ticker_closing_price(ticker)
-    stock_data = [{"date": d["time"], "close": d["value"]} for d in data]
-    lastCloseDate = datetime.strptime(stock_data[-1]["date"], "%Y-%m-%d").date()
-    todayDate = datetime.today().date()
+    history = await get_closing_history(ticker)
+    if len(history) == 0:
+        return
+    lastCloseDate = history.dates[-1].astype(object)
+    todayDate = local_today(ticker)
 
     alertTriggered = []
 
@@ -19,32 +22,21 @@ async def check_dma_conditions(alert):
         dmaWindowList = alert["dmaWindow"]
         dmaAdvanceCondition = alert["dmaAdvanceCondition"]
 
-        # Convert stock dates once and sort ascending
-        stock_data_sorted = [
-            {**s, "date": datetime.strptime(s["date"], "%Y-%m-%d")} for s in stock_data
-        ]
-        stock_data_sorted.sort(key=lambda x: x["date"])
-
-        def calculate_dma(data, window):
-            dma_values = []
-            for i in range(window - 1, len(data)):
-                window_data = data[i + 1 - window : i + 1]
-                dma = sum(item["close"] for item in window_data) / window
-                dma_values.append({"date": data[i]["date"], "dma": dma})
-            return dma_values
+        closes = history.values
 
         for dmaWindow in dmaWindowList:
-            dma_result = calculate_dma(stock_data_sorted, dmaWindow)
-            if not dma_result:
+            # Shared across every alert using this ticker and window
+            dma = await indicators.sma(ticker, history, int(dmaWindow))
+            if np.isnan(dma[-1]):
                 continue
 
-            currentDma = dma_result[-1]["dma"]
+            currentDma = float(dma[-1])
 
-            # DMA mapping by date for quick lookup
-            dma_dict = {entry["date"]: entry["dma"] for entry in dma_result}
+            # Dates before the first full window compare against the current DMA
+            dma_filled = np.where(np.isnan(dma), currentDma, dma)
 
             # Last price
-            currentPrice = stock_data_sorted[-1]["close"]
+            currentPrice = float(closes[-1])
 
             # ----- Alerts -----
             if dmaAdvanceCondition.get("touchedDma") and currentPrice >= currentDma:
@@ -105,21 +97,16 @@ async def check_dma_conditions(alert):
             # Sustained above/below DMA
             for sustain_type in ["sustainXDayAboveDma", "sustainXDayBelowDma"]:
                 sustain_value_key = f"{sustain_type}Value"
-                consecutive = 0
-
-                # Iterate from latest to oldest
-                for stock in reversed(stock_data_sorted):
-                    dma_val = dma_dict.get(stock["date"], currentDma)
-                    if (
-                        sustain_type == "sustainXDayAboveDma"
-                        and stock["close"] >= dma_val
-                    ) or (
-                        sustain_type == "sustainXDayBelowDma"
-                        and stock["close"] <= dma_val
-                    ):
-                        consecutive += 1
-                    else:
-                        break
+
+                # Count consecutive days from the latest close backwards
+                if sustain_type == "sustainXDayAboveDma":
+                    holds = closes >= dma_filled
+                else:
+                    holds = closes <= dma_filled
+                broken = np.flatnonzero(~holds)
+                consecutive = int(
+                    len(holds) if len(broken) == 0 else len(holds) - 1 - broken[-1]
+                )
 
                 if (
                     dmaAdvanceCondition.get(sustain_type)
@@ -1,96 +1,137 @@
 from src.alert_cache import get_alert_triggered
 from src.alert_trigger import run_alert_trigger
-from src.apis.get_ticker_closing_price import get_ticker_closing_price
-import pandas as pd
+from src.compute import run_compute
+from src.price_history import get_closing_history
+from src.utils.trading_calendar import local_today_str
 import numpy as np
 
+# ticker -> (local date, result); the closing series only changes daily
+_drawdown_cache = {}
+
 
 async def compute_drawdowns(ticker: str):
     """
     Returns drawdown_list, current drawdown, and latest running max price.
     """
-    data = await get_ticker_closing_price(ticker)
+    today = local_today_str(ticker)
+    cached = _drawdown_cache.get(ticker)
+    if cached is not None and cached[0] == today:
+        return cached[1]
+
+    history = await get_closing_history(ticker)
 
-    # Direct DataFrame creation without deep copy
-    df = pd.DataFrame(data)
-    df["Date"] = pd.to_datetime(df["time"], utc=True)
-    df = df.set_index("Date")[["value"]].rename(columns={"value": "Close"})
+    # CPU-bound; runs in the compute pool on the bare arrays
+    result = await run_compute(
+        drawdown_summary, history.dates, history.values, name="drawdowns"
+    )
+    _drawdown_cache[ticker] = (today, result)
+    return result
 
-    # Vectorized operations
-    df["running_max"] = df["Close"].cummax()
-    df["drawdown"] = df["Close"] / df["running_max"] - 1
 
-    current_drawdown = df["drawdown"].iloc[-1]
-    current_date = df.index[-1]
+MONTHS = np.array(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+)
 
-    # Vectorized drawdown period detection
-    drawdown_periods = _extract_drawdown_periods_vectorized(df, current_date)
 
-    # Filter significant drawdowns (> 5%)
-    drawdown_list = [d for d in drawdown_periods if d["max_drawdown"] < -5]
+def drawdown_summary(dates, closes):
+    """
+    Pure computation behind compute_drawdowns, from the daily dates
+    (datetime64[D]) and closes.
+    """
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    closes = np.asarray(closes, dtype=np.float64)
+
+    running_max = np.maximum.accumulate(closes)
+    drawdowns = closes / running_max - 1
+
+    periods = _extract_drawdown_periods(dates, closes, running_max, drawdowns)
+
+    # Keep significant drawdowns (> 5%), latest first
+    drawdown_list = [d for d in periods if d["max_drawdown"] < -5]
     drawdown_list.reverse()
 
-    return drawdown_list, current_drawdown, df["running_max"].iloc[-1]
+    return drawdown_list, float(drawdowns[-1]), float(running_max[-1])
 
 
-def _extract_drawdown_periods_vectorized(df, current_date):
-    """Extract drawdown periods using vectorized operations."""
-    drawdowns = df["drawdown"].values
-    dates = df.index
+def _format_dates(dates):
+    """datetime64[D] -> "%d-%b-%y" strings, e.g. "25-Aug-03"."""
+    months = dates.astype("datetime64[M]")
+    years = dates.astype("datetime64[Y]").astype(int) + 1970
+    days = (dates - months).astype(int) + 1
+    names = MONTHS[months.astype(int) % 12]
+    return [f"{d:02d}-{m}-{y % 100:02d}" for d, m, y in zip(days, names, years)]
 
-    # Identify drawdown boundaries
-    is_drawdown = drawdowns < 0
-    boundaries = np.diff(np.concatenate([[False], is_drawdown, [False]]).astype(int))
-    starts = np.where(boundaries == 1)[0]
-    ends = np.where(boundaries == -1)[0]
-
-    periods = []
-    for start_idx, end_idx in zip(starts, ends):
-        start_date = dates[start_idx]
-        end_date = dates[end_idx] if end_idx < len(dates) else current_date
-        ongoing = end_idx >= len(dates)
-
-        period = _extract_drawdown_stats(df, start_date, end_date, ongoing)
-        periods.append(period)
-
-    # Handle ongoing drawdown
-    if is_drawdown[-1] and (
-        len(starts) == 0 or starts[-1] >= ends[-1] if len(ends) > 0 else True
-    ):
-        start_idx = starts[-1] if len(starts) > 0 else np.where(is_drawdown)[0][0]
-        start_date = dates[start_idx]
-        period = _extract_drawdown_stats(df, start_date, current_date, ongoing=True)
-        periods.append(period)
-
-    return periods
-
-
-def _extract_drawdown_stats(df, start, end, ongoing=False):
-    """Extract stats of a drawdown period."""
-    dd_slice = df.loc[start:end]
-
-    peak_price = df["running_max"].loc[start]
-    low_price = dd_slice["Close"].min()
-    max_dd_value = dd_slice["drawdown"].min()
-    max_dd_date = dd_slice["drawdown"].idxmin()
-    max_dd_price = dd_slice["Close"].loc[max_dd_date]
-    duration = (end - start).days
-
-    opportunity = (
-        None if ongoing else round(((peak_price - low_price) / low_price) * 100, 2)
+
+def _segment_argmin(values, starts, stops):
+    """
+    Per segment values[start:stop], the minimum and the index of its first
+    occurrence, in one pass with np.minimum.reduceat.
+    """
+    # Sentinel so a segment may end at len(values)
+    padded = np.append(values, np.inf)
+    bounds = np.empty(2 * len(starts), dtype=np.int64)
+    bounds[0::2], bounds[1::2] = starts, stops
+    minima = np.minimum.reduceat(padded, bounds)[0::2]
+
+    lengths = stops - starts
+    segment = np.repeat(np.arange(len(starts)), lengths)
+    positions = np.arange(lengths.sum()) - np.repeat(
+        np.cumsum(lengths) - lengths, lengths
     )
+    positions += np.repeat(starts, lengths)
+    hits = np.flatnonzero(values[positions] == minima[segment])
+    _, first = np.unique(segment[hits], return_index=True)
+    return minima, positions[hits[first]]
 
-    return {
-        "start_date": start.strftime("%d-%b-%y"),
-        "end_date": "TBD" if ongoing else end.strftime("%d-%b-%y"),
-        "max_drawdown": round(max_dd_value * 100, 2),
-        "duration": f"{duration} days",
-        "peak_price": round(peak_price, 2),
-        "low_price": round(low_price, 2),
-        "opportunity": opportunity,
-        "max_drawdown_date": max_dd_date.strftime("%d-%b-%y"),
-        "max_drawdown_price": round(max_dd_price, 2),
-    }
+
+def _extract_drawdown_periods(dates, closes, running_max, drawdowns):
+    """
+    All drawdown periods' stats at once. A period runs from the first bar
+    below the running max through the bar that recovers it (or the last
+    bar when still ongoing).
+    """
+    n = len(drawdowns)
+    is_drawdown = drawdowns < 0
+    boundaries = np.diff(np.concatenate([[False], is_drawdown, [False]]).astype(int))
+    starts = np.flatnonzero(boundaries == 1)
+    ends = np.flatnonzero(boundaries == -1)
+    if len(starts) == 0:
+        return []
+
+    ongoing = ends >= n
+    ends = np.minimum(ends, n - 1)
+    stops = ends + 1
+
+    low_prices, _ = _segment_argmin(closes, starts, stops)
+    max_dd_values, dd_idx = _segment_argmin(drawdowns, starts, stops)
+
+    peak_prices = running_max[starts]
+    durations = (dates[ends] - dates[starts]).astype(int)
+    opportunities = np.round((peak_prices - low_prices) / low_prices * 100, 2)
+
+    start_dates = _format_dates(dates[starts])
+    end_dates = _format_dates(dates[ends])
+    max_dd_dates = _format_dates(dates[dd_idx])
+
+    max_drawdowns = np.round(max_dd_values * 100, 2)
+    peak_prices = np.round(peak_prices, 2)
+    low_prices = np.round(low_prices, 2)
+    max_dd_prices = np.round(closes[dd_idx], 2)
+
+    return [
+        {
+            "start_date": start_dates[i],
+            "end_date": "TBD" if ongoing[i] else end_dates[i],
+            "max_drawdown": max_drawdowns[i],
+            "duration": f"{durations[i]} days",
+            "peak_price": peak_prices[i],
+            "low_price": low_prices[i],
+            "opportunity": None if ongoing[i] else opportunities[i],
+            "max_drawdown_date": max_dd_dates[i],
+            "max_drawdown_price": max_dd_prices[i],
+        }
+        for i in range(len(starts))
+    ]
 
 
 def _create_alert(condition, title, message):
@@ -136,6 +177,11 @@ async def check_drawdown_conditions(alert):
     worst_dd = min(drawdown_list, key=lambda x: x["max_drawdown"])
     current_dd_info = drawdown_list[0]
 
+    async def trigger(entry, key):
+        # Only the key that fired is recorded, with its own entry
+        alertTriggered.append(entry)
+        await run_alert_trigger(alert, [entry], key=key)
+
     alert_data = {
         "alert": alert,
         "alerts": alertTriggered,
@@ -153,15 +199,15 @@ async def check_drawdown_conditions(alert):
             lower, upper = dd_val * (1 - tolerance), dd_val * (1 + tolerance)
 
             if lower <= currentDrawdown * 100 <= upper:
-                alertTriggered.append(
+                await trigger(
                     _create_alert(
                         "nearLastDrawdown",
                         f"{ticker} Near Last Drawdown",
                         f"{ticker} is near its last drawdown. Price {currentPrice} is within "
                         f"{drawdownAdvanceCondition['nearLastDrawdownValue']}% of {round(dd_val, 2)}%.",
-                    )
+                    ),
+                    key="nearLastDrawdown",
                 )
-        await run_alert_trigger(alert, alertTriggered, key="nearLastDrawdown")
 
     # Alert 2: Price Surpasses Last Drawdown Price
     if drawdownAdvanceCondition.get("priceSurpassLastDrawdown") and last_dd:
@@ -169,14 +215,14 @@ async def check_drawdown_conditions(alert):
             ticker, emailAddress, key="priceSurpassLastDrawdown"
         ):
             if currentPrice < last_dd["max_drawdown_price"]:
-                alertTriggered.append(
+                await trigger(
                     _create_alert(
                         "priceSurpassLastDrawdown",
                         f"{ticker} Price Surpass Last Drawdown",
                         f"{ticker} has fallen below the last drawdown price ({currentPrice}).",
-                    )
+                    ),
+                    key="priceSurpassLastDrawdown",
                 )
-        await run_alert_trigger(alert, alertTriggered, key="priceSurpassLastDrawdown")
 
     # Alert 3: Surpasses Historical Drawdown
     if drawdownAdvanceCondition.get("priceSurpassMultipleHistoricalDrawdown"):
@@ -184,16 +230,14 @@ async def check_drawdown_conditions(alert):
             ticker, emailAddress, key="priceSurpassMultipleHistoricalDrawdown"
         ):
             if currentPrice < worst_dd["max_drawdown_price"]:
-                alertTriggered.append(
+                await trigger(
                     _create_alert(
                         "priceSurpassMultipleHistoricalDrawdown",
                         f"{ticker} Surpass Historical Drawdown",
                         f"{ticker} fell below all historical drawdown prices. Current: {currentPrice}.",
-                    )
+                    ),
+                    key="priceSurpassMultipleHistoricalDrawdown",
                 )
-        await run_alert_trigger(
-            alert, alertTriggered, key="priceSurpassMultipleHistoricalDrawdown"
-        )
 
     # Alert 4: Price Approaches Historical Drawdown
     if drawdownAdvanceCondition.get("priceApproachHistoricalDrawdown"):
@@ -207,17 +251,15 @@ async def check_drawdown_conditions(alert):
             upper = dd_price * (1 + tolerance)
 
             if dd_price <= currentPrice <= upper:
-                alertTriggered.append(
+                await trigger(
                     _create_alert(
                         "priceApproachHistoricalDrawdown",
                         f"{ticker} Approach Historical Drawdown",
                         f"{ticker} is approaching its historical drawdown within "
                         f"{drawdownAdvanceCondition['priceApproachHistoricalDrawdownValue']}%.",
-                    )
+                    ),
+                    key="priceApproachHistoricalDrawdown",
                 )
-        await run_alert_trigger(
-            alert, alertTriggered, key="priceApproachHistoricalDrawdown"
-        )
 
     # Alert 5: Recover After Drawdown
     if drawdownAdvanceCondition.get("priceRecoverAfterDrawdown"):
@@ -229,12 +271,12 @@ async def check_drawdown_conditions(alert):
             upper = dd_price * (1 + tolerance)
 
             if currentPrice > upper:
-                alertTriggered.append(
+                await trigger(
                     _create_alert(
                         "priceRecoverAfterDrawdown",
                         f"{ticker} Price Recover After Drawdown",
                         f"{ticker} recovered {drawdownAdvanceCondition['priceRecoverAfterDrawdownValue']}%. "
                         f"Price is now {currentPrice}.",
-                    )
+                    ),
+                    key="priceRecoverAfterDrawdown",
                 )
-        await run_alert_trigger(alert, alertTriggered, key="priceRecoverAfterDrawdown")
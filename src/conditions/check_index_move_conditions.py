@@ -0,0 +1,58 @@
+from src.alert_cache import get_alert_triggered
+from src.alert_trigger import run_alert_trigger
+from src.index_aggregate import index_aggregates
+
+# priceAdvanceCondition keys an INDEX_MOVE alert can enable, with the
+# reference level each one compares against
+INDEX_MOVE_KEYS = {
+    "fromYesterdayClosePrice": ("previous_close", "today", "yesterday's close"),
+    "withinCurrentWeek": ("week_close", "this week", "last week's close"),
+}
+
+
+async def check_index_move_conditions(alert):
+    """
+    Index up / down by `value` percent today or this week, from the local
+    constituent aggregate (no upstream request per check).
+    """
+    index = alert["tickerNm"]
+    aggregate = index_aggregates.get(index)
+    if aggregate is None or not aggregate.ready:
+        return
+
+    advanceCondition = alert.get("priceAdvanceCondition") or {}
+    subCondition = alert["subCondition"]
+    value = alert["value"]
+    emailAddress = alert["emailAddress"][0]
+    alertTitleTickerFullName = alert["ticker"].get("nm") or index
+    alertMessageTickerFullName = alert["ticker"].get("nm") or index
+
+    for key, (reference, period, since) in INDEX_MOVE_KEYS.items():
+        if not advanceCondition.get(key):
+            continue
+        percentageChange = aggregate.change(getattr(aggregate, reference))
+        if subCondition == "GOING_UP" and percentageChange >= value:
+            label, verb = "Up", "risen"
+        elif subCondition == "GOING_DOWN" and percentageChange <= -value:
+            label, verb = "Down", "dropped"
+        else:
+            continue
+
+        if await get_alert_triggered(index, emailAddress, key):
+            continue
+
+        alertTriggered = [
+            {
+                "advanceCondition": key,
+                "subCondition": subCondition,
+                "valueType": "PERCENTAGE",
+                "condition": alert["condition"],
+                "alertTitle": f"{alertTitleTickerFullName} Going {label} {period.title()}",
+                "alertMessage": (
+                    f"{alertMessageTickerFullName} is going {label.lower()} {period}!\n"
+                    f"The index has {verb} {abs(round(percentageChange, 2))}% "
+                    f"from {since} across its constituents."
+                ),
+            }
+        ]
+        await run_alert_trigger(alert, alertTriggered, key=key)
@@ -1,10 +1,10 @@
-import asyncio
 import numpy as np
 
 from datetime import datetime
 from src.alert_cache import get_alert_triggered
 from src.alert_trigger import run_alert_trigger
 from src.apis.get_ticker_closing_price import get_ticker_closing_price
+from src.utils.trading_calendar import local_today
 
 
 async def check_opportunity_conditions(alert):
@@ -18,7 +18,7 @@ async def check_opportunity_conditions(alert):
     data = await get_ticker_closing_price(ticker)
     stock_data = [{"date": d["time"], "close": d["value"]} for d in data]
     lastCloseDate = datetime.strptime(stock_data[-1]["date"], "%Y-%m-%d").date()
-    todayDate = datetime.today().date()
+    todayDate = local_today(ticker)
     alertTriggered = []
 
     if alert["condition"] == "OPPORTUNITY":  # and lastCloseDate == todayDate:
@@ -63,6 +63,4 @@ async def check_opportunity_conditions(alert):
                     "alertMessage": alertMessage,
                 }
             )
-            asyncio.create_task(
-                run_alert_trigger(alert, alertTriggered, key=sub_condition)
-            )
+            await run_alert_trigger(alert, alertTriggered, key=sub_condition)
@@ -1,16 +1,18 @@
-import asyncio
 from datetime import datetime, timedelta
 from src.alert_cache import get_alert_triggered
 from src.alert_trigger import run_alert_trigger
 from src.apis.get_ticker_pe_ratio import get_ticker_pe_ratio
+from src.price_history import get_pe_history
+from src.utils.trading_calendar import local_today
 
 
-def filter_pe_by_days(pe_list, days):
-    threshold_date = datetime.now() - timedelta(days=days)
+def filter_pe_by_days(pe_list, days, today):
+    """Entries dated after `today` (exchange-local) minus `days`."""
+    threshold_date = today - timedelta(days=days)
     return [
         item
         for item in pe_list
-        if datetime.strptime(item["time"], "%Y-%m-%d") >= threshold_date
+        if datetime.strptime(item["time"], "%Y-%m-%d").date() > threshold_date
     ]
 
 
@@ -18,8 +20,8 @@ def pe_in_range(current, low, high):
     return low <= current <= high
 
 
-def check_trend(pe_list, days, increasing=True):
-    filtered = filter_pe_by_days(pe_list, days)
+def check_trend(pe_list, days, today, increasing=True):
+    filtered = filter_pe_by_days(pe_list, days, today)
     if len(filtered) < days - 1:
         return False, 0, 0, 0
     first, last = filtered[0]["value"], filtered[-1]["value"]
@@ -35,22 +37,14 @@ def check_trend(pe_list, days, increasing=True):
     return is_trending, first, last, change_pct
 
 
-def find_extreme(pe_list, years=None, highest=True):
+def find_extreme(pe_history, today, years=None, highest=True):
+    """Highest/lowest PE over the last `years` (all history if None)."""
+    start = 0
     if years:
-        cutoff = datetime.now() - timedelta(days=years * 365)
-        pe_list = [
-            item
-            for item in pe_list
-            if datetime.strptime(item["time"], "%Y-%m-%d") >= cutoff
-        ]
-    if not pe_list:
-        return None
-    extreme_obj = (
-        max(pe_list, key=lambda x: x["value"])
-        if highest
-        else min(pe_list, key=lambda x: x["value"])
-    )
-    return extreme_obj
+        cutoff = today - timedelta(days=years * 365)
+        # Entries dated strictly after the cutoff
+        start = pe_history.position(cutoff + timedelta(days=1))
+    return pe_history.highest(start) if highest else pe_history.lowest(start)
 
 
 async def check_pe_ratio_conditions(alert):
@@ -58,8 +52,9 @@ async def check_pe_ratio_conditions(alert):
     ticker = alert.get("tickerNm") or alert["ticker"]["ticker"]
     emailAddress = alert["emailAddress"][0]
 
-    def trigger_alert(alertTriggered, key):
-        asyncio.create_task(run_alert_trigger(alert, alertTriggered, key))
+    async def trigger_alert(alertTriggered, key):
+        # Only the entry just added for `key`; `alerts` collects every entry
+        await run_alert_trigger(alert, alertTriggered[-1:], key)
 
     if alert is None:
         return
@@ -68,8 +63,11 @@ async def check_pe_ratio_conditions(alert):
     alertTitleTickerFullName = alert["tickerNm"]
     alertMessageTickerFullName = alert["tickerNm"]
 
-    pe_list = await get_ticker_pe_ratio("GOOGL")
+    pe_list = await get_ticker_pe_ratio(ticker)
+    pe_history = await get_pe_history(ticker)
     currentPe = pe_list[-1]["value"]
+    # The exchange-local day, as used by the dedup keys and re-arm
+    today = local_today(ticker)
 
     # PE Less Than X
     if (
@@ -86,7 +84,7 @@ async def check_pe_ratio_conditions(alert):
                 "alertMessage": f'{alertMessageTickerFullName} The PE ratio has dropped to {round(currentPe,2)}, below your threshold of {conds["peRatioLessThanXValue"]}',
             }
         )
-        trigger_alert(alertTriggered=alerts, key="peRatioLessThanX")
+        await trigger_alert(alertTriggered=alerts, key="peRatioLessThanX")
 
     # PE Greater Than X
     if (
@@ -105,7 +103,7 @@ async def check_pe_ratio_conditions(alert):
                 "alertMessage": f'{alertMessageTickerFullName} The PE ratio has risen to {round(currentPe,2)}, above your threshold of {conds["peRatioGreaterThanXValue"]}',
             }
         )
-        trigger_alert(alertTriggered=alerts, key="peRatioGreaterThanX")
+        await trigger_alert(alertTriggered=alerts, key="peRatioGreaterThanX")
 
     # PE in Specific Range
     if conds.get("peRatioSpecificRange") and not await get_alert_triggered(
@@ -121,13 +119,15 @@ async def check_pe_ratio_conditions(alert):
                     "alertMessage": f'{alertMessageTickerFullName} The PE ratio is now {round(currentPe,2)}, within your range {conds["lowRange"]}-{conds["highRange"]}',
                 }
             )
-            trigger_alert(alertTriggered=alerts, key="peRatioSpecificRange")
+            await trigger_alert(alertTriggered=alerts, key="peRatioSpecificRange")
 
     # Near X-year Low
     if conds.get("peRatioNearXYearLow") and not await get_alert_triggered(
         ticker, emailAddress, key="peRatioNearXYearLow"
     ):
-        low_obj = find_extreme(pe_list, conds["peRatioNearXYearLowYear"], highest=False)
+        low_obj = find_extreme(
+            pe_history, today, conds["peRatioNearXYearLowYear"], highest=False
+        )
         if low_obj:
             lower, upper = low_obj["value"] * (
                 1 - conds["peRatioNearXYearLowValue"] / 100
@@ -142,14 +142,14 @@ async def check_pe_ratio_conditions(alert):
                         "alertMessage": f'{alertMessageTickerFullName} The PE ratio is {round(currentPe,2)}, within {conds["peRatioNearXYearLowValue"]}% of the {conds["peRatioNearXYearLowYear"]}-year low of {low_obj["value"]}',
                     }
                 )
-                trigger_alert(alertTriggered=alerts, key="peRatioNearXYearLow")
+                await trigger_alert(alertTriggered=alerts, key="peRatioNearXYearLow")
 
     # Near X-year High
     if conds.get("peRatioNearXYearHigh") and not await get_alert_triggered(
         ticker, emailAddress, key="peRatioNearXYearHigh"
     ):
         high_obj = find_extreme(
-            pe_list, conds["peRatioNearXYearHighYear"], highest=True
+            pe_history, today, conds["peRatioNearXYearHighYear"], highest=True
         )
         if high_obj:
             lower, upper = high_obj["value"] * (
@@ -165,13 +165,13 @@ async def check_pe_ratio_conditions(alert):
                         "alertMessage": f'{alertMessageTickerFullName} The PE ratio is {round(currentPe,2)}, within {conds["peRatioNearXYearHighValue"]}% of the {conds["peRatioNearXYearHighYear"]}-year high of {high_obj["value"]}',
                     }
                 )
-                trigger_alert(alertTriggered=alerts, key="peRatioNearXYearHigh")
+                await trigger_alert(alertTriggered=alerts, key="peRatioNearXYearHigh")
 
     # Historical Extreme
     if conds.get("peRatioHistoricalExtreme") and not await get_alert_triggered(
         ticker, emailAddress, key="peRatioHistoricalExtreme"
     ):
-        extreme_obj = find_extreme(pe_list, highest=True)
+        extreme_obj = find_extreme(pe_history, today, highest=True)
         if extreme_obj and currentPe >= extreme_obj["value"]:
             alerts.append(
                 {
@@ -182,14 +182,14 @@ async def check_pe_ratio_conditions(alert):
                     "alertMessage": f"{alertMessageTickerFullName} The PE ratio has reached {round(currentPe,2)}, surpassing previous historical levels.",
                 }
             )
-            trigger_alert(alertTriggered=alerts, key="peRatioHistoricalExtreme")
+            await trigger_alert(alertTriggered=alerts, key="peRatioHistoricalExtreme")
 
     # Trending Up
     if conds.get("peRatioTrendingUp") and not await get_alert_triggered(
         ticker, emailAddress, key="peRatioTrendingUp"
     ):
         trending, first, last, change = check_trend(
-            pe_list, conds["peRatioTrendingUpValue"], increasing=True
+            pe_list, conds["peRatioTrendingUpValue"], today, increasing=True
         )
         if trending:
             alerts.append(
@@ -201,14 +201,14 @@ async def check_pe_ratio_conditions(alert):
                     "alertMessage": f'{alertMessageTickerFullName} PE ratio increased {round(change,2)}% from {first} to {last} over past {conds["peRatioTrendingUpValue"]} days.',
                 }
             )
-            trigger_alert(alertTriggered=alerts, key="peRatioTrendingUp")
+            await trigger_alert(alertTriggered=alerts, key="peRatioTrendingUp")
 
     # Trending Down
     if conds.get("peRatioTrendingDown") and not await get_alert_triggered(
         ticker, emailAddress, key="peRatioTrendingDown"
     ):
         trending, first, last, change = check_trend(
-            pe_list, conds["peRatioTrendingDownValue"], increasing=False
+            pe_list, conds["peRatioTrendingDownValue"], today, increasing=False
         )
         if trending:
             alerts.append(
@@ -220,6 +220,6 @@ async def check_pe_ratio_conditions(alert):
                     "alertMessage": f'{alertMessageTickerFullName} PE ratio decreased {round(change,2)}% from {first} to {last} over past {conds["peRatioTrendingDownValue"]} days.',
                 }
             )
-            trigger_alert(alertTriggered=alerts, key="peRatioTrendingDown")
+            await trigger_alert(alertTriggered=alerts, key="peRatioTrendingDown")
 
     return alerts
@@ -7,6 +7,11 @@ from src.advance_condition import (
     check_within_past_x_weeks,
     check_within_past_x_week_value,
     check_within_from_recent_highest_price,
+    check_within_past_x_days,
+    check_within_past_x_days_value,
+    check_nearing_52_week_low,
+    check_nearing_52_week_high,
+    check_nearing_all_time_high,
 )
 
 
@@ -24,24 +29,19 @@ GOING_UP_DOWN = [
     "nearingAllTimeHigh",
 ]
 
+# 🔹 Cases that should NOT run get_alert_triggered() first
+SKIP_TRIGGER_CHECK = {
+    "withinPastXWeek",
+    "withinPastXWeekValue",
+    "fromRecentHighestPrice",
+}
+
 
 async def check_advance_condition(key: str, alert: any):
     alertTriggered = []
     ticker = alert.get("tickerNm") or alert["ticker"]["ticker"]
     emailAddress = alert["emailAddress"][0]
 
-    # 🔹 Cases that should NOT run get_alert_triggered() first
-    skip_trigger_check = {
-        "withinPastXWeek",
-        "withinPastXWeekValue",
-        "fromRecentHighestPrice",
-        "withinPastXDays",
-        "withinPastXDaysValue",
-        "nearing52WeekLow",
-        "nearing52WeekHigh",
-        "nearingAllTimeHigh",
-    }
-
     # 🔹 Map keys → handler functions
     handlers = {
         "fromTodayOpenPrice": lambda: check_from_today_open_price(
@@ -58,29 +58,25 @@ async def check_advance_condition(key: str, alert: any):
         "fromRecentHighestPrice": lambda: check_within_from_recent_highest_price(
             alert=alert, alertTriggered=alertTriggered
         ),
+        "withinPastXDays": lambda: check_within_past_x_days(alert, alertTriggered),
+        "withinPastXDaysValue": lambda: check_within_past_x_days_value(
+            alert, alertTriggered
+        ),
+        # Extremes are built once per day and updated from the live quote
+        "nearing52WeekLow": lambda: check_nearing_52_week_low(alert, alertTriggered),
+        "nearing52WeekHigh": lambda: check_nearing_52_week_high(alert, alertTriggered),
+        "nearingAllTimeHigh": lambda: check_nearing_all_time_high(
+            alert, alertTriggered
+        ),
     }
 
-    # 🔹 Keys that only log for now
-    log_only = {
-        "withinPastXDays",
-        "withinPastXDaysValue",
-        "nearing52WeekLow",
-        "nearing52WeekHigh",
-        "nearingAllTimeHigh",
-    }
-
-    # ---------- Handle log-only cases ----------
-    if key in log_only:
-        # print(f"----> check_advance_condition for {key}")
-        return
-
     # ---------- Unknown command ----------
     if key not in handlers:
         print(f"Unknown command: {key}.")
         return
 
     # ---------- Check if alert has already been triggered ----------
-    if key not in skip_trigger_check:
+    if key not in SKIP_TRIGGER_CHECK:
         if await get_alert_triggered(ticker, emailAddress, key):
             print(
                 f"✅ This alert has already been triggered: {key, ticker, emailAddress}"
@@ -0,0 +1,14 @@
+from dotenv import load_dotenv
+import os
+
+# Imported before src.utils.db by some entry points
+load_dotenv()
+
+# Upstream endpoints shared by the alert script, the API and their helpers
+SHIPRA_API_URL = os.getenv("SHIPRA_API_URL", "https://api-shipra-v3.pilleo.ca")
+SHIPRA_PYTHON_API_URL = os.getenv(
+    "SHIPRA_PYTHON_API_URL", "https://api-python-v3.shipra.ca"
+)
+YF_WEBSOCKET_URL = os.getenv(
+    "YF_WEBSOCKET_URL", "wss://streamer.finance.yahoo.com/?version=2"
+)
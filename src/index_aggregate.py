@@ -0,0 +1,150 @@
+import asyncio
+import os
+import time
+from datetime import timedelta
+from src.price_history import get_closing_history
+from src.utils.metrics import incr, record_timing, set_gauge
+from src.utils.trading_calendar import local_today
+
+# "equal" gives every constituent the same share of the level at the
+# previous close; "cap" weights by the constituent list's marketCap (and
+# falls back to equal when any constituent has none).
+INDEX_WEIGHTING = os.getenv("INDEX_WEIGHTING", "equal")
+INDEX_SEED_CONCURRENCY = int(os.getenv("INDEX_SEED_CONCURRENCY", "8"))
+# Level of every aggregate at the previous close
+BASE_LEVEL = 100.0
+
+
+class IndexAggregate:
+    """
+    Weighted sum of one index's constituent prices, updated in O(1) per
+    constituent tick.
+
+    Seeded once per local day from the constituents' completed daily
+    closes. Weights are fixed at the previous close, so the same weights
+    give the level at the previous close (BASE_LEVEL) and at the last close
+    before the current week; constituents that have not traded today count
+    at their previous close.
+    """
+
+    def __init__(self, index, constituents, caps=None):
+        self.index = index
+        self.constituents = list(constituents)
+        self.caps = caps or {}
+        self.prices = {}  # constituent -> latest price today
+        self.weights = {}  # constituent -> (weight, previous close)
+        self.level = None
+        self.previous_close = None
+        self.week_close = None
+        self.day = None
+        self._seeding = None
+
+    @property
+    def ready(self):
+        return self.level is not None
+
+    def change(self, reference):
+        """Percent change of the live level from `reference`."""
+        return (self.level / reference - 1) * 100
+
+    def update(self, ticker, price: float):
+        today = local_today(self.index)
+        if self.day != today:
+            self._start_day(today)
+
+        old = self.prices.get(ticker)
+        self.prices[ticker] = price
+        entry = self.weights.get(ticker)
+        if self.level is None or entry is None:
+            return
+        weight, previous = entry
+        self.level += weight * (price - (previous if old is None else old))
+
+    def _start_day(self, today):
+        # Yesterday's weights and prices no longer apply
+        self.day = today
+        self.level = None
+        self.prices = {}
+        self.weights = {}
+        # A seed still running for the previous day discards its result
+        self._seeding = asyncio.create_task(self.seed(today))
+
+    async def seed(self, today):
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(INDEX_SEED_CONCURRENCY)
+
+        async def load(ticker):
+            async with semaphore:
+                return await get_closing_history(ticker)
+
+        histories = await asyncio.gather(
+            *(load(ticker) for ticker in self.constituents), return_exceptions=True
+        )
+        if self.day != today:
+            return
+
+        week_start = today - timedelta(days=today.weekday())
+        references = {}
+        for ticker, history in zip(self.constituents, histories):
+            if isinstance(history, BaseException) or history is None:
+                continue
+            # Completed bars only; today's bar in the series is provisional
+            done = history.position(today)
+            if done == 0 or history.values[done - 1] <= 0:
+                continue
+            week = history.position(week_start)
+            previous = float(history.values[done - 1])
+            week_close = float(history.values[week - 1]) if week > 0 else previous
+            references[ticker] = (previous, week_close)
+
+        if not references:
+            print(f"No constituent closes to seed index {self.index}")
+            return
+
+        caps = {t: self.caps.get(t) or 0 for t in references}
+        if INDEX_WEIGHTING == "cap" and all(cap > 0 for cap in caps.values()):
+            total = sum(caps.values())
+            shares = {t: caps[t] / total for t in references}
+        else:
+            shares = {t: 1 / len(references) for t in references}
+
+        # Synchronous from here: ticks received while loading are included
+        self.weights = {
+            t: (BASE_LEVEL * shares[t] / previous, previous)
+            for t, (previous, _) in references.items()
+        }
+        self.previous_close = BASE_LEVEL
+        self.week_close = sum(
+            self.weights[t][0] * week_close for t, (_, week_close) in references.items()
+        )
+        self.level = sum(
+            weight * self.prices.get(t, previous)
+            for t, (weight, previous) in self.weights.items()
+        )
+        incr("index_aggregate.seeds")
+        record_timing("index_aggregate.seed_seconds", time.perf_counter() - start)
+        set_gauge(f"index_aggregate.constituents.{self.index}", len(self.weights))
+
+
+class IndexAggregates:
+    """The IndexAggregate of every index with index-level alerts."""
+
+    def __init__(self):
+        self._aggregates = {}
+
+    def track(self, index, constituents, caps=None):
+        self._aggregates[index] = IndexAggregate(index, constituents, caps)
+
+    def get(self, index):
+        return self._aggregates.get(index)
+
+    def update(self, index, ticker, price: float):
+        """Apply one constituent price; returns the aggregate once seeded."""
+        aggregate = self._aggregates.get(index)
+        if aggregate is None:
+            return None
+        aggregate.update(ticker, price)
+        return aggregate if aggregate.ready else None
+
+
+index_aggregates = IndexAggregates()
@@ -1,9 +1,118 @@
 import asyncio
+import os
+import time
 from collections import defaultdict
+from src.alert_engine import run_alerts
 from src.alerts import fetch_index_stock_alerts_from_db, get_index_stocks
+from src.index_aggregate import index_aggregates
+from src.utils.metrics import record_timing, set_gauge
+
+INDEX_FETCH_CONCURRENCY = int(os.getenv("INDEX_FETCH_CONCURRENCY", "8"))
+
+
+class IndexMembership:
+    """
+    Constituent -> index tickers and index ticker -> index alerts.
+
+    Index alerts are kept once per index instead of being copied into every
+    constituent's alert list. A constituent tick evaluates them through
+    views (shallow copies made for that evaluation only), so the fields
+    run_alerts sets on an alert (tickerNm, current_price, ...) never leak
+    between constituents evaluated concurrently. Per-constituent daily
+    state stays in armed_alerts, keyed by (alert id, constituent).
+
+    INDEX_MOVE alerts are about the index itself: constituent ticks feed
+    the index's IndexAggregate and those alerts are evaluated once on the
+    aggregate level, under the index ticker.
+    """
+
+    def __init__(self):
+        self.index_alerts = {}  # index ticker -> [alert, ...]
+        self.level_alerts = {}  # index ticker -> [INDEX_MOVE alert, ...]
+        self.members = {}  # constituent -> (index ticker, ...)
+
+    def set_index(self, index, alerts, constituents, caps=None):
+        self.index_alerts[index] = [a for a in alerts if a["condition"] != "INDEX_MOVE"]
+        level = [a for a in alerts if a["condition"] == "INDEX_MOVE"]
+        if level:
+            self.level_alerts[index] = level
+            index_aggregates.track(index, constituents, caps)
+        for ticker in constituents:
+            indices = self.members.get(ticker, ())
+            if index not in indices:
+                self.members[ticker] = indices + (index,)
+
+    def constituents(self):
+        return self.members.keys()
+
+    def alerts_for(self, ticker):
+        """The (shared) index alerts that apply to `ticker`."""
+        for index in self.members.get(ticker, ()):
+            yield from self.index_alerts[index]
+
+    def alert_count(self, ticker):
+        return sum(len(self.index_alerts[i]) for i in self.members.get(ticker, ()))
+
+    def _views(self, ticker):
+        # NEWS alerts are registered with the news pipeline at startup
+        # (news_alerts.sync); a tick must not re-register a per-tick copy
+        return [
+            dict(alert)
+            for alert in self.alerts_for(ticker)
+            if alert["condition"] != "NEWS"
+        ]
+
+    def _update_levels(self, ticker, msg):
+        """
+        Apply a constituent price to its indices' aggregates; returns the
+        indices whose INDEX_MOVE alerts can be evaluated.
+        """
+        price = msg.get("price")
+        if price is None:
+            return []
+        return [
+            index
+            for index in self.members.get(ticker, ())
+            if index in self.level_alerts
+            and index_aggregates.update(index, ticker, float(price)) is not None
+        ]
+
+    async def _evaluate_level(self, index):
+        level = index_aggregates.get(index).level
+        views = [dict(alert) for alert in self.level_alerts[index]]
+        await run_alerts(views, index, current_stock_data={"price": round(level, 4)})
+
+    async def evaluate(self, ticker, msg):
+        """Evaluate every index alert that applies to one constituent tick."""
+        views = self._views(ticker)
+        if views:
+            await run_alerts(views, ticker, current_stock_data=msg)
+        for index in self._update_levels(ticker, msg):
+            await self._evaluate_level(index)
+
+    async def evaluate_round(self, quotes):
+        """
+        Evaluate a batch of constituent quotes (ticker -> msg): every
+        (index alert, constituent) pair of the round in one gather.
+        """
+        levels = set()
+        runs = []
+        for ticker, msg in quotes.items():
+            views = self._views(ticker)
+            if views:
+                runs.append(run_alerts(views, ticker, current_stock_data=msg))
+            levels.update(self._update_levels(ticker, msg))
+
+        await asyncio.gather(*runs, return_exceptions=True)
+        # The level alerts once per round, after every quote was applied
+        await asyncio.gather(
+            *(self._evaluate_level(index) for index in levels), return_exceptions=True
+        )
 
 
 async def fetch_index_stock_alerts():
+    start_time = time.perf_counter()
+
     # Fetch all alerts from database
     index_alerts = await fetch_index_stock_alerts_from_db()
     print(f"index-stocks-result: {len(index_alerts)}")
@@ -14,19 +123,41 @@ async def fetch_index_stock_alerts():
         ticker = alert["ticker"]["ticker"]
         grouped_alerts[ticker].append(alert)
 
-    # Fetch index stocks concurrently for all tickers
+    # Fetch index stocks concurrently, with a bound on in-flight requests
+    semaphore = asyncio.Semaphore(INDEX_FETCH_CONCURRENCY)
+
+    async def limited_get_index_stocks(ticker):
+        async with semaphore:
+            return await get_index_stocks(ticker)
+
     tickers = list(grouped_alerts.keys())
     index_stocks_lists = await asyncio.gather(
         *(
-            get_index_stocks(ticker) for ticker in tickers
+            limited_get_index_stocks(ticker) for ticker in tickers
         )  # add "^GSPC" for test S&P 500 index stocks
     )
 
-    # Build mapping of ticker -> alerts (avoiding nested loops)
-    index_grouped_alerts = defaultdict(list)
+    # Constituents point at their indices; each index's alerts are held once
     for ticker_list, original_ticker in zip(index_stocks_lists, tickers):
-        for item in ticker_list:
-            item_ticker = item["ticker"]
-            index_grouped_alerts[item_ticker].extend(grouped_alerts[original_ticker])
+        if not ticker_list:
+            print(f"No constituents resolved for index {original_ticker}")
+            continue
+        index_membership.set_index(
+            original_ticker,
+            grouped_alerts[original_ticker],
+            [item["ticker"] for item in ticker_list],
+            # Used by cap-weighted index aggregates when present
+            {item["ticker"]: item.get("marketCap") for item in ticker_list},
+        )
+
+    elapsed = time.perf_counter() - start_time
+    record_timing("startup.index_alerts_resolve_seconds", elapsed)
+    set_gauge("startup.index_count", len(tickers))
+    set_gauge("startup.index_constituent_count", len(index_membership.members))
+    print(f"Resolved {len(tickers)} index alert groups in {elapsed:.3f} seconds")
+
+    return index_membership
+
 
-    return index_grouped_alerts
+# Shared by the alert script's stream and poll paths
+index_membership = IndexMembership()
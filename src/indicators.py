@@ -0,0 +1,219 @@
+import asyncio
+from collections import Counter
+import numpy as np
+import pandas as pd
+from src.compute import run_compute
+from src.price_history import get_closing_history
+from src.utils.metrics import incr, set_gauge
+
+
+def indicator_keys(alert):
+    """The (indicator, parameter) pairs an alert reads."""
+    match alert.get("condition"):
+        case "DMA":
+            return [("SMA", int(w)) for w in alert.get("dmaWindow") or []]
+        case "RSI":
+            return [("RSI", int(alert["rsiPeriod"]))] if alert.get("rsiPeriod") else []
+        case _:
+            return []
+
+
+def compute_sma(closes: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average, NaN until `window` closes are available."""
+    out = np.full(len(closes), np.nan)
+    if window <= 0 or len(closes) < window:
+        return out
+    csum = np.cumsum(np.insert(closes, 0, 0.0))
+    out[window - 1 :] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def wilder_rsi_batch(closes: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder RSI for every row of a 2-D (tickers x bars) close array at once.
+
+    Rows are right-aligned and NaN-padded on the left when histories
+    differ in length. Matches pandas_ta's rsi (mamode "rma"): gains and
+    losses are smoothed with an adjust=False EWM (alpha = 1/period) seeded
+    from each row's first change, and a row with fewer than period + 1
+    closes is all NaN.
+    """
+    closes = np.atleast_2d(np.asarray(closes, dtype=np.float64))
+    rows, bars = closes.shape
+    out = np.full((rows, bars), np.nan)
+    if period <= 0 or bars <= period:
+        return out
+
+    changes = np.diff(closes, axis=1)
+    gains = np.where(changes > 0, changes, 0.0)
+    losses = np.where(changes < 0, -changes, 0.0)
+    missing = np.isnan(changes)
+    gains[missing] = losses[missing] = np.nan
+
+    def smooth(values):
+        # One column per row; the leading NaN padding is skipped by the EWM
+        return (
+            pd.DataFrame(values.T)
+            .ewm(alpha=1 / period, adjust=False)
+            .mean()
+            .to_numpy()
+            .T
+        )
+
+    avg_gain, avg_loss = smooth(gains), smooth(losses)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[:, 1:] = 100 * avg_gain / (avg_gain + avg_loss)
+    # pandas_ta returns nothing for histories shorter than period + 1
+    out[(~np.isnan(closes)).sum(axis=1) <= period] = np.nan
+    return out
+
+
+def compute_rsi(closes: np.ndarray, period: int) -> np.ndarray:
+    return wilder_rsi_batch(closes[None, :], period)[0]
+
+
+def stack_right_aligned(series: list) -> np.ndarray:
+    """1-D arrays -> 2-D array aligned on their latest bar, NaN-padded."""
+    width = max((len(s) for s in series), default=0)
+    out = np.full((len(series), width), np.nan)
+    for row, values in enumerate(series):
+        if len(values):
+            out[row, width - len(values) :] = values
+    return out
+
+
+COMPUTE = {"SMA": compute_sma, "RSI": compute_rsi}
+# Too heavy for the event loop; SMA is a cumulative sum and stays inline
+OFFLOADED = {"RSI"}
+# Tickers per 2-D batch in IndicatorService.warm (bounds memory per job)
+RSI_BATCH_SIZE = 1000
+
+
+class IndicatorService:
+    """
+    Indicator values shared by every alert on a ticker, keyed by
+    (ticker, indicator, parameter) and computed once per daily series.
+
+    Alerts retain the keys they use; only referenced keys are cached, and a
+    key's values are dropped as soon as no alert references it. Callers
+    that never retain (the /alerts job) still share in-flight computations
+    but keep nothing afterwards.
+    """
+
+    def __init__(self):
+        self._cache = {}  # (ticker, name, param) -> (series, version, values)
+        self._pending = {}  # same key -> (series, version, task)
+        self._refs = Counter()
+
+    def retain(self, alert, ticker):
+        for name, param in indicator_keys(alert):
+            self._refs[(ticker, name, param)] += 1
+        self._update_metrics()
+
+    def release(self, alert, ticker):
+        for name, param in indicator_keys(alert):
+            key = (ticker, name, param)
+            self._refs[key] -= 1
+            if self._refs[key] <= 0:
+                del self._refs[key]
+                self._cache.pop(key, None)
+        self._update_metrics()
+
+    async def get(self, ticker, name, param, history):
+        """
+        Indicator values aligned with `history` (a SeriesExtremes from
+        src.price_history). Recomputed only when the history is replaced;
+        OFFLOADED indicators are computed in the compute pool, once for
+        all concurrent callers.
+        """
+        key = (ticker, name, param)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] is history and cached[1] == history.version:
+            incr("indicators.hits")
+            return cached[2]
+
+        if name not in OFFLOADED:
+            incr("indicators.computed")
+            values = COMPUTE[name](history.values, param)
+        else:
+            pending = self._pending.get(key)
+            if (
+                pending is None
+                or pending[0] is not history
+                or pending[1] != history.version
+            ):
+                incr("indicators.computed")
+                task = asyncio.create_task(
+                    run_compute(COMPUTE[name], history.values, param, name=name)
+                )
+                pending = (history, history.version, task)
+                self._pending[key] = pending
+                task.add_done_callback(lambda _: self._clear_pending(key, pending))
+            values = await asyncio.shield(pending[2])
+
+        # A key released while its values were computed stays evicted
+        if self._refs.get(key, 0) > 0:
+            self._cache[key] = (history, history.version, values)
+            self._update_metrics()
+        return values
+
+    async def warm(self, tickers=None):
+        """
+        Cold start: compute RSI for every referenced (ticker, period) in one
+        batched 2-D pass per distinct period instead of one per alert.
+        """
+        by_period = {}
+        for ticker, name, param in self._refs:
+            if name == "RSI" and (tickers is None or ticker in tickers):
+                by_period.setdefault(param, set()).add(ticker)
+        if not by_period:
+            return
+
+        wanted = sorted(set().union(*by_period.values()))
+        loaded = await asyncio.gather(
+            *(get_closing_history(t) for t in wanted), return_exceptions=True
+        )
+        histories = {
+            t: h
+            for t, h in zip(wanted, loaded)
+            if not isinstance(h, BaseException) and h is not None and len(h)
+        }
+
+        for period, names in by_period.items():
+            names = [t for t in sorted(names) if t in histories]
+            for i in range(0, len(names), RSI_BATCH_SIZE):
+                batch = names[i : i + RSI_BATCH_SIZE]
+                closes = stack_right_aligned([histories[t].values for t in batch])
+                rsi = await run_compute(
+                    wilder_rsi_batch, closes, period, name="RSI_batch"
+                )
+                for row, ticker in enumerate(batch):
+                    # Released while the batch ran
+                    if self._refs.get((ticker, "RSI", period), 0) <= 0:
+                        continue
+                    history = histories[ticker]
+                    self._cache[(ticker, "RSI", period)] = (
+                        history,
+                        history.version,
+                        rsi[row, rsi.shape[1] - len(history) :].copy(),
+                    )
+                incr("indicators.computed", len(batch))
+        self._update_metrics()
+
+    def _clear_pending(self, key, pending):
+        if self._pending.get(key) is pending:
+            del self._pending[key]
+
+    async def sma(self, ticker, history, window):
+        return await self.get(ticker, "SMA", window, history)
+
+    async def rsi(self, ticker, history, period):
+        return await self.get(ticker, "RSI", period, history)
+
+    def _update_metrics(self):
+        set_gauge("indicators.cached", len(self._cache))
+        set_gauge("indicators.referenced", len(self._refs))
+
+
+# Shared by every alert in this process
+indicators = IndicatorService()
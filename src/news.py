@@ -0,0 +1,226 @@
+import asyncio
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+import yfinance as yf
+from src.alert_cache import get_alert_triggered
+from src.alert_trigger import run_alert_trigger
+from src.utils.keyword_automaton import KeywordAutomaton
+from src.utils.metrics import incr, set_gauge
+
+logger = logging.getLogger(__name__)
+
+# "local" reads NEWS_FEED_PATH (a .json/.jsonl file or a directory of
+# them); "yahoo" polls yfinance news for the watched tickers.
+NEWS_SOURCE = os.getenv("NEWS_SOURCE", "local")
+NEWS_FEED_PATH = os.getenv("NEWS_FEED_PATH", "news_feed")
+NEWS_POLL_INTERVAL = float(os.getenv("NEWS_POLL_INTERVAL", "60"))
+SEEN_ITEMS = 10000
+
+
+class NewsSource(ABC):
+    """
+    Base news adapter: `fetch(tickers)` returns items not returned before,
+    as dicts {"id", "title", "summary"?, "tickers"?, "link"?}.
+    """
+
+    def __init__(self):
+        self._seen = set()
+        self._order = deque()
+
+    def _unseen(self, items):
+        fresh = []
+        for item in items:
+            item_id = str(item.get("id") or item.get("link") or item.get("title"))
+            if item_id in self._seen:
+                continue
+            self._seen.add(item_id)
+            self._order.append(item_id)
+            if len(self._order) > SEEN_ITEMS:
+                self._seen.discard(self._order.popleft())
+            fresh.append({**item, "id": item_id})
+        return fresh
+
+    @abstractmethod
+    async def fetch(self, tickers=()):
+        """Items not returned by an earlier call."""
+
+
+class LocalNewsSource(NewsSource):
+    """Items from a .json (list) / .jsonl file, or a directory of them."""
+
+    def __init__(self, path: str = NEWS_FEED_PATH):
+        super().__init__()
+        self.path = Path(path)
+
+    def _files(self):
+        if self.path.is_dir():
+            return sorted(
+                p for p in self.path.iterdir() if p.suffix in (".json", ".jsonl")
+            )
+        return [self.path] if self.path.exists() else []
+
+    def _read(self):
+        items = []
+        for file in self._files():
+            text = file.read_text()
+            if file.suffix == ".json":
+                data = json.loads(text or "[]")
+                items.extend(data if isinstance(data, list) else [data])
+            else:
+                items.extend(json.loads(line) for line in text.splitlines() if line)
+        return items
+
+    async def fetch(self, tickers=()):
+        return self._unseen(await asyncio.to_thread(self._read))
+
+
+class YahooNewsSource(NewsSource):
+    """Latest yfinance headlines for each watched ticker."""
+
+    @staticmethod
+    def _download(tickers):
+        items = []
+        for ticker in tickers:
+            try:
+                news = yf.Ticker(ticker).news or []
+            except Exception as e:
+                print(f"[Error] Could not fetch news for {ticker}: {e}")
+                continue
+            for entry in news:
+                content = entry.get("content") or entry
+                items.append(
+                    {
+                        "id": entry.get("id") or content.get("id"),
+                        "title": content.get("title", ""),
+                        "summary": content.get("summary", ""),
+                        "tickers": [ticker],
+                    }
+                )
+        return items
+
+    async def fetch(self, tickers=()):
+        return self._unseen(await asyncio.to_thread(self._download, list(tickers)))
+
+
+def get_news_source():
+    if NEWS_SOURCE == "yahoo":
+        return YahooNewsSource()
+    return LocalNewsSource(NEWS_FEED_PATH)
+
+
+def alert_patterns(alert):
+    """Keywords an alert listens for; its ticker symbol when it has none."""
+    keywords = alert.get("newsKeywords") or []
+    if isinstance(keywords, str):
+        keywords = keywords.split(",")
+    keywords = [k.strip() for k in keywords if k and k.strip()]
+    return keywords or [alert["ticker"]["ticker"]]
+
+
+class NewsAlerts:
+    """
+    Active NEWS alerts indexed in one keyword automaton, so each headline
+    is matched against every alert in a single pass over its text.
+    """
+
+    def __init__(self):
+        self.automaton = KeywordAutomaton()
+        self._alerts = {}  # alert id -> (alert, patterns)
+
+    def tickers(self):
+        return {alert["tickerNm"] for alert, _ in self._alerts.values()}
+
+    def watch(self, alert):
+        """Add or refresh an alert; only its changed keywords are touched."""
+        alert_id = str(alert["_id"])
+        patterns = set(alert_patterns(alert))
+        _, previous = self._alerts.get(alert_id, (None, set()))
+        for pattern in previous - patterns:
+            self.automaton.remove(pattern, alert_id)
+        for pattern in patterns - previous:
+            self.automaton.add(pattern, alert_id)
+        alert.setdefault("tickerNm", alert["ticker"]["ticker"])
+        alert.setdefault("userXTickerId", alert["ticker"]["_id"])
+        self._alerts[alert_id] = (alert, patterns)
+        self._update_metrics()
+
+    def unwatch(self, alert):
+        alert_id = str(alert["_id"])
+        _, patterns = self._alerts.pop(alert_id, (None, set()))
+        for pattern in patterns:
+            self.automaton.remove(pattern, alert_id)
+        self._update_metrics()
+
+    def sync(self, alerts):
+        """Make the watched set exactly `alerts`."""
+        current = {str(alert["_id"]) for alert in alerts}
+        for alert_id in list(self._alerts):
+            if alert_id not in current:
+                self.unwatch(self._alerts[alert_id][0])
+        for alert in alerts:
+            self.watch(alert)
+
+    def match(self, item):
+        """[(alert, matched keywords)] for one news item."""
+        text = f"{item.get('title', '')}\n{item.get('summary', '')}"
+        item_tickers = {t.upper() for t in item.get("tickers") or []}
+        matches = []
+        for alert_id, keywords in self.automaton.match(text).items():
+            alert, _ = self._alerts[alert_id]
+            # Items tagged with tickers only reach alerts on those tickers
+            if item_tickers and alert["tickerNm"].upper() not in item_tickers:
+                continue
+            matches.append((alert, keywords))
+        return matches
+
+    def _update_metrics(self):
+        set_gauge("news.alerts", len(self._alerts))
+        set_gauge("news.keywords", len(self.automaton))
+
+
+async def trigger_news_alert(alert, item, keywords):
+    ticker = alert["tickerNm"]
+    emailAddress = alert["emailAddress"][0]
+    key = f"news:{item['id']}"
+    if await get_alert_triggered(ticker, emailAddress, key=key):
+        return
+    alertTriggered = [
+        {
+            "advanceCondition": "newsKeyword",
+            "condition": alert["condition"],
+            "subCondition": "",
+            "keywords": sorted(keywords),
+            "link": item.get("link"),
+            "alertTitle": f"{alert['ticker'].get('nm', ticker)} News: {item.get('title', '')}",
+            "alertMessage": f"{item.get('title', '')} (matched: {', '.join(sorted(keywords))})",
+        }
+    ]
+    await run_alert_trigger(alert, alertTriggered, key=key)
+
+
+async def process_news_items(items):
+    for item in items:
+        incr("news.items")
+        for alert, keywords in news_alerts.match(item):
+            incr("news.matches")
+            await trigger_news_alert(alert, item, keywords)
+
+
+async def run_news_pipeline(source=None, interval: float = NEWS_POLL_INTERVAL):
+    """Poll `source` for new items and match them against the NEWS alerts."""
+    source = source or get_news_source()
+    while True:
+        try:
+            items = await source.fetch(news_alerts.tickers())
+            await process_news_items(items)
+        except Exception:
+            logger.exception("News pipeline error")
+        await asyncio.sleep(interval)
+
+
+# Shared by the alert engine and the pipeline in this process
+news_alerts = NewsAlerts()
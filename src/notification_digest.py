@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import os
+from src.utils.metrics import incr, set_gauge
+
+logger = logging.getLogger(__name__)
+
+# Seconds to hold a user's triggers before sending them as one payload;
+# 0 sends every trigger immediately.
+NOTIFICATION_DIGEST_SECONDS = float(os.getenv("NOTIFICATION_DIGEST_SECONDS", "5"))
+
+
+def _entry_key(entry: dict):
+    return (
+        entry.get("advanceCondition"),
+        entry.get("subCondition"),
+        entry.get("alertTitle"),
+        entry.get("alertMessage"),
+    )
+
+
+class NotificationDigest:
+    """
+    Coalesces triggered alerts per (user, alert) for `window` seconds and
+    sends each group as one notification with duplicate entries removed.
+
+    Handlers often pass the same growing `alertTriggered` list once per
+    sub-condition; only entries not already queued for the group are kept.
+    """
+
+    def __init__(
+        self,
+        sender,
+        window: float = NOTIFICATION_DIGEST_SECONDS,
+        on_sent=None,
+        on_failed=None,
+    ):
+        # Blocking callable(alert, alert_triggered_list) -> True once sent
+        self.sender = sender
+        self.window = window
+        # Awaited with a group's submit tokens once it was (not) delivered
+        self.on_sent = on_sent
+        self.on_failed = on_failed
+        self._groups = {}  # (email, alert id) -> group dict
+        self._flushes = {}  # group key -> scheduled flush task
+
+    def submit(self, alert, alert_triggered_list, token=None):
+        incr("notifications.submitted")
+        email = alert["emailAddress"][0]
+        group_key = (email, str(alert["_id"]))
+        group = self._groups.get(group_key)
+        if group is None:
+            # Only the fields the payload needs; the alert dict keeps
+            # changing as it is evaluated for other ticks and tickers
+            group = {
+                "alert": {
+                    "_id": alert["_id"],
+                    "userXTickerId": alert["userXTickerId"],
+                    "frequency": alert.get("frequency"),
+                },
+                "entries": [],
+                "seen": set(),
+                "tokens": [],
+            }
+            self._groups[group_key] = group
+
+        for entry in alert_triggered_list:
+            key = _entry_key(entry)
+            if key in group["seen"]:
+                incr("notifications.deduplicated")
+                continue
+            group["seen"].add(key)
+            group["entries"].append(dict(entry))
+        if token is not None:
+            group["tokens"].append(token)
+
+        if group_key not in self._flushes:
+            task = asyncio.create_task(self._flush_later(group_key))
+            self._flushes[group_key] = task
+        set_gauge("notifications.pending_groups", len(self._groups))
+
+    async def _flush_later(self, group_key):
+        if self.window > 0:
+            await asyncio.sleep(self.window)
+        # Later submits for this group start a new window
+        self._flushes.pop(group_key, None)
+        await self.flush(group_key)
+
+    async def flush(self, group_key):
+        group = self._groups.pop(group_key, None)
+        set_gauge("notifications.pending_groups", len(self._groups))
+        if group is None:
+            return
+        alert, entries = group["alert"], group["entries"]
+        if entries:
+            try:
+                sent = await asyncio.to_thread(self.sender, alert, entries)
+            except Exception:
+                logger.exception(f"Notification failed for alert {alert['_id']}")
+                sent = False
+            # Only an explicit True counts as delivered
+            if sent is not True:
+                incr("notifications.failed")
+                if self.on_failed is not None and group["tokens"]:
+                    await self.on_failed(group["tokens"])
+                return
+            incr("notifications.sent")
+            incr("notifications.entries", len(entries))
+        if self.on_sent is not None and group["tokens"]:
+            await self.on_sent(group["tokens"])
+
+    async def flush_all(self):
+        """Send everything queued now (e.g. on shutdown)."""
+        for task in self._flushes.values():
+            task.cancel()
+        self._flushes.clear()
+        await asyncio.gather(*(self.flush(key) for key in list(self._groups)))
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+from redis.exceptions import ResponseError
+from src.notification_digest import NotificationDigest
+from src.utils.metrics import incr, set_gauge
+from src.utils.redis_cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+# "direct" (default) sends triggers from the alerts process itself;
+# "outbox" writes them to a Redis Stream next to the daily dedup record and
+# leaves delivery to notification_worker.py, which must then be running.
+NOTIFICATION_DELIVERY = os.getenv("NOTIFICATION_DELIVERY", "direct")
+OUTBOX_STREAM = os.getenv("NOTIFICATION_OUTBOX_STREAM", "notifications:outbox")
+OUTBOX_GROUP = os.getenv("NOTIFICATION_OUTBOX_GROUP", "notifiers")
+OUTBOX_DEAD_STREAM = f"{OUTBOX_STREAM}:dead"
+# Approximate cap on the stream length; acknowledged entries are trimmed first
+OUTBOX_MAXLEN = int(os.getenv("NOTIFICATION_OUTBOX_MAXLEN", "100000"))
+# Pending entries idle this long (their consumer died mid-send) are reclaimed
+OUTBOX_CLAIM_IDLE_MS = int(os.getenv("NOTIFICATION_CLAIM_IDLE_MS", "60000"))
+# Deliveries before an entry is moved to the dead-letter stream
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "5"))
+OUTBOX_READ_COUNT = 100
+OUTBOX_BLOCK_MS = 5000
+
+
+def outbox_entry(alert, alert_triggered_list):
+    """Stream fields for one trigger: what the sender needs, JSON encoded."""
+    return {
+        "alert": json.dumps(
+            {
+                "_id": str(alert["_id"]),
+                "userXTickerId": str(alert["userXTickerId"]),
+                "frequency": alert.get("frequency"),
+                "emailAddress": alert["emailAddress"][:1],
+            }
+        ),
+        "alertTriggered": json.dumps(alert_triggered_list),
+    }
+
+
+def consumer_name():
+    return os.getenv("NOTIFICATION_CONSUMER") or f"{socket.gethostname()}-{os.getpid()}"
+
+
+async def ensure_group(redis_client):
+    try:
+        await redis_client.xgroup_create(
+            OUTBOX_STREAM, OUTBOX_GROUP, id="0", mkstream=True
+        )
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+class OutboxWorker:
+    """
+    Consumes the notification outbox as one member of a consumer group.
+
+    Entries are coalesced by a NotificationDigest and acknowledged only
+    after their notification was sent, so anything a crashed or failing
+    worker held stays pending and is reclaimed by a live one after
+    OUTBOX_CLAIM_IDLE_MS.
+    """
+
+    def __init__(self, sender, consumer=None, window=None):
+        self.consumer = consumer or consumer_name()
+        digest_args = {} if window is None else {"window": window}
+        self.digest = NotificationDigest(
+            sender, on_sent=self.ack, on_failed=self.release, **digest_args
+        )
+        self.redis = None
+        # Entry ids read but not yet acknowledged by this worker
+        self._in_flight = set()
+
+    async def ack(self, ids):
+        self._in_flight.difference_update(ids)
+        await self.redis.xack(OUTBOX_STREAM, OUTBOX_GROUP, *ids)
+        incr("outbox.acked", len(ids))
+
+    async def release(self, ids):
+        # Left pending: reclaimed and retried once idle for OUTBOX_CLAIM_IDLE_MS
+        self._in_flight.difference_update(ids)
+
+    def submit(self, entry_id, fields):
+        if entry_id in self._in_flight:
+            return
+        try:
+            alert = json.loads(fields["alert"])
+            alertTriggered = json.loads(fields["alertTriggered"])
+        except (KeyError, TypeError, json.JSONDecodeError):
+            logger.error(f"Malformed outbox entry {entry_id}")
+            self._in_flight.add(entry_id)
+            asyncio.create_task(self.dead_letter([(entry_id, fields)], {}))
+            return
+        self._in_flight.add(entry_id)
+        self.digest.submit(alert, alertTriggered, token=entry_id)
+
+    async def dead_letter(self, messages, attempts):
+        pipe = self.redis.pipeline(transaction=True)
+        for entry_id, fields in messages:
+            dead = dict(fields or {})
+            dead["id"] = entry_id
+            dead["attempts"] = attempts.get(entry_id, 0)
+            pipe.xadd(OUTBOX_DEAD_STREAM, dead, maxlen=OUTBOX_MAXLEN, approximate=True)
+            pipe.xack(OUTBOX_STREAM, OUTBOX_GROUP, entry_id)
+        await pipe.execute()
+        self._in_flight.difference_update(entry_id for entry_id, _ in messages)
+        incr("outbox.dead_lettered", len(messages))
+
+    async def reclaim(self):
+        """Take over entries left pending by dead or failing consumers."""
+        start = "0-0"
+        while True:
+            start, messages, *_ = await self.redis.xautoclaim(
+                OUTBOX_STREAM,
+                OUTBOX_GROUP,
+                self.consumer,
+                min_idle_time=OUTBOX_CLAIM_IDLE_MS,
+                start_id=start,
+                count=OUTBOX_READ_COUNT,
+            )
+            # Entries trimmed from the stream before delivery have no fields
+            gone = [m[0] for m in messages if m[1] is None]
+            if gone:
+                await self.redis.xack(OUTBOX_STREAM, OUTBOX_GROUP, *gone)
+            messages = [
+                m for m in messages if m[1] is not None and m[0] not in self._in_flight
+            ]
+            if messages:
+                incr("outbox.reclaimed", len(messages))
+                pending = await self.redis.xpending_range(
+                    OUTBOX_STREAM,
+                    OUTBOX_GROUP,
+                    min=messages[0][0],
+                    max=messages[-1][0],
+                    count=len(messages) + len(self._in_flight),
+                    consumername=self.consumer,
+                )
+                attempts = {p["message_id"]: p["times_delivered"] for p in pending}
+                expired = [
+                    m for m in messages if attempts.get(m[0], 0) > OUTBOX_MAX_ATTEMPTS
+                ]
+                if expired:
+                    await self.dead_letter(expired, attempts)
+                for entry_id, fields in messages:
+                    if attempts.get(entry_id, 0) <= OUTBOX_MAX_ATTEMPTS:
+                        self.submit(entry_id, fields)
+            if start in ("0-0", b"0-0"):
+                return
+
+    async def read(self):
+        response = await self.redis.xreadgroup(
+            OUTBOX_GROUP,
+            self.consumer,
+            {OUTBOX_STREAM: ">"},
+            count=OUTBOX_READ_COUNT,
+            block=OUTBOX_BLOCK_MS,
+        )
+        for _, messages in response or []:
+            incr("outbox.read", len(messages))
+            for entry_id, fields in messages:
+                self.submit(entry_id, fields)
+
+    async def run(self):
+        self.redis = await get_redis()
+        await ensure_group(self.redis)
+        print(f"📬 Outbox worker {self.consumer} reading {OUTBOX_STREAM}")
+        loop = asyncio.get_running_loop()
+        next_reclaim = 0
+        try:
+            while True:
+                try:
+                    if loop.time() >= next_reclaim:
+                        await self.reclaim()
+                        next_reclaim = loop.time() + OUTBOX_CLAIM_IDLE_MS / 2000
+                    await self.read()
+                    set_gauge("outbox.in_flight", len(self._in_flight))
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Outbox worker error")
+                    await asyncio.sleep(1)
+        finally:
+            # Send (and ack) whatever is already coalesced; the rest stays
+            # pending for another worker
+            await self.digest.flush_all()
@@ -0,0 +1,103 @@
+import os
+from datetime import timedelta
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from src.price_history import get_closing_history, get_ohlc_history
+from src.utils.trading_calendar import local_today
+
+# Bars on each side a high must beat to count as a swing high
+SWING_HIGH_BARS = int(os.getenv("SWING_HIGH_BARS", "5"))
+if SWING_HIGH_BARS < 1:
+    raise ValueError(f"SWING_HIGH_BARS must be at least 1, got {SWING_HIGH_BARS}")
+
+
+def last_swing_high(highs: np.ndarray, bars: int = SWING_HIGH_BARS):
+    """Index of the most recent confirmed swing high, or None."""
+    width = 2 * bars + 1
+    if len(highs) < width:
+        return None
+    peaks = (
+        sliding_window_view(highs, width).max(axis=1) == highs[bars : len(highs) - bars]
+    )
+    found = np.flatnonzero(peaks)
+    return int(found[-1]) + bars if len(found) else None
+
+
+class TickerExtremes:
+    """
+    52-week high/low, all-time high and recent swing high of one ticker,
+    built once per daily history and kept current by `observe`.
+
+    Each value is a {"time", "value"} dict like SeriesExtremes results.
+    """
+
+    def __init__(self, closes, ohlc, today):
+        self.closes = closes
+        self.today = today.strftime("%Y-%m-%d")
+
+        # Completed bars only; today's comes from the live quote
+        done = closes.position(today)
+        self.all_time_high = closes.highest(0, done)
+
+        ranges = ohlc if ohlc is not None and len(ohlc) else closes
+        done = ranges.position(today)
+        start = ranges.position(today - timedelta(weeks=52))
+        self.high_52w = ranges.highest(start, done)
+        self.low_52w = ranges.lowest(start, done)
+
+        # Highest point since the last swing high (a new high replaces it)
+        pivot = last_swing_high(ranges.max_index.values[:done])
+        self.recent_high = None if pivot is None else ranges.highest(pivot, done)
+
+        # The daily highs can top the best close
+        top = ranges.highest(0, done)
+        if top is not None and (
+            self.all_time_high is None or top["value"] > self.all_time_high["value"]
+        ):
+            self.all_time_high = top
+
+    def _raise(self, name, value):
+        current = getattr(self, name)
+        if current is None or value > current["value"]:
+            setattr(self, name, {"time": self.today, "value": value})
+
+    def _lower(self, name, value):
+        current = getattr(self, name)
+        if current is None or value < current["value"]:
+            setattr(self, name, {"time": self.today, "value": value})
+
+    def observe(self, price: float, day_high: float = None, day_low: float = None):
+        """Fold a live quote into the extremes; a couple of comparisons."""
+        high = day_high or price
+        low = day_low or price
+        if high:
+            self._raise("all_time_high", high)
+            self._raise("high_52w", high)
+            self._raise("recent_high", high)
+        if low:
+            self._lower("low_52w", low)
+
+
+# ticker -> TickerExtremes, rebuilt whenever the daily history is replaced
+_extremes = {}
+
+
+async def get_price_extremes(ticker: str) -> TickerExtremes:
+    closes = await get_closing_history(ticker)
+    extremes = _extremes.get(ticker)
+    if extremes is None or extremes.closes is not closes:
+        ohlc = await get_ohlc_history(ticker)
+        extremes = TickerExtremes(closes, ohlc, local_today(ticker))
+        _extremes[ticker] = extremes
+    return extremes
+
+
+async def get_live_extremes(alert) -> TickerExtremes:
+    """The alert's ticker extremes updated with its current quote."""
+    ticker = alert.get("tickerNm") or alert["ticker"]["ticker"]
+    extremes = await get_price_extremes(ticker)
+    live = alert.get("currentStockData") or {}
+    extremes.observe(
+        alert.get("current_price") or 0, live.get("day_high"), live.get("day_low")
+    )
+    return extremes
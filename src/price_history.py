@@ -0,0 +1,82 @@
+import asyncio
+import numpy as np
+import yfinance as yf
+from src.apis.get_ticker_closing_price import get_ticker_closing_price
+from src.apis.get_ticker_pe_ratio import get_ticker_pe_ratio
+from src.utils.range_index import SeriesExtremes
+from src.utils.series import series_to_arrays
+from src.utils.trading_calendar import local_today_str
+
+# (kind, ticker) -> (local date, SeriesExtremes); rebuilt once per day
+_histories = {}
+_loading = {}
+
+
+async def _get_history(kind: str, ticker: str, loader):
+    today = local_today_str(ticker)
+    cached = _histories.get((kind, ticker))
+    if cached is not None and cached[0] == today:
+        return cached[1]
+
+    # Concurrent evaluations of the same ticker share one build
+    key = (kind, ticker, today)
+    task = _loading.get(key)
+    if task is None:
+        task = asyncio.create_task(loader(ticker))
+        _loading[key] = task
+        task.add_done_callback(lambda _: _loading.pop(key, None))
+    history = await asyncio.shield(task)
+
+    if history is not None:
+        _histories[(kind, ticker)] = (today, history)
+    return history
+
+
+async def _load_closing(ticker: str):
+    arrays = series_to_arrays(await get_ticker_closing_price(ticker))
+    return SeriesExtremes(arrays["time"], arrays["value"])
+
+
+async def _load_pe(ticker: str):
+    arrays = series_to_arrays(await get_ticker_pe_ratio(ticker))
+    return SeriesExtremes(arrays["time"], arrays["value"])
+
+
+def _download_ohlc(ticker: str):
+    # Full history: withinPastXWeekValue windows have no upper bound, and
+    # the series is downloaded once per ticker per day
+    data = yf.Ticker(ticker).history(period="max", interval="1d")
+    if data.empty:
+        return None
+    # Completed bars only; today's range comes from the live ticks
+    dates = data.index.tz_localize(None).values.astype("datetime64[D]")
+    completed = dates < np.datetime64(local_today_str(ticker))
+    data = data[completed]
+    return SeriesExtremes(
+        dates[completed],
+        data["Close"].values,
+        highs=data["High"].values,
+        lows=data["Low"].values,
+    )
+
+
+async def _load_ohlc(ticker: str):
+    return await asyncio.to_thread(_download_ohlc, ticker)
+
+
+async def get_closing_history(ticker: str) -> SeriesExtremes:
+    """Daily closes from get_ticker_closing_price, indexed for window extremes."""
+    return await _get_history("close", ticker, _load_closing)
+
+
+async def get_pe_history(ticker: str) -> SeriesExtremes:
+    """Daily PE ratios from get_ticker_pe_ratio, indexed for window extremes."""
+    return await _get_history("pe", ticker, _load_pe)
+
+
+async def get_ohlc_history(ticker: str) -> SeriesExtremes:
+    """
+    All completed daily bars from yfinance with the max index over
+    High and the min index over Low. None if yfinance returned no data.
+    """
+    return await _get_history("ohlc", ticker, _load_ohlc)
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import os
+import yfinance as yf
+from src.config import YF_WEBSOCKET_URL
+
+logger = logging.getLogger(__name__)
+
+CLIENT_QUEUE_SIZE = int(os.getenv("QUOTE_HUB_CLIENT_QUEUE_SIZE", "100"))
+
+
+class Subscription:
+    """A single client's view of a symbol: its own bounded send queue."""
+
+    def __init__(self, symbol: str, maxsize: int):
+        self.symbol = symbol
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def push(self, msg: dict):
+        # A slow client loses its oldest pending quote rather than
+        # holding up the upstream reader or the other clients.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(msg)
+
+
+class QuoteHub:
+    """
+    Process-wide broker keeping one upstream yfinance subscription per symbol
+    and fanning each message out to every subscribed client.
+    """
+
+    def __init__(self, client_queue_size: int = CLIENT_QUEUE_SIZE):
+        self.client_queue_size = client_queue_size
+        self._subscribers = {}  # symbol -> set[Subscription]
+        self._upstreams = {}  # symbol -> asyncio.Task
+        self.latest = {}  # symbol -> last message, while subscribed
+        self._lock = asyncio.Lock()
+
+    def subscriber_count(self, symbol: str) -> int:
+        return len(self._subscribers.get(symbol, ()))
+
+    def symbols(self):
+        return list(self._upstreams.keys())
+
+    async def subscribe(self, symbol: str, maxsize: int = None) -> Subscription:
+        sub = Subscription(symbol, maxsize or self.client_queue_size)
+        async with self._lock:
+            self._subscribers.setdefault(symbol, set()).add(sub)
+            if symbol not in self._upstreams:
+                self._upstreams[symbol] = asyncio.create_task(self._upstream(symbol))
+                logger.info(f"Opened upstream subscription for {symbol}")
+        return sub
+
+    async def unsubscribe(self, sub: Subscription):
+        async with self._lock:
+            subscribers = self._subscribers.get(sub.symbol)
+            if subscribers is None:
+                return
+            subscribers.discard(sub)
+            if subscribers:
+                return
+
+            # Last client left: close the upstream subscription
+            del self._subscribers[sub.symbol]
+            self.latest.pop(sub.symbol, None)
+            task = self._upstreams.pop(sub.symbol, None)
+
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            logger.info(f"Closed upstream subscription for {sub.symbol}")
+
+    def publish(self, symbol: str, msg: dict):
+        self.latest[symbol] = msg
+        for sub in tuple(self._subscribers.get(symbol, ())):
+            sub.push(msg)
+
+    async def _upstream(self, symbol: str):
+        # Runs until cancelled by the last unsubscribe; reconnects on errors
+        while True:
+            yf_ws = None
+            try:
+                async with yf.AsyncWebSocket(url=YF_WEBSOCKET_URL, verbose=False) as ws:
+                    yf_ws = ws
+                    await ws.subscribe([symbol])
+                    await ws.listen(lambda msg: self.publish(symbol, msg))
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"Upstream error for {symbol}, reconnecting")
+            finally:
+                if yf_ws is not None:
+                    try:
+                        await yf_ws.close()
+                    except Exception:
+                        pass
+            await asyncio.sleep(3)
+
+
+# Shared by every connection in this process
+hub = QuoteHub()
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+import yfinance as yf
+from src.quote_hub import hub as quote_hub
+
+logger = logging.getLogger(__name__)
+
+QUOTE_TTL_SECONDS = float(os.getenv("QUOTE_TTL_SECONDS", "30"))
+# Least recently requested snapshots beyond this many symbols are dropped
+QUOTE_SNAPSHOT_MAX_SYMBOLS = int(os.getenv("QUOTE_SNAPSHOT_MAX_SYMBOLS", "1000"))
+
+
+def _fetch_info(symbol: str):
+    """Blocking yfinance scrape (run in a worker thread)."""
+    return yf.Ticker(symbol).info
+
+
+class QuoteSnapshotService:
+    """
+    In-memory quote snapshots with a TTL.
+
+    Live ticks from the QuoteHub take precedence; otherwise snapshots are
+    filled by a background fetch. Concurrent misses for the same symbol
+    share a single fetch, and an expired snapshot is served immediately
+    while it is refreshed; a failed refresh keeps the old snapshot for
+    another TTL. At most `max_symbols` snapshots are kept (LRU).
+    """
+
+    def __init__(
+        self,
+        hub=quote_hub,
+        ttl: float = QUOTE_TTL_SECONDS,
+        max_symbols: int = QUOTE_SNAPSHOT_MAX_SYMBOLS,
+    ):
+        self.hub = hub
+        self.ttl = ttl
+        self.max_symbols = max_symbols
+        self._snapshots = OrderedDict()  # symbol -> (fetched_at, snapshot)
+        self._inflight = {}  # symbol -> asyncio.Task
+
+    async def get_quote(self, symbol: str):
+        cached = self._snapshots.get(symbol)
+        live = self.hub.latest.get(symbol)
+
+        if cached is not None:
+            self._snapshots.move_to_end(symbol)
+            fetched_at, snapshot = cached
+            if time.monotonic() - fetched_at > self.ttl:
+                # Served stale; nobody awaits this refresh
+                self._refresh(symbol)
+            return self._with_live_price(snapshot, live)
+
+        # Callers awaiting the refresh must not cancel the shared fetch
+        snapshot = await asyncio.shield(self._refresh(symbol))
+        return self._with_live_price(snapshot, live)
+
+    def _with_live_price(self, snapshot: dict, live: dict):
+        if live and live.get("price") is not None:
+            return {**snapshot, "current_price": live["price"]}
+        return snapshot
+
+    def _refresh(self, symbol: str):
+        task = self._inflight.get(symbol)
+        if task is None:
+            task = asyncio.create_task(self._fetch(symbol))
+            self._inflight[symbol] = task
+            task.add_done_callback(lambda done: self._fetched(symbol, done))
+        return task
+
+    def _fetched(self, symbol: str, task: asyncio.Task):
+        self._inflight.pop(symbol, None)
+        # Retrieve the exception so an unawaited refresh does not log
+        # "Task exception was never retrieved"; _fetch already logged it
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(self, symbol: str):
+        try:
+            info = await asyncio.to_thread(_fetch_info, symbol)
+        except Exception as e:
+            logger.warning(f"Quote fetch failed for {symbol}: {e}")
+            cached = self._snapshots.get(symbol)
+            if cached is not None:
+                # Back off: retry after another TTL, not on every request
+                self._store(symbol, cached[1])
+                return cached[1]
+            raise
+
+        snapshot = {
+            "symbol": symbol,
+            "company_name": info.get("longName"),
+            "current_price": info.get("currentPrice"),
+        }
+        self._store(symbol, snapshot)
+        return snapshot
+
+    def _store(self, symbol: str, snapshot: dict):
+        self._snapshots[symbol] = (time.monotonic(), snapshot)
+        self._snapshots.move_to_end(symbol)
+        while len(self._snapshots) > self.max_symbols:
+            self._snapshots.popitem(last=False)
+
+
+# Shared by every request in this process
+quotes = QuoteSnapshotService()
@@ -0,0 +1,118 @@
+from collections import deque
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over case-insensitive keywords, each owned by
+    one or more keys (e.g. alert ids).
+
+    `match` scans a text once, in time linear in its length plus the
+    number of hits, whatever the number of keywords. Adding a keyword only
+    extends the trie; the failure links are relinked lazily on the next
+    `match` after any add or remove.
+    """
+
+    def __init__(self):
+        self._goto = [{}]  # node -> {char: node}
+        self._fail = [0]
+        self._depth = [0]
+        self._word = [None]  # node -> keyword ending here, if any
+        self._report = [0]  # node -> next node on the fail chain with a word
+        self._owners = {}  # keyword -> set of keys
+        self._dirty = False
+
+    def __len__(self):
+        return len(self._owners)
+
+    @staticmethod
+    def normalize(keyword: str) -> str:
+        return " ".join(keyword.lower().split())
+
+    def add(self, keyword: str, key):
+        keyword = self.normalize(keyword)
+        if not keyword:
+            return
+        owners = self._owners.get(keyword)
+        if owners is not None:
+            owners.add(key)
+            return
+        self._owners[keyword] = {key}
+
+        node = 0
+        for char in keyword:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._depth.append(self._depth[node] + 1)
+                self._word.append(None)
+                self._report.append(0)
+            node = nxt
+        self._word[node] = keyword
+        self._dirty = True
+
+    def remove(self, keyword: str, key):
+        keyword = self.normalize(keyword)
+        owners = self._owners.get(keyword)
+        if owners is None:
+            return
+        owners.discard(key)
+        if owners:
+            return
+        # The trie path stays; only the word mark goes
+        del self._owners[keyword]
+        node = 0
+        for char in keyword:
+            node = self._goto[node][char]
+        self._word[node] = None
+        self._dirty = True
+
+    def _link(self):
+        """Recompute failure and output links breadth-first."""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._report[child] = 0
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[child] = fail
+                self._report[child] = (
+                    fail if self._word[fail] is not None else self._report[fail]
+                )
+                queue.append(child)
+        self._dirty = False
+
+    def match(self, text: str):
+        """
+        {key: set of keywords} for every keyword found in `text` as a whole
+        word (not inside a longer alphanumeric run).
+        """
+        if self._dirty:
+            self._link()
+        text = self.normalize(text)
+        found = {}
+        node = 0
+        for end, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+
+            hit = node if self._word[node] is not None else self._report[node]
+            while hit:
+                keyword = self._word[hit]
+                start = end - self._depth[hit] + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (
+                    end + 1 == len(text) or not text[end + 1].isalnum()
+                ):
+                    for key in self._owners[keyword]:
+                        found.setdefault(key, set()).add(keyword)
+                hit = self._report[hit]
+        return found
@@ -0,0 +1,50 @@
+import time
+from src.utils.redis_cache import set_cache
+
+# Process-wide metrics, keyed by name
+counters = {}
+gauges = {}
+timings = {}
+
+
+def incr(name: str, amount: int = 1):
+    counters[name] = counters.get(name, 0) + amount
+
+
+def set_gauge(name: str, value):
+    gauges[name] = value
+
+
+def record_timing(name: str, seconds: float):
+    timings[name] = round(seconds, 6)
+
+
+class timer:
+    """Context manager recording the elapsed wall time under `name`."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        record_timing(self.name, self.elapsed)
+        return False
+
+
+def snapshot():
+    return {
+        "counters": dict(counters),
+        "gauges": dict(gauges),
+        "timings": dict(timings),
+    }
+
+
+async def publish_metrics(process_name: str, expire_seconds: int = 86400):
+    """Store the current snapshot in Redis so other processes can read it."""
+    await set_cache(
+        f"metrics:{process_name}", snapshot(), expire_seconds=expire_seconds
+    )
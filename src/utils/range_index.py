@@ -0,0 +1,145 @@
+import numpy as np
+
+
+class RangeExtremeIndex:
+    """
+    Sparse table over a 1-D float array answering "index of the max (or
+    min) in values[lo:hi]" in O(1). Built once in O(n log n); `append` adds
+    a new bar and `update_last` revises the latest one in O(log n).
+
+    Ties resolve to the earliest index, like `idxmax`/`idxmin`.
+    """
+
+    def __init__(self, values, highest: bool = True, capacity: int = None):
+        values = np.asarray(values, dtype=np.float64)
+        self.highest = highest
+        self.n = len(values)
+        capacity = max(capacity or 0, self.n * 2, 16)
+        self.values = np.empty(capacity, dtype=np.float64)
+        self.values[: self.n] = values
+        self.levels = [np.arange(capacity, dtype=np.int64)]
+        self._build()
+
+    def _better(self, a, b):
+        """Element-wise pick between candidate index arrays `a` and `b`."""
+        va, vb = self.values[a], self.values[b]
+        keep_a = va >= vb if self.highest else va <= vb
+        return np.where(keep_a, a, b)
+
+    def _build(self):
+        capacity = len(self.values)
+        k = 1
+        while (1 << k) <= self.n:
+            half = 1 << (k - 1)
+            count = self.n - (1 << k) + 1
+            prev = self.levels[k - 1]
+            level = np.zeros(capacity, dtype=np.int64)
+            level[:count] = self._better(prev[:count], prev[half : half + count])
+            if k < len(self.levels):
+                self.levels[k] = level
+            else:
+                self.levels.append(level)
+            k += 1
+
+    def _grow(self):
+        capacity = len(self.values) * 2
+        values = np.empty(capacity, dtype=np.float64)
+        values[: self.n] = self.values[: self.n]
+        self.values = values
+        for k, level in enumerate(self.levels):
+            grown = np.zeros(capacity, dtype=np.int64)
+            grown[: len(level)] = level
+            self.levels[k] = grown
+        self.levels[0] = np.arange(capacity, dtype=np.int64)
+
+    def _refresh_tail(self):
+        """Recompute the one entry per level that covers the last bar."""
+        k = 1
+        while (1 << k) <= self.n:
+            if k == len(self.levels):
+                self.levels.append(np.zeros(len(self.values), dtype=np.int64))
+            half = 1 << (k - 1)
+            pos = self.n - (1 << k)
+            prev = self.levels[k - 1]
+            a, b = prev[pos], prev[pos + half]
+            va, vb = self.values[a], self.values[b]
+            keep_a = va >= vb if self.highest else va <= vb
+            self.levels[k][pos] = a if keep_a else b
+            k += 1
+
+    def append(self, value: float):
+        if self.n == len(self.values):
+            self._grow()
+        self.values[self.n] = value
+        self.n += 1
+        self._refresh_tail()
+
+    def update_last(self, value: float):
+        self.values[self.n - 1] = value
+        self._refresh_tail()
+
+    def query(self, lo: int = 0, hi: int = None):
+        """Index of the extreme in values[lo:hi], or None for an empty range."""
+        hi = self.n if hi is None else min(int(hi), self.n)
+        lo = max(int(lo), 0)
+        if lo >= hi:
+            return None
+        k = (hi - lo).bit_length() - 1
+        a = self.levels[k][lo]
+        b = self.levels[k][hi - (1 << k)]
+        va, vb = self.values[a], self.values[b]
+        return int(a if (va >= vb if self.highest else va <= vb) else b)
+
+
+class SeriesExtremes:
+    """
+    Dated series with max/min indexes, for "highest/lowest since date"
+    queries shared by the price, PE and drawdown conditions.
+    """
+
+    def __init__(self, dates, values, highs=None, lows=None):
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.values = np.asarray(values, dtype=np.float64)
+        self.max_index = RangeExtremeIndex(
+            self.values if highs is None else highs, highest=True
+        )
+        self.min_index = RangeExtremeIndex(
+            self.values if lows is None else lows, highest=False
+        )
+        # Bumped on every append so derived caches know to recompute
+        self.version = 0
+
+    def __len__(self):
+        return self.max_index.n
+
+    def position(self, day) -> int:
+        """First position on or after `day`."""
+        return int(np.searchsorted(self.dates, np.datetime64(day, "D"), side="left"))
+
+    def append(self, day, value: float, high: float = None, low: float = None):
+        self.dates = np.append(self.dates, np.datetime64(day, "D"))
+        self.values = np.append(self.values, value)
+        self.max_index.append(value if high is None else high)
+        self.min_index.append(value if low is None else low)
+        self.version += 1
+
+    def _result(self, index, idx):
+        if idx is None:
+            return None
+        return {
+            "time": str(self.dates[idx]),
+            "value": float(index.values[idx]),
+            "index": idx,
+        }
+
+    def highest(self, lo: int = 0, hi: int = None):
+        return self._result(self.max_index, self.max_index.query(lo, hi))
+
+    def lowest(self, lo: int = 0, hi: int = None):
+        return self._result(self.min_index, self.min_index.query(lo, hi))
+
+    def highest_since(self, day):
+        return self.highest(self.position(day))
+
+    def lowest_since(self, day):
+        return self.lowest(self.position(day))
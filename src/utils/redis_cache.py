@@ -1,10 +1,32 @@
 import json
 import os
+import struct
+import numpy as np
 import redis.asyncio as redis  # modern async Redis client
 
+try:
+    import msgpack
+except ImportError:  # optional fast codec
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # optional fast codec
+    orjson = None
+
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
 redis_client = None
+redis_binary_client = None
+
+# Binary payloads start with this marker followed by a one-byte codec id.
+# 0x93 can never start a UTF-8 string, so plain JSON written by older
+# versions of this module (and by the "json" codec) is always recognised.
+CODEC_MAGIC = b"\x93SC"
+
+CODEC_IDS = {"msgpack": 1, "orjson": 2, "numpy": 3}
+CODEC_NAMES = {v: k for k, v in CODEC_IDS.items()}
+
 
 async def get_redis():
     global redis_client
@@ -12,16 +34,142 @@ async def get_redis():
         redis_client = redis.from_url(REDIS_URL, decode_responses=True)
     return redis_client
 
-async def set_cache(key: str, data, expire_seconds: int = 300):
-    """Cache data in Redis (auto-serialize to JSON)."""
-    r = await get_redis()
-    await r.set(key, json.dumps(data), ex=expire_seconds)
+
+async def get_redis_binary():
+    """Redis client returning raw bytes, used for codec-encoded cache values."""
+    global redis_binary_client
+    if redis_binary_client is None:
+        redis_binary_client = redis.from_url(REDIS_URL, decode_responses=False)
+    return redis_binary_client
+
+
+def _default_codec():
+    codec = os.getenv("REDIS_CACHE_CODEC")
+    if codec:
+        return codec
+    return "msgpack" if msgpack is not None else "json"
+
+
+def _encode_numpy(data) -> bytes:
+    """
+    Pack a 1-D ndarray, or a dict of named 1-D ndarrays, as raw buffers.
+
+    Layout: <H array count>, then per array <B name len><name><B dtype len>
+    <dtype.str><Q length>, followed by all buffers back to back.
+    """
+    arrays = data if isinstance(data, dict) else {"": data}
+    header = [struct.pack("<H", len(arrays))]
+    buffers = []
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        if arr.ndim != 1:
+            raise ValueError(f"numpy codec only supports 1-D arrays, got {arr.shape}")
+        name_b = name.encode()
+        dtype_b = arr.dtype.str.encode()
+        header.append(struct.pack("<B", len(name_b)) + name_b)
+        header.append(struct.pack("<B", len(dtype_b)) + dtype_b)
+        header.append(struct.pack("<Q", len(arr)))
+        buffers.append(arr.tobytes())
+    return b"".join(header + buffers)
+
+
+def _decode_numpy(payload: bytes):
+    """Inverse of `_encode_numpy`. Returned arrays are read-only views."""
+    view = memoryview(payload)
+    (count,) = struct.unpack_from("<H", view, 0)
+    offset = 2
+    specs = []
+    for _ in range(count):
+        (name_len,) = struct.unpack_from("<B", view, offset)
+        offset += 1
+        name = bytes(view[offset : offset + name_len]).decode()
+        offset += name_len
+        (dtype_len,) = struct.unpack_from("<B", view, offset)
+        offset += 1
+        dtype = np.dtype(bytes(view[offset : offset + dtype_len]).decode())
+        offset += dtype_len
+        (length,) = struct.unpack_from("<Q", view, offset)
+        offset += 8
+        specs.append((name, dtype, length))
+
+    arrays = {}
+    for name, dtype, length in specs:
+        arrays[name] = np.frombuffer(view, dtype=dtype, count=length, offset=offset)
+        offset += dtype.itemsize * length
+
+    if count == 1 and "" in arrays:
+        return arrays[""]
+    return arrays
+
+
+def encode_value(data, codec: str = None) -> bytes:
+    """Serialize `data` with the given codec (defaults to REDIS_CACHE_CODEC)."""
+    codec = codec or _default_codec()
+
+    if codec == "msgpack" and msgpack is None:
+        codec = "json"
+    if codec == "orjson" and orjson is None:
+        codec = "json"
+
+    match codec:
+        case "json":
+            # Written without a header so existing readers keep working
+            return json.dumps(data).encode()
+        case "msgpack":
+            body = msgpack.packb(data, use_bin_type=True)
+        case "orjson":
+            body = orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+        case "numpy":
+            body = _encode_numpy(data)
+        case _:
+            raise ValueError(f"Unknown cache codec: {codec}")
+
+    return CODEC_MAGIC + bytes([CODEC_IDS[codec]]) + body
+
+
+def decode_value(payload):
+    """
+    Deserialize a cached value written by any codec, including plain JSON
+    stored by earlier versions of `set_cache`.
+    """
+    if payload is None:
+        return None
+    if isinstance(payload, str):
+        return json.loads(payload)
+
+    if not payload.startswith(CODEC_MAGIC):
+        return json.loads(payload)
+
+    codec = CODEC_NAMES.get(payload[len(CODEC_MAGIC)])
+    body = memoryview(payload)[len(CODEC_MAGIC) + 1 :]
+
+    match codec:
+        case "msgpack":
+            if msgpack is None:
+                raise RuntimeError("msgpack is required to decode this cache value")
+            return msgpack.unpackb(body, raw=False)
+        case "orjson":
+            if orjson is None:
+                return json.loads(bytes(body))
+            return orjson.loads(body)
+        case "numpy":
+            return _decode_numpy(bytes(body))
+        case _:
+            raise ValueError(f"Unknown cache codec id: {payload[len(CODEC_MAGIC)]}")
+
+
+async def set_cache(key: str, data, expire_seconds: int = 300, codec: str = None):
+    """Cache data in Redis (auto-serialize with the configured codec)."""
+    r = await get_redis_binary()
+    await r.set(key, encode_value(data, codec), ex=expire_seconds)
+
 
 async def get_cache(key: str):
-    """Retrieve cached data from Redis (auto-deserialize JSON)."""
-    r = await get_redis()
+    """Retrieve cached data from Redis (auto-detects the codec used)."""
+    r = await get_redis_binary()
     data = await r.get(key)
-    return json.loads(data) if data else None
+    return decode_value(data) if data else None
+
 
 async def invalidate_cache(key: str):
     r = await get_redis()
@@ -0,0 +1,17 @@
+import numpy as np
+
+
+def series_to_arrays(data: list):
+    """
+    Convert a `[{"time": "YYYY-MM-DD", "value": float}, ...]` series (as
+    returned by the closing price / PE ratio APIs) into NumPy arrays.
+    """
+    times = np.array([d["time"] for d in data], dtype="datetime64[D]")
+    values = np.fromiter((d["value"] for d in data), dtype=np.float64, count=len(data))
+    return {"time": times, "value": values}
+
+
+def arrays_to_series(arrays: dict):
+    """Inverse of `series_to_arrays`."""
+    times = np.datetime_as_string(arrays["time"], unit="D")
+    return [{"time": str(t), "value": float(v)} for t, v in zip(times, arrays["value"])]
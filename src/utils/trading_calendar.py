@@ -0,0 +1,279 @@
+import json
+import os
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+
+def _easter(year: int) -> date:
+    """Western Easter Sunday (anonymous Gregorian algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    return date(year, month, (h + l - 7 * m + 33 * month + 19) % 32)
+
+
+def _weekday_of_month(year: int, month: int, weekday: int, n: int) -> date:
+    """The n-th `weekday` (0 = Monday) of a month; n = -1 is the last."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _nearest_weekday(day: date) -> date:
+    """Saturday -> Friday, Sunday -> Monday (US observance)."""
+    return day + timedelta(days={5: -1, 6: 1}.get(day.weekday(), 0))
+
+
+def _next_weekday(day: date) -> date:
+    """Weekend -> the following Monday (UK and Canadian observance)."""
+    return day + timedelta(days={5: 2, 6: 1}.get(day.weekday(), 0))
+
+
+def _christmas_boxing_day(year: int):
+    """Dec 25 and 26, each moved past the weekend and the other's substitute."""
+    days = []
+    for day in (date(year, 12, 25), date(year, 12, 26)):
+        while day.weekday() >= 5 or day in days:
+            day += timedelta(days=1)
+        days.append(day)
+    return days
+
+
+def _last_weekday_on_or_before(day: date) -> date:
+    return day - timedelta(days=max(0, day.weekday() - 4))
+
+
+def _us_calendar(year: int):
+    """NYSE/NASDAQ holidays and early closes."""
+    new_year = date(year, 1, 1)
+    july_4 = date(year, 7, 4)
+    thanksgiving = _weekday_of_month(year, 11, 3, 4)
+    holidays = {
+        _weekday_of_month(year, 1, 0, 3),  # Martin Luther King Jr. Day
+        _weekday_of_month(year, 2, 0, 3),  # Washington's Birthday
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _weekday_of_month(year, 5, 0, -1),  # Memorial Day
+        _nearest_weekday(july_4),
+        _weekday_of_month(year, 9, 0, 1),  # Labor Day
+        thanksgiving,
+        _nearest_weekday(date(year, 12, 25)),
+    }
+    # A Saturday New Year is not observed on the Friday before
+    if new_year.weekday() != 5:
+        holidays.add(_nearest_weekday(new_year))
+    if year >= 2022:
+        holidays.add(_nearest_weekday(date(year, 6, 19)))  # Juneteenth
+
+    half_days = {thanksgiving + timedelta(days=1): time(13, 0)}
+    # July 3 closes early when it is a Monday to Thursday
+    if july_4.weekday() in (1, 2, 3, 4):
+        half_days[date(year, 7, 3)] = time(13, 0)
+    christmas_eve = date(year, 12, 24)
+    if christmas_eve.weekday() < 5 and christmas_eve not in holidays:
+        half_days[christmas_eve] = time(13, 0)
+    return holidays, half_days
+
+
+def _london_calendar(year: int):
+    """London Stock Exchange (England and Wales bank holidays)."""
+    easter = _easter(year)
+    holidays = {
+        _next_weekday(date(year, 1, 1)),
+        easter - timedelta(days=2),  # Good Friday
+        easter + timedelta(days=1),  # Easter Monday
+        _weekday_of_month(year, 5, 0, 1),  # Early May bank holiday
+        _weekday_of_month(year, 5, 0, -1),  # Spring bank holiday
+        _weekday_of_month(year, 8, 0, -1),  # Summer bank holiday
+        *_christmas_boxing_day(year),
+    }
+    # Early close on the last business day before Christmas and New Year
+    half_days = {
+        _last_weekday_on_or_before(date(year, 12, 24)): time(12, 30),
+        _last_weekday_on_or_before(date(year, 12, 31)): time(12, 30),
+    }
+    return holidays, half_days
+
+
+def _toronto_calendar(year: int):
+    """Toronto Stock Exchange."""
+    may_24 = date(year, 5, 24)
+    holidays = {
+        _next_weekday(date(year, 1, 1)),
+        _weekday_of_month(year, 2, 0, 3),  # Family Day
+        _easter(year) - timedelta(days=2),  # Good Friday
+        may_24 - timedelta(days=may_24.weekday()),  # Victoria Day
+        _next_weekday(date(year, 7, 1)),  # Canada Day
+        _weekday_of_month(year, 8, 0, 1),  # Civic Holiday
+        _weekday_of_month(year, 9, 0, 1),  # Labour Day
+        _weekday_of_month(year, 10, 0, 2),  # Thanksgiving
+        *_christmas_boxing_day(year),
+    }
+    half_days = {}
+    christmas_eve = date(year, 12, 24)
+    if christmas_eve.weekday() < 5:
+        half_days[christmas_eve] = time(13, 0)
+    return holidays, half_days
+
+
+class Exchange:
+    """Regular trading session of one exchange, in its local time zone."""
+
+    def __init__(
+        self,
+        name,
+        tz,
+        open_time,
+        close_time,
+        calendar=None,
+        holidays=(),
+        half_days=None,
+    ):
+        self.name = name
+        self.tz = ZoneInfo(tz)
+        self.open_time = open_time
+        self.close_time = close_time
+        # year -> (holidays, half days) from the exchange's rules; the
+        # explicit holidays / half_days add one-off closures on top
+        self.calendar = calendar
+        self.holidays = {date.fromisoformat(d) for d in holidays}
+        # date -> early close time
+        self.half_days = {
+            date.fromisoformat(d): close for d, close in (half_days or {}).items()
+        }
+        self._years = set()
+
+    def _load_year(self, year: int):
+        if year in self._years:
+            return
+        self._years.add(year)
+        if self.calendar is None:
+            return
+        holidays, half_days = self.calendar(year)
+        self.holidays.update(holidays)
+        for day, close in half_days.items():
+            self.half_days.setdefault(day, close)
+
+    def now(self):
+        return datetime.now(self.tz)
+
+    def today(self):
+        return self.now().date()
+
+    def is_trading_day(self, day: date):
+        self._load_year(day.year)
+        return day.weekday() < 5 and day not in self.holidays
+
+    def session(self, day: date):
+        """(open, close) as aware datetimes for `day`, or None if closed."""
+        if not self.is_trading_day(day):
+            return None
+        close_time = self.half_days.get(day, self.close_time)
+        return (
+            datetime.combine(day, self.open_time, self.tz),
+            datetime.combine(day, close_time, self.tz),
+        )
+
+    def is_open(self, at: datetime = None):
+        at = (at or self.now()).astimezone(self.tz)
+        session = self.session(at.date())
+        return session is not None and session[0] <= at < session[1]
+
+    def next_session(self, at: datetime = None):
+        """The session in progress at `at`, or else the next one to open."""
+        at = (at or self.now()).astimezone(self.tz)
+        day = at.date()
+        for _ in range(14):
+            session = self.session(day)
+            if session is not None and at < session[1]:
+                return session
+            day += timedelta(days=1)
+        return None
+
+    def seconds_until(self, moment: datetime, at: datetime = None):
+        """
+        Elapsed seconds from `at` (default now) to `moment`. Aware datetimes
+        sharing a tzinfo subtract as wall-clock times, which is an hour off
+        across a DST change; timestamps are not.
+        """
+        return moment.timestamp() - (at or self.now()).timestamp()
+
+    def seconds_until_day_end(self, at: datetime = None):
+        """Seconds until local midnight, when daily state should roll over."""
+        at = (at or self.now()).astimezone(self.tz)
+        midnight = datetime.combine(at.date() + timedelta(days=1), time.min, self.tz)
+        return max(int(self.seconds_until(midnight, at)), 1)
+
+
+EXCHANGES = {
+    "US": Exchange(
+        "NYSE/NASDAQ",
+        "America/New_York",
+        time(9, 30),
+        time(16, 0),
+        calendar=_us_calendar,
+        # National day of mourning
+        holidays=["2025-01-09"],
+    ),
+    "L": Exchange(
+        "London Stock Exchange",
+        "Europe/London",
+        time(8, 0),
+        time(16, 30),
+        calendar=_london_calendar,
+    ),
+    "TO": Exchange(
+        "Toronto Stock Exchange",
+        "America/Toronto",
+        time(9, 30),
+        time(16, 0),
+        calendar=_toronto_calendar,
+    ),
+}
+
+# Venues that share another exchange's calendar
+EXCHANGES["V"] = EXCHANGES["TO"]  # TSX Venture
+EXCHANGES["NE"] = EXCHANGES["TO"]  # Cboe Canada
+
+# Optional JSON file adding one-off holidays / half days the rules do not
+# cover, e.g.
+# {"L": {"holidays": ["2027-01-01"], "half_days": {"2027-12-24": "12:30"}}}
+TRADING_CALENDAR_FILE = os.getenv("TRADING_CALENDAR_FILE")
+if TRADING_CALENDAR_FILE and os.path.exists(TRADING_CALENDAR_FILE):
+    with open(TRADING_CALENDAR_FILE) as f:
+        for suffix, extra in json.load(f).items():
+            exchange = EXCHANGES.get(suffix)
+            if exchange is None:
+                continue
+            exchange.holidays.update(
+                date.fromisoformat(d) for d in extra.get("holidays", [])
+            )
+            for d, close in extra.get("half_days", {}).items():
+                exchange.half_days[date.fromisoformat(d)] = time.fromisoformat(close)
+
+
+def get_exchange(ticker: str) -> Exchange:
+    """Exchange for a Yahoo ticker, keyed by its suffix (no suffix = US)."""
+    if "." in ticker and not ticker.startswith("^"):
+        suffix = ticker.rsplit(".", 1)[1].upper()
+        if suffix in EXCHANGES:
+            return EXCHANGES[suffix]
+    return EXCHANGES["US"]
+
+
+def local_today(ticker: str) -> date:
+    return get_exchange(ticker).today()
+
+
+def local_today_str(ticker: str) -> str:
+    return local_today(ticker).strftime("%Y-%m-%d")
+
+
+def seconds_until_local_midnight(ticker: str) -> int:
+    return get_exchange(ticker).seconds_until_day_end()
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from src.indicators import compute_rsi, stack_right_aligned, wilder_rsi_batch
+
+# Wilder's sample closes; expected values from pandas_ta 0.4.71b0
+# ta.rsi(pd.Series(CLOSES), length=..., talib=False), the previous RSI path
+CLOSES = [
+    44.34, 44.09, 44.15, 43.61, 44.33, 44.83, 45.10, 45.42, 45.84, 46.08,
+    45.89, 46.03, 45.61, 46.28, 46.28, 46.00, 46.03, 46.41, 46.22, 45.64,
+]  # fmt: skip
+PANDAS_TA_RSI_14 = [
+    np.nan, 0.0, 1.812689, 1.541807, 18.936141, 28.396592, 32.947303,
+    37.978365, 43.925314, 47.04971, 44.916038, 46.829418, 42.104341,
+    50.657415, 50.657415, 47.272575, 47.675983, 52.620718, 50.072727, 43.19652,
+]  # fmt: skip
+PANDAS_TA_RSI_5_FIRST_8 = [
+    np.nan, 0.0, 5.660377, 3.458213, 41.433566, 56.341126, 62.742525, 69.391324,
+]  # fmt: skip
+
+
+def pandas_ta_rsi(closes, period):
+    """pandas_ta 0.4.71b0 rsi with mamode "rma", without TA-Lib."""
+    if len(closes) < period + 1:
+        return np.full(len(closes), np.nan)
+    negative = pd.Series(closes).diff()
+    positive = negative.copy()
+    positive[positive < 0] = 0
+    negative[negative > 0] = 0
+    positive_avg = positive.ewm(alpha=1 / period, adjust=False).mean()
+    negative_avg = negative.ewm(alpha=1 / period, adjust=False).mean()
+    return (100 * positive_avg / (positive_avg + negative_avg.abs())).to_numpy()
+
+
+def test_rsi_matches_pandas_ta_values():
+    np.testing.assert_allclose(
+        compute_rsi(np.array(CLOSES), 14), PANDAS_TA_RSI_14, atol=1e-6
+    )
+    np.testing.assert_allclose(
+        compute_rsi(np.array(CLOSES[:8]), 5), PANDAS_TA_RSI_5_FIRST_8, atol=1e-6
+    )
+
+
+def test_short_history_is_all_nan():
+    assert np.isnan(compute_rsi(np.array(CLOSES[:14]), 14)).all()
+    assert np.isnan(compute_rsi(np.array([]), 14)).all()
+
+
+def test_ragged_batch_matches_per_series():
+    rng = np.random.default_rng(3)
+    lengths = [3, 14, 15, 16, 30, 120, 400]
+    histories = [100 * np.exp(np.cumsum(rng.normal(0, 0.02, n))) for n in lengths]
+    for period in (2, 5, 14):
+        batch = wilder_rsi_batch(stack_right_aligned(histories), period)
+        for row, closes in enumerate(histories):
+            got = batch[row, batch.shape[1] - len(closes) :]
+            np.testing.assert_allclose(
+                got, pandas_ta_rsi(closes, period), rtol=1e-10, equal_nan=True
+            )
+
+
+def test_flat_series_is_nan_like_pandas_ta():
+    closes = np.full(20, 50.0)
+    np.testing.assert_array_equal(
+        np.isnan(compute_rsi(closes, 14)), np.isnan(pandas_ta_rsi(closes, 14))
+    )
@@ -0,0 +1,63 @@
+import random
+import re
+
+from src.utils.keyword_automaton import KeywordAutomaton
+
+
+def automaton(*pairs):
+    keywords = KeywordAutomaton()
+    for keyword, key in pairs:
+        keywords.add(keyword, key)
+    return keywords
+
+
+def test_overlapping_keywords_all_match():
+    keywords = automaton(
+        ("he", "a"), ("she", "b"), ("hers", "c"), ("she sells", "d"), ("sells", "e")
+    )
+    assert keywords.match("She sells hers") == {
+        "b": {"she"},
+        "c": {"hers"},
+        "d": {"she sells"},
+        "e": {"sells"},
+    }
+
+
+def test_whole_words_only():
+    keywords = automaton(("apple", 1), ("app", 2), ("tsla", 3))
+    assert keywords.match("Pineapple apps") == {}
+    assert keywords.match("apple's app-store") == {1: {"apple"}, 2: {"app"}}
+    assert keywords.match("TSLA.") == {3: {"tsla"}}
+    assert keywords.match("xTSLA TSLA2") == {}
+
+
+def test_case_and_whitespace_are_normalized():
+    keywords = automaton(("Rate  Cut", "fed"))
+    assert keywords.match("Surprise RATE\ncut today") == {"fed": {"rate cut"}}
+
+
+def test_shared_keyword_and_remove():
+    keywords = automaton(("merger", 1), ("merger", 2), ("ipo", 1))
+    assert keywords.match("merger talks") == {1: {"merger"}, 2: {"merger"}}
+
+    keywords.remove("merger", 1)
+    assert keywords.match("merger ipo") == {1: {"ipo"}, 2: {"merger"}}
+    keywords.remove("merger", 2)
+    assert keywords.match("merger ipo") == {1: {"ipo"}}
+    assert len(keywords) == 1
+
+
+def test_matches_regex_brute_force():
+    rng = random.Random(4)
+    vocabulary = ["ab", "abc", "bc", "b", "cab", "a b", "bca", "c"]
+    keywords = KeywordAutomaton()
+    for i, keyword in enumerate(vocabulary):
+        keywords.add(keyword, i)
+    for _ in range(300):
+        text = "".join(rng.choice("abc -") for _ in range(rng.randint(0, 25)))
+        expected = {}
+        for i, keyword in enumerate(vocabulary):
+            pattern = r"(?<![^\W_])" + re.escape(keyword) + r"(?![^\W_])"
+            if re.search(pattern, keywords.normalize(text)):
+                expected[i] = {keyword}
+        assert keywords.match(text) == expected, text
@@ -0,0 +1,119 @@
+import asyncio
+
+from src.notification_digest import NotificationDigest
+
+
+class Sender:
+    def __init__(self, result=True):
+        self.result = result
+        self.calls = []
+
+    def __call__(self, alert, alert_triggered_list):
+        self.calls.append(
+            (alert["_id"], [e["alertTitle"] for e in alert_triggered_list])
+        )
+        return self.result
+
+
+def alert(alert_id="a1", email="user@example.com"):
+    return {
+        "_id": alert_id,
+        "userXTickerId": f"uxt-{alert_id}",
+        "frequency": "ONCE_A_DAY",
+        "emailAddress": [email],
+    }
+
+
+def entry(title):
+    return {
+        "advanceCondition": title,
+        "subCondition": "",
+        "alertTitle": title,
+        "alertMessage": f"{title} fired",
+    }
+
+
+def digest_with(sender, window=60):
+    sent, failed = [], []
+
+    async def on_sent(tokens):
+        sent.extend(tokens)
+
+    async def on_failed(tokens):
+        failed.extend(tokens)
+
+    digest = NotificationDigest(sender, window, on_sent=on_sent, on_failed=on_failed)
+    return digest, sent, failed
+
+
+def test_coalesces_per_user_and_alert():
+    async def scenario():
+        sender = Sender()
+        digest, sent, _ = digest_with(sender, window=0.01)
+        # Handlers pass the same growing list once per sub-condition
+        triggered = [entry("drop 10%")]
+        digest.submit(alert(), triggered, token="t1")
+        triggered.append(entry("drop 20%"))
+        digest.submit(alert(), triggered, token="t2")
+        digest.submit(alert("a2"), [entry("rsi")], token="t3")
+        digest.submit(alert(email="other@example.com"), [entry("drop 10%")])
+        await asyncio.sleep(0.05)
+        return sender, sent
+
+    sender, sent = asyncio.run(scenario())
+    assert sorted(sender.calls) == [
+        ("a1", ["drop 10%"]),
+        ("a1", ["drop 10%", "drop 20%"]),
+        ("a2", ["rsi"]),
+    ]
+    assert sorted(sent) == ["t1", "t2", "t3"]
+
+
+def test_submit_after_flush_starts_a_new_group():
+    async def scenario():
+        sender = Sender()
+        digest, _, _ = digest_with(sender, window=0)
+        digest.submit(alert(), [entry("drop 10%")])
+        await asyncio.sleep(0)
+        digest.submit(alert(), [entry("drop 10%")])
+        await digest.flush_all()
+        return sender
+
+    assert asyncio.run(scenario()).calls == [("a1", ["drop 10%"])] * 2
+
+
+def test_only_true_counts_as_sent():
+    for result in (False, None, "ok"):
+
+        async def scenario():
+            digest, sent, failed = digest_with(Sender(result))
+            digest.submit(alert(), [entry("drop 10%")], token="t1")
+            await digest.flush_all()
+            return sent, failed
+
+        assert asyncio.run(scenario()) == ([], ["t1"])
+
+
+def test_sender_exception_is_a_failure():
+    def broken(alert, alert_triggered_list):
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        digest, sent, failed = digest_with(broken)
+        digest.submit(alert(), [entry("drop 10%")], token="t1")
+        await digest.flush_all()
+        return sent, failed
+
+    assert asyncio.run(scenario()) == ([], ["t1"])
+
+
+def test_flush_all_sends_before_the_window():
+    async def scenario():
+        sender = Sender()
+        digest, sent, _ = digest_with(sender, window=60)
+        digest.submit(alert(), [entry("drop 10%")], token="t1")
+        await digest.flush_all()
+        return sender, sent
+
+    sender, sent = asyncio.run(scenario())
+    assert sender.calls == [("a1", ["drop 10%"])] and sent == ["t1"]
@@ -0,0 +1,150 @@
+import asyncio
+import json
+
+import src.notification_outbox as outbox
+from benchmarks.fakes import InMemoryRedis
+from src.notification_outbox import (
+    OUTBOX_DEAD_STREAM,
+    OUTBOX_GROUP,
+    OUTBOX_STREAM,
+    OutboxWorker,
+    ensure_group,
+    outbox_entry,
+)
+
+
+class Sender:
+    def __init__(self, result=True):
+        self.result = result
+        self.calls = []
+
+    def __call__(self, alert, alert_triggered_list):
+        self.calls.append(
+            (alert["_id"], [e["alertTitle"] for e in alert_triggered_list])
+        )
+        return self.result
+
+
+def alert(alert_id="a1"):
+    return {
+        "_id": alert_id,
+        "userXTickerId": f"uxt-{alert_id}",
+        "frequency": "ONCE_A_DAY",
+        "emailAddress": ["user@example.com"],
+    }
+
+
+def entry(title):
+    return {"advanceCondition": title, "subCondition": "", "alertTitle": title}
+
+
+async def make_redis():
+    redis = InMemoryRedis()
+    await ensure_group(redis)
+    await ensure_group(redis)  # BUSYGROUP is ignored
+    return redis
+
+
+def worker(redis, sender, consumer):
+    # A long window: flush_all() decides when groups are sent
+    w = OutboxWorker(sender, consumer=consumer, window=60)
+    w.redis = redis
+    return w
+
+
+async def deliver(w, reclaim=False):
+    await (w.reclaim() if reclaim else w.read())
+    await w.digest.flush_all()
+    # Dead-lettering a malformed entry runs as its own task
+    await asyncio.sleep(0)
+
+
+def stream_length(redis, name):
+    stream = redis.store.stream(name)
+    return 0 if stream is None else len(stream["entries"])
+
+
+def test_entries_for_one_alert_are_sent_once_and_acked():
+    async def scenario():
+        redis = await make_redis()
+        await redis.xadd(OUTBOX_STREAM, outbox_entry(alert(), [entry("drop 10%")]))
+        await redis.xadd(OUTBOX_STREAM, outbox_entry(alert(), [entry("drop 20%")]))
+        await redis.xadd(OUTBOX_STREAM, outbox_entry(alert("a2"), [entry("rsi")]))
+        sender = Sender()
+        await deliver(worker(redis, sender, "w1"))
+        return sender, redis.stream_backlog(OUTBOX_STREAM, OUTBOX_GROUP)
+
+    sender, backlog = asyncio.run(scenario())
+    assert sorted(sender.calls) == [("a1", ["drop 10%", "drop 20%"]), ("a2", ["rsi"])]
+    assert backlog == 0
+
+
+def test_failed_send_is_reclaimed_by_another_worker(monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_CLAIM_IDLE_MS", 0)
+
+    async def scenario():
+        redis = await make_redis()
+        await redis.xadd(OUTBOX_STREAM, outbox_entry(alert(), [entry("drop 10%")]))
+        failing, working = Sender(False), Sender()
+        await deliver(worker(redis, failing, "w1"))
+        # Not acknowledged: still pending for the group
+        pending = redis.stream_backlog(OUTBOX_STREAM, OUTBOX_GROUP)
+        await deliver(worker(redis, working, "w2"), reclaim=True)
+        return failing, working, pending, redis
+
+    failing, working, pending, redis = asyncio.run(scenario())
+    assert failing.calls == working.calls == [("a1", ["drop 10%"])]
+    assert pending == 1
+    assert redis.stream_backlog(OUTBOX_STREAM, OUTBOX_GROUP) == 0
+
+
+def test_idle_threshold_protects_entries_in_flight(monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_CLAIM_IDLE_MS", 60_000)
+
+    async def scenario():
+        redis = await make_redis()
+        await redis.xadd(OUTBOX_STREAM, outbox_entry(alert(), [entry("drop 10%")]))
+        await worker(redis, Sender(), "w1").read()
+        other = Sender()
+        await deliver(worker(redis, other, "w2"), reclaim=True)
+        return other
+
+    assert asyncio.run(scenario()).calls == []
+
+
+def test_dead_letter_after_max_attempts(monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_CLAIM_IDLE_MS", 0)
+    monkeypatch.setattr(outbox, "OUTBOX_MAX_ATTEMPTS", 2)
+
+    async def scenario():
+        redis = await make_redis()
+        await redis.xadd(OUTBOX_STREAM, outbox_entry(alert(), [entry("drop 10%")]))
+        sender = Sender(False)
+        w = worker(redis, sender, "w1")
+        await deliver(w)  # attempt 1
+        await deliver(w, reclaim=True)  # attempt 2
+        await deliver(w, reclaim=True)  # attempt 3 > max: dead-lettered
+        dead = redis.store.stream(OUTBOX_DEAD_STREAM)["entries"]
+        return sender, dead, redis
+
+    sender, dead, redis = asyncio.run(scenario())
+    assert len(sender.calls) == 2
+    assert len(dead) == 1
+    fields = dead[0][1]
+    assert fields[b"attempts"] == b"3"
+    assert json.loads(fields[b"alert"])["_id"] == "a1"
+    assert redis.stream_backlog(OUTBOX_STREAM, OUTBOX_GROUP) == 0
+
+
+def test_malformed_entry_is_dead_lettered():
+    async def scenario():
+        redis = await make_redis()
+        await redis.xadd(OUTBOX_STREAM, {"alert": "{not json"})
+        sender = Sender()
+        await deliver(worker(redis, sender, "w1"))
+        return sender, redis
+
+    sender, redis = asyncio.run(scenario())
+    assert sender.calls == []
+    assert stream_length(redis, OUTBOX_DEAD_STREAM) == 1
+    assert redis.stream_backlog(OUTBOX_STREAM, OUTBOX_GROUP) == 0
@@ -0,0 +1,70 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from src.utils.range_index import RangeExtremeIndex, SeriesExtremes
+
+
+def brute(values, lo, hi, highest):
+    window = values[lo:hi]
+    if not len(window):
+        return None
+    return lo + int(np.argmax(window) if highest else np.argmin(window))
+
+
+def assert_all_ranges(index, values):
+    for lo in range(len(values) + 1):
+        for hi in range(lo, len(values) + 2):
+            assert index.query(lo, hi) == brute(values, lo, hi, index.highest)
+
+
+def test_query_matches_brute_force():
+    rng = np.random.default_rng(5)
+    # Rounded so ties are common; both resolve to the earliest index
+    values = rng.normal(0, 3, 70).round()
+    for highest in (True, False):
+        assert_all_ranges(RangeExtremeIndex(values, highest=highest), values)
+
+
+def test_append_and_update_last_match_brute_force():
+    rng = np.random.default_rng(8)
+    for highest in (True, False):
+        values = list(rng.integers(0, 10, 5).astype(float))
+        index = RangeExtremeIndex(values, highest=highest)
+        # Crosses several capacity doublings and new sparse-table levels
+        for _ in range(45):
+            values.append(float(rng.integers(0, 10)))
+            index.append(values[-1])
+            values[-1] = float(rng.integers(0, 10))
+            index.update_last(values[-1])
+        assert_all_ranges(index, np.array(values))
+
+
+def test_empty_and_out_of_bounds_ranges():
+    index = RangeExtremeIndex([3.0, 1.0, 2.0])
+    assert index.query(2, 2) is None
+    assert index.query(5) is None
+    assert index.query(-4, 99) == 0
+    assert RangeExtremeIndex([]).query() is None
+
+
+def test_series_extremes_since_date():
+    start = date(2026, 1, 1)
+    dates = [start + timedelta(days=i) for i in range(10)]
+    closes = [5, 9, 2, 7, 9, 1, 4, 6, 3, 8]
+    series = SeriesExtremes(dates, closes)
+
+    assert series.highest_since(start) == {
+        "time": "2026-01-02",
+        "value": 9.0,
+        "index": 1,
+    }
+    assert series.lowest_since(date(2026, 1, 7))["time"] == "2026-01-09"
+    # A day before the first bar starts at the first bar
+    assert series.position(date(2025, 12, 1)) == 0
+    assert series.highest_since(date(2026, 2, 1)) is None
+
+    series.append(date(2026, 1, 11), 10.0, high=12.0, low=0.5)
+    assert len(series) == 11 and series.version == 1
+    assert series.highest_since(start)["value"] == 12.0
+    assert series.lowest_since(start)["time"] == "2026-01-11"
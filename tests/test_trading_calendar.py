@@ -0,0 +1,125 @@
+from datetime import date, datetime, time
+
+from src.utils.trading_calendar import (
+    EXCHANGES,
+    _london_calendar,
+    _toronto_calendar,
+    _us_calendar,
+    get_exchange,
+)
+
+US = EXCHANGES["US"]
+LONDON = EXCHANGES["L"]
+
+
+def days(*isodates):
+    return {date.fromisoformat(d) for d in isodates}
+
+
+def at(exchange, *args):
+    return datetime(*args, tzinfo=exchange.tz)
+
+
+def test_seconds_until_open_across_spring_forward():
+    # Friday close to Monday open spans the 2026-03-08 change (EST -> EDT)
+    close = at(US, 2026, 3, 6, 16, 0)
+    open_at, _ = US.next_session(close)
+    assert open_at == at(US, 2026, 3, 9, 9, 30)
+    assert US.seconds_until(open_at, close) == (2 * 24 + 17.5 - 1) * 3600
+
+
+def test_seconds_until_open_across_fall_back():
+    close = at(US, 2026, 10, 30, 16, 0)
+    open_at, _ = US.next_session(close)
+    assert US.seconds_until(open_at, close) == (2 * 24 + 17.5 + 1) * 3600
+
+
+def test_day_end_on_dst_days():
+    # 23-hour and 25-hour local days
+    assert US.seconds_until_day_end(at(US, 2026, 3, 8, 0, 0)) == 23 * 3600
+    assert US.seconds_until_day_end(at(US, 2026, 11, 1, 0, 0)) == 25 * 3600
+    assert LONDON.seconds_until_day_end(at(LONDON, 2026, 3, 29, 0, 0)) == 23 * 3600
+    assert US.seconds_until_day_end(at(US, 2026, 3, 7, 12, 0)) == 12 * 3600
+
+
+def test_session_hours_are_local_after_a_change():
+    open_at, close_at = US.session(at(US, 2026, 3, 9).date())
+    assert (open_at.time(), close_at.time()) == (time(9, 30), time(16, 0))
+    assert US.seconds_until(close_at, open_at) == 6.5 * 3600
+
+
+def test_us_holidays_2026():
+    holidays, half_days = _us_calendar(2026)
+    assert holidays == days(
+        "2026-01-01",
+        "2026-01-19",
+        "2026-02-16",
+        "2026-04-03",
+        "2026-05-25",
+        "2026-06-19",
+        "2026-07-03",  # July 4 is a Saturday
+        "2026-09-07",
+        "2026-11-26",
+        "2026-12-25",
+    )
+    assert half_days == {
+        date(2026, 11, 27): time(13, 0),
+        date(2026, 12, 24): time(13, 0),
+    }
+
+
+def test_us_weekend_observance():
+    # A Saturday New Year is not moved back into the previous year
+    assert date(2021, 12, 31) not in _us_calendar(2021)[0]
+    assert date(2022, 1, 1) not in _us_calendar(2022)[0]
+    # A Sunday Juneteenth is observed on the Monday
+    assert date(2022, 6, 20) in _us_calendar(2022)[0]
+    assert date(2019, 7, 3) in _us_calendar(2019)[1]
+
+
+def test_london_and_toronto_holidays_2026():
+    holidays, half_days = _london_calendar(2026)
+    assert holidays == days(
+        "2026-01-01",
+        "2026-04-03",
+        "2026-04-06",
+        "2026-05-04",
+        "2026-05-25",
+        "2026-08-31",
+        "2026-12-25",
+        "2026-12-28",  # Boxing Day is a Saturday
+    )
+    assert set(half_days) == days("2026-12-24", "2026-12-31")
+
+    holidays, half_days = _toronto_calendar(2026)
+    assert holidays == days(
+        "2026-01-01",
+        "2026-02-16",
+        "2026-04-03",
+        "2026-05-18",
+        "2026-07-01",
+        "2026-08-03",
+        "2026-09-07",
+        "2026-10-12",
+        "2026-12-25",
+        "2026-12-28",
+    )
+    assert half_days == {date(2026, 12, 24): time(13, 0)}
+
+
+def test_weekend_christmas_and_boxing_day_both_move():
+    # 2027: Dec 25 is a Saturday and Dec 26 a Sunday
+    assert days("2027-12-27", "2027-12-28") <= _london_calendar(2027)[0]
+
+
+def test_sessions_skip_holidays_and_close_early():
+    assert US.session(date(2026, 4, 3)) is None
+    assert not US.is_open(at(US, 2026, 4, 3, 11, 0))
+    # Thursday before Good Friday -> the Monday after
+    open_at, _ = US.next_session(at(US, 2026, 4, 2, 17, 0))
+    assert open_at == at(US, 2026, 4, 6, 9, 30)
+
+    _, close_at = US.session(date(2026, 11, 27))
+    assert close_at.time() == time(13, 0)
+    assert get_exchange("SHOP.TO").session(date(2026, 5, 18)) is None
+    assert get_exchange("VOD.L").session(date(2026, 5, 18)) is not None